@@ -0,0 +1,85 @@
+"""
+Memória e custo de percurso da AST tipada (parser.ast_nodes) comparada à
+AST antiga em dicionários, obtida com to_dict().
+
+Para cada forma, mede a memória retida pelas declarações de todos os
+exemplos e o tempo de um percurso típico da análise semântica (contar
+atributos, relações e especializações de cada classe).
+
+Uso (a partir de src/):
+    python -m benchmarks.ast_nodes [repeticoes]
+"""
+import gc
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+from parser.ast_nodes import ClassDecl, declarations_to_dicts
+from parser.parser import parse_ontology
+
+EXAMPLES_DIR = Path(__file__).resolve().parents[2] / "exemplos"
+
+
+def _walk_typed(declarations) -> int:
+    total = 0
+    for decl in declarations:
+        if isinstance(decl, ClassDecl):
+            total += len(decl.attributes) + len(decl.relations)
+            total += len(decl.specializes or ())
+            for rel in decl.relations:
+                total += rel.image_cardinality.is_many
+    return total
+
+
+def _walk_dicts(declarations) -> int:
+    total = 0
+    for decl in declarations:
+        if decl.get('type') == 'class':
+            content = decl.get('content') or {}
+            total += len(content.get('attributes', [])) + len(content.get('relations', []))
+            total += len(decl.get('specializes') or ())
+            for rel in content.get('relations', []):
+                upper = rel.get('image_cardinality', '').strip('[]').split('..')[-1]
+                total += upper == '*' or (upper.isdigit() and int(upper) > 1)
+    return total
+
+
+def _retained(build) -> float:
+    tracemalloc.start()
+    trees = build()
+    gc.collect()  # sessões do parser formam ciclos; não contam como AST retida
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del trees
+    return retained / 1024
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    sources = [path.read_text(encoding="utf-8") for path in sorted(EXAMPLES_DIR.rglob("*.tonto"))]
+    typed = [parse_ontology(data)['declarations'] for data in sources]
+    dicts = [declarations_to_dicts(declarations) for declarations in typed]
+
+    typed_kib = _retained(lambda: [parse_ontology(data)['declarations'] for data in sources])
+    # A AST tipada intermediária é descartada; só os dicionários ficam retidos
+    dict_kib = _retained(lambda: [declarations_to_dicts(parse_ontology(data)['declarations'])
+                                  for data in sources])
+
+    assert sum(map(_walk_typed, typed)) == sum(map(_walk_dicts, dicts))
+
+    results = []
+    for label, walk, trees in (("dicionários", _walk_dicts, dicts), ("tipada", _walk_typed, typed)):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for declarations in trees:
+                walk(declarations)
+        results.append((label, (time.perf_counter() - start) / repeat))
+
+    print(f"{len(sources)} exemplos, {repeat} percursos")
+    print(f"{'dicionários':<12} {dict_kib:9.1f} KiB   percurso {results[0][1] * 1000:8.3f} ms")
+    print(f"{'tipada':<12} {typed_kib:9.1f} KiB   percurso {results[1][1] * 1000:8.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Detecção de ciclos de especialização em hierarquias geradas.
+
+Monta diretamente a tabela de símbolos com uma cadeia de N classes, cada
+uma especializando a anterior e também ligada a ela por um genset (duas
+arestas por classe), e fecha CYCLES ciclos entre classes da cadeia. Mede
+SemanticAnalyzer._validate_cycles, que precisa achar exatamente CYCLES
+ciclos; a cadeia é profunda demais para uma busca recursiva.
+
+Uso (a partir de src/):
+    python -m benchmarks.cycle_detection [classes]
+"""
+import sys
+import time
+
+from semantic.analyzer import SemanticAnalyzer
+from semantic.dataclasses import Genset, TontoClass
+from semantic.symbol_table import SymbolTable
+
+CYCLES = 3
+
+
+def make_table(n: int) -> SymbolTable:
+    symbol_table = SymbolTable()
+    symbol_table.add_class(TontoClass(name="C0", stereotype='kind'))
+    for i in range(1, n):
+        symbol_table.add_class(TontoClass(name=f"C{i}", stereotype='subkind', specializes=[f"C{i - 1}"]))
+        symbol_table.add_genset(Genset(name=f"G{i}", general=f"C{i - 1}", specifics=[f"C{i}"]))
+    # Ciclos disjuntos: o início de cada trecho passa a especializar o fim dele
+    step = n // CYCLES
+    for c in range(CYCLES):
+        start, end = c * step + 1, (c + 1) * step - 1
+        symbol_table.classes[f"C{start}"].specializes.append(f"C{end}")
+    return symbol_table
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    analyzer = SemanticAnalyzer()
+    analyzer.symbol_table = make_table(n)
+
+    start = time.perf_counter()
+    analyzer._validate_cycles()
+    elapsed = time.perf_counter() - start
+
+    print(f"{n} classes, {2 * (n - 1) + CYCLES} arestas: {elapsed:.2f} s, "
+          f"{len(analyzer.errors)} ciclo(s)")
+    if len(analyzer.errors) != CYCLES:
+        print(f"Esperados {CYCLES} ciclos")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Custo do parsing de arquivos com muitos erros sintáticos.
+
+Parte do arquivo sintético de benchmarks.parse_scaling e quebra uma em
+cada ERROR_EVERY declarações (especialização sem superclasse e enum sem
+'}'), comparando o tempo com o do arquivo correto. Com a recuperação em
+modo pânico, o arquivo com erros deve custar o mesmo que o correto, ter
+um erro por declaração quebrada (até SYNTAX_ERROR_LIMIT) e manter as
+demais declarações na AST.
+
+Uso (a partir de src/):
+    python -m benchmarks.error_recovery [declaracoes]
+"""
+import sys
+import time
+
+from benchmarks.parse_scaling import make_declarations
+from parser.parser import SYNTAX_ERROR_LIMIT, parse_ontology
+
+ERROR_EVERY = 10
+
+
+def break_declarations(text: str) -> str:
+    lines = text.splitlines()
+    for index in range(2, len(lines), ERROR_EVERY):
+        line = lines[index]
+        if line.startswith("subkind"):
+            lines[index] = line.replace(" Root", "")
+        elif line.startswith("enum"):
+            lines[index] = line.replace(" }", "")
+        else:
+            lines[index] = line.replace("where", "where ,")
+    return "\n".join(lines) + "\n"
+
+
+def _timed(data: str):
+    start = time.perf_counter()
+    result = parse_ontology(data)
+    return result, time.perf_counter() - start
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    good = make_declarations(size)
+    bad = break_declarations(good)
+
+    good_result, good_time = _timed(good)
+    bad_result, bad_time = _timed(bad)
+
+    broken = len(range(0, size, ERROR_EVERY))
+    errors = len(bad_result['syntactic_errors'])
+    assert errors == min(broken, SYNTAX_ERROR_LIMIT + 1)
+    kept = len(bad_result['declarations'])
+
+    print(f"{size} declarações, {broken} quebradas; {errors} erros registrados, "
+          f"{kept} de {len(good_result['declarations'])} declarações mantidas")
+    print(f"sem erros    {good_time * 1000:9.1f} ms")
+    print(f"com erros    {bad_time * 1000:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
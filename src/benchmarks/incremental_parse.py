@@ -0,0 +1,57 @@
+"""
+Reparsing após uma edição: parse_ontology do texto inteiro comparado ao
+IncrementalParser, que só reparseia as declarações alteradas.
+
+Cada edição renomeia uma classe em uma posição aleatória do arquivo
+sintético de benchmarks.parse_scaling, que tem também uma declaração com
+erro sintático perto do início. O IncrementalParser recebe o texto
+inteiro (update, como na interface) e o resultado é conferido contra o
+parsing completo.
+
+Uso (a partir de src/):
+    python -m benchmarks.incremental_parse [declaracoes] [edicoes]
+"""
+import random
+import sys
+import time
+
+from benchmarks.parse_scaling import make_declarations
+from parser.incremental import IncrementalParser
+from parser.parser import parse_ontology
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000
+    edits = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    text = make_declarations(size).replace("kind Root\n", "kind Root\nsubkind Broken specializes\n", 1)
+    rng = random.Random(0)
+
+    incremental = IncrementalParser()
+    incremental.update(text)
+
+    full_time = incremental_time = 0.0
+    for _ in range(edits):
+        # Acrescenta um caractere ao nome de uma subkind qualquer
+        line_start = text.index("subkind C", rng.randrange(len(text) - 100))
+        offset = line_start + len("subkind C")
+        text = text[:offset] + "9" + text[offset:]
+
+        start = time.perf_counter()
+        expected = parse_ontology(text)
+        full_time += time.perf_counter() - start
+
+        start = time.perf_counter()
+        result = incremental.update(text)
+        incremental_time += time.perf_counter() - start
+
+        assert result['declarations'] == expected['declarations']
+        assert result['syntactic_errors'] == expected['syntactic_errors']
+
+    print(f"{size} declarações, {edits} edições; última: {incremental.reparsed} trecho(s) reparseado(s), "
+          f"{incremental.reused} reaproveitado(s)")
+    print(f"parse_ontology       {full_time / edits * 1000:9.2f} ms/edição")
+    print(f"IncrementalParser    {incremental_time / edits * 1000:9.2f} ms/edição")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Comparação entre os backends de lexer 'ply' e 'regex'.
+
+Primeiro confere, arquivo por arquivo de exemplos/, que os dois backends
+produzem exatamente os mesmos tokens e LexerErrors; depois mede a vazão
+de cada um em tokens por segundo.
+
+Uso (a partir de src/):
+    python -m benchmarks.lexer_backends [repeticoes]
+"""
+import sys
+import time
+from pathlib import Path
+
+from lexer.lexer import LEXER_BACKENDS, create_lexer
+
+EXAMPLES_DIR = Path(__file__).resolve().parents[2] / "exemplos"
+
+
+def check_backends_agree(paths) -> int:
+    mismatches = 0
+    for path in paths:
+        data = path.read_text(encoding="utf-8")
+        reference = create_lexer(backend='ply')
+        expected = list(reference.tokenize(data))
+
+        for backend in LEXER_BACKENDS[1:]:
+            lexer = create_lexer(backend=backend)
+            if list(lexer.tokenize(data)) != expected or lexer.errors != reference.errors:
+                mismatches += 1
+                print(f"DIVERGÊNCIA ({backend}): {path}")
+    return mismatches
+
+
+def measure_throughput(backend: str, sources, repeat: int):
+    lexer = create_lexer(backend=backend)
+    total_tokens = 0
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for data in sources:
+            total_tokens += sum(1 for _ in lexer.tokenize(data))
+    elapsed = time.perf_counter() - start
+    print(f"{backend:<8} {total_tokens:>9} tokens em {elapsed:6.2f}s  "
+          f"{total_tokens / elapsed:12,.0f} tokens/s")
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    paths = sorted(EXAMPLES_DIR.rglob("*.tonto"))
+
+    mismatches = check_backends_agree(paths)
+    print(f"{len(paths)} arquivos comparados, {mismatches} divergência(s)")
+    if mismatches:
+        sys.exit(1)
+
+    sources = [path.read_text(encoding="utf-8") for path in paths]
+    for backend in LEXER_BACKENDS:
+        measure_throughput(backend, sources, repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Benchmark do custo de criação de lexers por arquivo.
+
+Compara a construção antiga (lex.lex() a cada TontoLexer) com os clones do
+lexer mestre, com e sem o modo otimizado (lextab) do PLY.
+
+Uso (a partir de src/):
+    python -m benchmarks.lexer_setup [quantidade_de_arquivos]
+"""
+import sys
+import time
+from pathlib import Path
+
+from lexer.lexer import TontoLexer, create_lexer, get_master_lexer
+
+EXAMPLES_DIR = Path(__file__).resolve().parents[2] / "exemplos"
+
+
+def _legacy_lexer() -> TontoLexer:
+    """Reproduz o comportamento anterior: reflexão e regex mestre a cada chamada"""
+    return TontoLexer(False, backend='ply', standalone=True)
+
+
+def _load_sources(count: int) -> list:
+    sources = [p.read_text(encoding="utf-8") for p in sorted(EXAMPLES_DIR.rglob("*.tonto"))]
+    return [sources[i % len(sources)] for i in range(count)]
+
+
+def _run(label: str, factory, sources: list):
+    start = time.perf_counter()
+    total_tokens = 0
+    for data in sources:
+        lexer = factory()
+        total_tokens += sum(1 for _ in lexer.tokenize(data))
+    elapsed = time.perf_counter() - start
+    per_file = elapsed / len(sources) * 1e6
+    print(f"{label:<28} {elapsed:8.3f}s  {per_file:9.1f} µs/arquivo  ({total_tokens} tokens)")
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    sources = _load_sources(count)
+
+    # Aquece os lexers mestres (o modo otimizado gera o lextab na primeira vez)
+    get_master_lexer(False)
+    get_master_lexer(True)
+
+    print(f"Tokenizando {count} arquivos de {EXAMPLES_DIR}")
+    _run("lex.lex() por arquivo", _legacy_lexer, sources)
+    _run("clone do lexer mestre", lambda: create_lexer(False), sources)
+    _run("clone (optimize/lextab)", lambda: create_lexer(True), sources)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Parsing de um único arquivo grande: parse_ontology comparado a
+parse_ontology_parallel.
+
+Usa o arquivo sintético de benchmarks.parse_scaling, inteiro e com um erro
+a cada ERROR_EVERY linhas (benchmarks.error_recovery), e confere que os
+dois resultados são idênticos: declarações, tokens, erros e relatórios.
+O ganho depende do número de núcleos; o tempo paralelo inclui subir o
+pool de processos.
+
+Uso (a partir de src/):
+    python -m benchmarks.parallel_parse [declaracoes] [processos]
+"""
+import os
+import sys
+import time
+
+from benchmarks.error_recovery import break_declarations
+from benchmarks.parse_scaling import make_declarations
+from parser.parallel import find_split_points, parse_ontology_parallel
+from parser.parser import get_parser, parse_ontology
+
+
+def _comparable(result):
+    return (result['package'], result['imports'], result['declarations'],
+            str(result['summary']), str(result['error_report']), result['has_errors'],
+            result['tokens'], result['lexical_errors'], result['syntactic_errors'])
+
+
+def _timed(function, *args, **kwargs):
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count() or 1
+    get_parser()
+
+    clean = make_declarations(size)
+    print(f"{size} declarações ({len(clean) / (1024 * 1024):.1f} MiB), {workers} processo(s)")
+    for label, data in (("sem erros", clean), ("com erros", break_declarations(clean))):
+        _, prepass = _timed(find_split_points, data, len(data) // (workers * 4))
+        serial, serial_time = _timed(parse_ontology, data)
+        parallel, parallel_time = _timed(parse_ontology_parallel, data, max_workers=workers, parallel=True)
+        assert _comparable(serial) == _comparable(parallel)
+        print(f"  {label:<10} serial {serial_time:6.2f} s   paralelo {parallel_time:6.2f} s "
+              f"(pré-passo {prepass:.2f} s)   {serial_time / parallel_time:4.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Validação semântica em série comparada às regras rodando em paralelo.
+
+Usa a ontologia sintética de benchmarks.semantic_scaling e mede as fases
+2 e 3 (a tabela de símbolos é montada antes, fora da medida) em cada modo
+de semantic.parallel, conferindo que os erros saem iguais e na mesma
+ordem. O ganho esperado é limitado pela tarefa mais lenta (verificação
+da fase 2 ou regra do PatternValidator), medida uma a uma; o modo
+'process' inclui subir o pool e enviar a tabela, e o modo 'thread' só
+ganha em Python sem GIL.
+
+Uso (a partir de src/):
+    python -m benchmarks.parallel_validation [classes] [processos]
+"""
+import os
+import sys
+import time
+
+from benchmarks.semantic_scaling import make_ontology
+from semantic.analyzer import SemanticAnalyzer
+from semantic.parallel import VALIDATION_MODES, free_threaded, run_task, validation_tasks
+
+
+def _validate(ast: dict, mode: str, workers: int):
+    analyzer = SemanticAnalyzer(validation_mode=mode, max_workers=workers)
+    analyzer.build_symbol_table(ast)
+    start = time.perf_counter()
+    _, errors = analyzer.validate()
+    return [str(error) for error in errors], time.perf_counter() - start
+
+
+def _slowest_task(ast: dict):
+    analyzer = SemanticAnalyzer()
+    analyzer.build_symbol_table(ast).freeze()
+    times = {}
+    for task in validation_tasks(analyzer):
+        start = time.perf_counter()
+        run_task(analyzer, task)
+        times[task[1]] = time.perf_counter() - start
+    return max(times.items(), key=lambda item: item[1])
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count() or 1
+    ast = make_ontology(size)
+    print(f"{size} classes, {workers} processo(s)/thread(s), "
+          f"{'sem' if free_threaded() else 'com'} GIL")
+
+    serial_errors, serial_time = _validate(ast, 'serial', workers)
+    task, seconds = _slowest_task(ast)
+    print(f"  {'serial':<8} {serial_time:6.2f} s   tarefa mais lenta: {task} ({seconds:.2f} s)")
+    for mode in VALIDATION_MODES[1:]:
+        errors, elapsed = _validate(ast, mode, workers)
+        assert errors == serial_errors
+        print(f"  {mode:<8} {elapsed:6.2f} s   {serial_time / elapsed:4.1f}x")
+
+
+if __name__ == "__main__":
+    main()
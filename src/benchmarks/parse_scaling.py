@@ -0,0 +1,84 @@
+"""
+Escalabilidade do parsing com o número de declarações e de membros.
+
+Gera ontologias sintéticas com N declarações (classes, gensets, enums) e
+uma classe com N atributos/relações, e mede o tempo por item. Com as
+listas construídas por append em regras recursivas à esquerda, o custo
+por item deve ficar aproximadamente constante; o script termina com
+código 1 se o tempo por item crescer mais que LINEAR_TOLERANCE vezes
+entre o menor e o maior tamanho.
+
+Uso (a partir de src/):
+    python -m benchmarks.parse_scaling [tamanhos...]
+    python -m benchmarks.parse_scaling 10000 100000 1000000
+"""
+import sys
+import time
+
+from parser.parser import parse_ontology
+
+DEFAULT_SIZES = (10_000, 100_000)
+LINEAR_TOLERANCE = 2.0
+
+
+def make_declarations(n: int) -> str:
+    """N declarações de topo, alternando classe, genset e enum"""
+    lines = ["package scaling", "kind Root"]
+    for i in range(n):
+        kind = i % 3
+        if kind == 0:
+            lines.append(f"subkind C{i} specializes Root")
+        elif kind == 1:
+            lines.append(f"disjoint complete genset G{i} where C{i - 1} specializes Root")
+        else:
+            lines.append(f"enum E{i} {{ A{i}, B{i}, C{i} }}")
+    return "\n".join(lines) + "\n"
+
+
+def make_members(n: int) -> str:
+    """Uma classe com N membros, alternando atributos e relações"""
+    lines = ["package scaling", "kind Target", "kind Big {"]
+    for i in range(n):
+        if i % 2:
+            lines.append(f"    @componentOf [1] <>-- r{i} -- [0..*] Target")
+        else:
+            lines.append(f"    a{i}: string")
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def _time_per_item(make, n: int) -> float:
+    data = make(n)
+    start = time.perf_counter()
+    result = parse_ontology(data)
+    elapsed = time.perf_counter() - start
+    if result['syntactic_errors'] or result['lexical_errors']:
+        raise SystemExit(f"{make.__name__}({n}) gerou erros de parsing")
+    return elapsed / n
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or list(DEFAULT_SIZES)
+    sizes.sort()
+    parse_ontology(make_declarations(10))  # constrói o parser antes das medidas
+
+    ok = True
+    for make in (make_declarations, make_members):
+        per_item = []
+        for n in sizes:
+            seconds = _time_per_item(make, n)
+            per_item.append(seconds)
+            print(f"{make.__name__:<18} n={n:>9}   {seconds * 1e6:8.2f} us/item")
+
+        growth = per_item[-1] / per_item[0]
+        print(f"{make.__name__:<18} crescimento do custo por item: {growth:.2f}x")
+        if growth > LINEAR_TOLERANCE:
+            ok = False
+
+    if not ok:
+        print("Custo por item cresce com o tamanho: construção das listas não é linear")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Teste de estresse do parser em várias threads.
+
+Faz o parsing serial de cada exemplo como referência e depois repete os
+mesmos arquivos, embaralhados, em um ThreadPoolExecutor. Cada resultado
+concorrente deve ser idêntico ao serial (declarações, sumário, relatório
+e erros), o que falharia se o estado de um parsing vazasse para outro.
+
+Uso (a partir de src/):
+    python -m benchmarks.parser_threads [threads] [rodadas]
+"""
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from parser.parser import parse_ontology
+
+EXAMPLES_DIR = Path(__file__).resolve().parents[2] / "exemplos"
+
+
+def result_fingerprint(result: dict) -> tuple:
+    return (
+        result['declarations'],
+        str(result['summary']),
+        str(result['error_report']),
+        [(e.line, e.column, e.message) for e in result['syntactic_errors']],
+        [(e.line, e.column, e.message) for e in result['lexical_errors']],
+    )
+
+
+def main():
+    threads = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+    sources = [p.read_text(encoding="utf-8") for p in sorted(EXAMPLES_DIR.rglob("*.tonto"))]
+    expected = [result_fingerprint(parse_ontology(data)) for data in sources]
+
+    jobs = list(range(len(sources))) * rounds
+    random.Random(0).shuffle(jobs)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        results = list(pool.map(lambda i: result_fingerprint(parse_ontology(sources[i])), jobs))
+    elapsed = time.perf_counter() - start
+
+    mismatches = sum(1 for i, result in zip(jobs, results) if result != expected[i])
+    print(f"{len(jobs)} parsings em {threads} threads ({elapsed:.2f}s): {mismatches} divergência(s)")
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
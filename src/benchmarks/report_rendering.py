@@ -0,0 +1,85 @@
+"""
+Custo da geração das tabelas de síntese e de erros no parsing.
+
+Compara o parsing como era antes (as duas tabelas formatadas geradas a
+cada parsing) com o parsing atual, que guarda apenas os objetos
+OntologySummary/ErrorReport e formata o texto sob demanda.
+
+As repetições das duas variantes são intercaladas, alternando qual roda
+primeiro, e cada variante fica com o melhor tempo entre as repetições. A
+memória retida é medida sobre resultados de mesmo formato: as duas
+variantes guardam os objetos, e a ansiosa guarda também o texto gerado.
+
+Uso (a partir de src/):
+    python -m benchmarks.report_rendering [repeticoes]
+"""
+import gc
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+from parser.parser import parse_ontology
+
+EXAMPLES_DIR = Path(__file__).resolve().parents[2] / "exemplos"
+LARGE_EXAMPLES = [
+    EXAMPLES_DIR / "unidade-3" / "Pizzaria_Mono.tonto",
+    EXAMPLES_DIR / "unidade-3" / "Hospital_Mono.tonto",
+    *sorted((EXAMPLES_DIR / "unidade-2" / "newGeneration").rglob("*.tonto")),
+]
+
+
+def _parse_eager(data: str) -> dict:
+    result = parse_ontology(data)
+    result['summary_text'] = result['summary'].get_summary_table()
+    result['error_report_text'] = result['error_report'].get_error_report()
+    return result
+
+
+def _time_pass(parse, sources) -> float:
+    """Tempo médio por arquivo de uma passada por todos os exemplos"""
+    gc.collect()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        for data in sources:
+            parse(data)
+        return (time.perf_counter() - start) / len(sources)
+    finally:
+        gc.enable()
+
+
+def _retained(parse, sources) -> int:
+    """Bytes retidos pelos resultados de parse em todos os exemplos"""
+    gc.collect()
+    tracemalloc.start()
+    results = [parse(data) for data in sources]
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del results
+    return retained
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    sources = [path.read_text(encoding="utf-8") for path in LARGE_EXAMPLES]
+    parse_ontology(sources[0])  # constrói o parser antes das medidas
+
+    variants = [
+        ("tabelas sempre geradas", _parse_eager),
+        ("tabelas sob demanda", parse_ontology),
+    ]
+    best = {label: float('inf') for label, _ in variants}
+    for i in range(repeat):
+        order = variants if i % 2 == 0 else variants[::-1]
+        for label, parse in order:
+            best[label] = min(best[label], _time_pass(parse, sources))
+
+    print(f"{len(sources)} exemplos grandes, melhor de {repeat} repetições intercaladas")
+    for label, parse in variants:
+        retained = _retained(parse, sources)
+        print(f"{label:<22} {best[label] * 1000:8.3f} ms/arquivo   resultados retidos {retained / 1024:9.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
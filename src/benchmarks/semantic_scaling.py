@@ -0,0 +1,111 @@
+"""
+Escalabilidade da análise semântica com o número de classes.
+
+Monta diretamente a AST (sem parsing) de ontologias sintéticas com N
+classes: kinds com subkinds, roles e phases, cada grupo com seu genset,
+roleMixins especializados por roles, e relators com mediações e a relação
+@material entre os roles. Mede o tempo por classe de analyze(), com os
+índices da SymbolTable, e, até BASELINE_MAX classes, com as consultas
+antigas, que percorrem todas as classes ou gensets a cada chamada. O
+script termina com código 1 se o tempo por classe crescer mais que
+LINEAR_TOLERANCE vezes entre o menor e o maior tamanho.
+
+Uso (a partir de src/):
+    python -m benchmarks.semantic_scaling [tamanhos...]
+    python -m benchmarks.semantic_scaling 10000 50000 200000
+"""
+import gc
+import sys
+import time
+
+from parser.ast_nodes import Cardinality, ClassDecl, GensetDecl, RelationConnector, RelationDecl
+from semantic.analyzer import SemanticAnalyzer
+from semantic.symbol_table import SymbolTable
+
+DEFAULT_SIZES = (10_000, 50_000, 200_000)
+BASELINE_MAX = 20_000
+LINEAR_TOLERANCE = 2.0
+
+# Classes por grupo gerado por make_ontology
+GROUP_SIZE = 12
+
+
+class ScanningSymbolTable(SymbolTable):
+    """As consultas anteriores aos índices"""
+
+    def get_gensets_for_general(self, general_name):
+        return [g for g in self.gensets if g.general == general_name]
+
+    def get_specializations(self, class_name):
+        return [c for c in self.classes.values() if c.specializes and class_name in c.specializes]
+
+
+def _mediation(image: str) -> RelationDecl:
+    return RelationDecl('mediation', RelationConnector('--'), None,
+                        Cardinality(1, None, "[1..*]"), image, Cardinality(1, 1, "[1]"))
+
+
+def make_ontology(n: int) -> dict:
+    """AST com aproximadamente N classes, em grupos de GROUP_SIZE"""
+    declarations = []
+    for g in range(max(1, n // GROUP_SIZE)):
+        kind, mixin = f"K{g}", f"M{g}"
+        subkinds = [f"S{g}_{i}" for i in range(2)]
+        roles = [f"R{g}_{i}" for i in range(3)]
+        phases = [f"P{g}_{i}" for i in range(2)]
+        declarations.append(ClassDecl('kind', kind))
+        declarations.append(ClassDecl('roleMixin', mixin))
+        declarations += [ClassDecl('subkind', name, specializes=[kind]) for name in subkinds]
+        declarations += [ClassDecl('role', name, specializes=[kind, mixin]) for name in roles]
+        declarations += [ClassDecl('phase', name, specializes=[kind]) for name in phases]
+        declarations.append(ClassDecl('relator', f"Rel{g}", has_body=True,
+                                      relations=[_mediation(roles[0]), _mediation(roles[1])]))
+        declarations.append(ClassDecl('category', f"Cat{g}"))
+        declarations.append(GensetDecl(f"GS{g}", kind, subkinds, ['disjoint', 'complete']))
+        declarations.append(GensetDecl(f"GR{g}", kind, roles))
+        declarations.append(GensetDecl(f"GP{g}", kind, phases, ['disjoint', 'complete']))
+        declarations.append(GensetDecl(f"GM{g}", mixin, roles, ['disjoint', 'complete']))
+        declarations.append(RelationDecl('material', RelationConnector('--'), roles[0],
+                                         Cardinality(1, None, "[1..*]"), roles[1],
+                                         Cardinality(1, None, "[1..*]"), external=True))
+    return {'package': 'scaling', 'imports': [], 'declarations': declarations}
+
+
+def _time_per_class(ast: dict, table_class) -> float:
+    analyzer = SemanticAnalyzer()
+    analyzer.symbol_table = table_class()
+    # Como no timeit: as coletas do gc sobre um heap maior não entram na medida
+    gc.collect()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        symbol_table, _ = analyzer.analyze(ast)
+        elapsed = time.perf_counter() - start
+    finally:
+        gc.enable()
+    return elapsed / len(symbol_table.classes)
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or list(DEFAULT_SIZES)
+    sizes.sort()
+
+    per_class = []
+    for n in sizes:
+        ast = make_ontology(n)
+        seconds = _time_per_class(ast, SymbolTable)
+        per_class.append(seconds)
+        line = f"n={n:>9}   índices {seconds * 1e6:8.2f} us/classe"
+        if n <= BASELINE_MAX:
+            line += f"   varredura {_time_per_class(ast, ScanningSymbolTable) * 1e6:10.2f} us/classe"
+        print(line)
+
+    growth = per_class[-1] / per_class[0]
+    print(f"crescimento do custo por classe: {growth:.2f}x")
+    if growth > LINEAR_TOLERANCE:
+        print("Custo por classe cresce com o tamanho: a validação não é linear")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
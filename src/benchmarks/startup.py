@@ -0,0 +1,67 @@
+"""
+Latência de inicialização: importação do parser e primeiro parsing.
+
+Cada medida roda em um processo novo. O cenário "frio" usa uma cópia de
+src/ sem parser/parsetab.py (tabelas geradas em memória); o "quente" usa
+as tabelas produzidas por `python -m parser.build_tables`. A coluna de
+importação vem do `python -X importtime`.
+
+Uso (a partir de src/):
+    python -m benchmarks.startup [repeticoes]
+"""
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parents[1]
+FIRST_PARSE = "from parser.parser import parse_ontology; parse_ontology('kind Pessoa')"
+
+
+def _import_time_us(src_dir: Path) -> int:
+    """Tempo cumulativo de importação de parser.parser segundo -X importtime"""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import parser.parser"],
+        cwd=src_dir, capture_output=True, text=True, check=True,
+    )
+    for line in proc.stderr.splitlines():
+        match = re.match(r"import time:\s+\d+ \|\s+(\d+) \|\s+parser\.parser$", line)
+        if match:
+            return int(match.group(1))
+    return 0
+
+
+def _first_parse_s(src_dir: Path) -> float:
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", FIRST_PARSE], cwd=src_dir, check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+
+def _report(label: str, src_dir: Path, repeat: int):
+    imports = sorted(_import_time_us(src_dir) for _ in range(repeat))
+    parses = sorted(_first_parse_s(src_dir) for _ in range(repeat))
+    print(f"{label:<8} importação {imports[len(imports) // 2] / 1000:7.1f} ms   "
+          f"processo até o 1º parsing {parses[len(parses) // 2] * 1000:7.1f} ms")
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    subprocess.run([sys.executable, "-m", "parser.build_tables"], cwd=SRC_DIR, check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cold_src = Path(tmp) / "src"
+        shutil.copytree(SRC_DIR, cold_src, ignore=shutil.ignore_patterns(
+            "parsetab.py", "parser.out", "__pycache__"))
+        _report("frio", cold_src, repeat)
+
+    _report("quente", SRC_DIR, repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Memória de pico do parsing completo comparada à de iter_declarations.
+
+Grava o arquivo sintético de benchmarks.parse_scaling em um diretório
+temporário e mede, com tracemalloc, o pico de memória de parse_ontology
+(texto lido inteiro) e de iter_declarations sobre o caminho do arquivo e
+sobre um mmap dele. Com o streaming, o pico deve ficar praticamente
+constante quando o número de declarações cresce.
+
+Uso (a partir de src/):
+    python -m benchmarks.streaming [declaracoes...]
+"""
+import mmap
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from benchmarks.parse_scaling import make_declarations
+from parser.parser import get_parser, parse_ontology
+from parser.streaming import iter_declarations
+
+DEFAULT_SIZES = (10_000, 50_000)
+
+
+def _full(path: Path) -> int:
+    return len(parse_ontology(path.read_text(encoding="utf-8"))['declarations'])
+
+
+def _streamed(path: Path) -> int:
+    return sum(item.declaration is not None for item in iter_declarations(path))
+
+
+def _mapped(path: Path) -> int:
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        return sum(item.declaration is not None for item in iter_declarations(buffer))
+
+
+def _measure(function, path: Path):
+    tracemalloc.start()
+    start = time.perf_counter()
+    count = function(path)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return count, peak / (1024 * 1024), elapsed
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES
+    get_parser()  # as tabelas LALR não entram na medição
+
+    with tempfile.TemporaryDirectory() as directory:
+        for size in sizes:
+            path = Path(directory) / f"scaling_{size}.tonto"
+            path.write_text(make_declarations(size), encoding="utf-8")
+            print(f"{size} declarações ({path.stat().st_size / (1024 * 1024):.1f} MiB)")
+            counts = set()
+            for label, function in (("parse_ontology", _full),
+                                    ("iter_declarations(caminho)", _streamed),
+                                    ("iter_declarations(mmap)", _mapped)):
+                count, peak, elapsed = _measure(function, path)
+                counts.add(count)
+                print(f"  {label:<28} pico {peak:8.1f} MiB   {elapsed:6.2f} s")
+            assert len(counts) == 1
+
+
+if __name__ == "__main__":
+    main()
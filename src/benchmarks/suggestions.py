@@ -0,0 +1,81 @@
+"""
+Custo das sugestões de correção por erro.
+
+Simula um arquivo com centenas de erros sintáticos: os tokens de todos os
+exemplos, com um em cada três escrito errado (uma letra trocada), e mede
+o tempo por token da varredura antiga (get_close_matches em cada
+vocabulário, a cada erro) e do LANGUAGE_INDEX, sem e com o cache LRU. As
+sugestões das duas formas são conferidas.
+
+Uso (a partir de src/):
+    python -m benchmarks.suggestions [erros]
+"""
+import random
+import sys
+import time
+from difflib import get_close_matches
+from pathlib import Path
+
+from lexer.lexer import (
+    CLASS_STEREOTYPES,
+    KEYWORDS,
+    META_ATTRIBUTES,
+    NATIVE_TYPES,
+    RELATION_STEREOTYPES,
+    TontoLexer,
+)
+from parser.utils import LANGUAGE_INDEX, find_similar_token, format_suggestion
+
+EXAMPLES_DIR = Path(__file__).resolve().parents[2] / "exemplos"
+
+
+def scan_suggestion(token: str):
+    """A busca anterior ao índice: cinco varreduras com difflib"""
+    suggestions = []
+    for vocabulary in (list(KEYWORDS.keys()), CLASS_STEREOTYPES, RELATION_STEREOTYPES,
+                       NATIVE_TYPES, META_ATTRIBUTES):
+        suggestions.extend(get_close_matches(token.lower(), vocabulary, n=3, cutoff=0.6))
+    return format_suggestion(list(dict.fromkeys(suggestions)))
+
+
+def error_tokens(count: int):
+    rng = random.Random(0)
+    values = []
+    for path in sorted(EXAMPLES_DIR.rglob("*.tonto")):
+        values.extend(tok.value for tok in TontoLexer().tokenize(path.read_text(encoding="utf-8")))
+    sample = []
+    for _ in range(count):
+        value = rng.choice(values)
+        if len(value) > 2 and rng.random() < 1 / 3:
+            index = rng.randrange(len(value))
+            value = value[:index] + rng.choice("aeiourst") + value[index + 1:]
+        sample.append(value)
+    return sample
+
+
+def _per_token(function, tokens) -> float:
+    start = time.perf_counter()
+    for token in tokens:
+        function(token)
+    return (time.perf_counter() - start) / len(tokens)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    tokens = error_tokens(count)
+    assert all(scan_suggestion(token) == find_similar_token(token) for token in tokens)
+
+    scan = _per_token(scan_suggestion, tokens)
+    LANGUAGE_INDEX.lookup.cache_clear()
+    # Só a primeira ocorrência de cada token paga a busca
+    cold = _per_token(lambda token: LANGUAGE_INDEX.lookup.__wrapped__(token.lower()), tokens)
+    warm = _per_token(find_similar_token, tokens)
+
+    print(f"{count} erros, {len(set(tokens))} tokens distintos, {len(LANGUAGE_INDEX)} palavras no índice")
+    print(f"difflib por vocabulário   {scan * 1e6:8.1f} us/erro")
+    print(f"índice, sem cache         {cold * 1e6:8.1f} us/erro")
+    print(f"índice com cache LRU      {warm * 1e6:8.1f} us/erro")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Benchmark de memória: lista de Token versus TokenBuffer.
+
+Concatena os exemplos até passar do número de tokens pedido e mede, com
+tracemalloc, a memória retida por cada representação.
+
+Uso (a partir de src/):
+    python -m benchmarks.token_memory [minimo_de_tokens]
+"""
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+from lexer.lexer import create_lexer
+from lexer.token_buffer import TokenBuffer
+
+EXAMPLES_DIR = Path(__file__).resolve().parents[2] / "exemplos"
+
+
+def _build_source(min_tokens: int) -> str:
+    sources = [p.read_text(encoding="utf-8") for p in sorted(EXAMPLES_DIR.rglob("*.tonto"))]
+    sample = "\n".join(sources)
+    sample_tokens = sum(1 for _ in create_lexer().tokenize(sample))
+    repeat = min_tokens // sample_tokens + 1
+    return "\n".join([sample] * repeat)
+
+
+def _measure(label: str, build, data: str):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build(data)
+    elapsed = time.perf_counter() - start
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<18} {len(result):>9} tokens  retido {retained / 2**20:8.2f} MiB  "
+          f"pico {peak / 2**20:8.2f} MiB  {elapsed:6.2f}s")
+    return result
+
+
+def main():
+    min_tokens = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    data = _build_source(min_tokens)
+    print(f"Texto-fonte: {len(data) / 2**20:.2f} MiB (não contabilizado abaixo)")
+
+    as_list = _measure("list[Token]", lambda d: list(create_lexer().tokenize(d)), data)
+    del as_list
+    as_buffer = _measure("TokenBuffer", TokenBuffer.from_source, data)
+
+    # Acesso sequencial pelas visões compatíveis com Token
+    start = time.perf_counter()
+    count = sum(1 for token in as_buffer if token.type == 'IDENTIFIER')
+    print(f"Iteração no TokenBuffer: {time.perf_counter() - start:.2f}s ({count} IDENTIFIER)")
+
+
+if __name__ == "__main__":
+    main()
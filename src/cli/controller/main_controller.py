@@ -1,6 +1,11 @@
 import os
 from pathlib import Path
-from lexer.lexer import tokenize
+
+from core.batch import analyze_files, discover_files
+from core.cache import AnalysisCache
+from core.project import Project
+from lexer.lexer import create_lexer, tokenize
+from semantic.pattern_validator import merge_profiles
 
 try:
     import questionary
@@ -26,11 +31,10 @@ class TontoController:
             if path.suffix != '.tonto':
                 return None, "O arquivo deve ter extensao .tonto"
 
-            with open(path, 'r', encoding='utf-8') as file:
-                content = file.read()
-
-            char_count = len(content)
-            tokens = tokenize(content)
+            # Lê o arquivo em blocos, sem manter o conteúdo inteiro em memória
+            lexer = create_lexer()
+            tokens = list(lexer.tokenize_path(path, encoding='utf-8'))
+            char_count = lexer.input_length
             return {
                 'tokens': tokens,
                 'source_name': f"Arquivo: {path.name}",
@@ -54,5 +58,62 @@ class TontoController:
             'char_count': char_count
         }, None
 
+    def lint_paths(self, paths, use_cache=True, cache_dir=None, max_workers=None, rules=None, profile=False):
+        """
+        Análise completa (léxica, sintática e semântica) de arquivos e
+        diretórios, reaproveitando o cache em disco quando use_cache=True.
+        rules seleciona as regras do PatternValidator; com profile, o
+        resultado inclui o perfil das regras nos arquivos reanalisados.
+        """
+        files = discover_files(paths)
+        missing = [str(path) for path in files if not path.is_file()]
+        if missing:
+            return None, f"Arquivo nao encontrado: {', '.join(missing)}"
+        if not files:
+            return None, "Nenhum arquivo .tonto encontrado"
+
+        cache = AnalysisCache(cache_dir) if use_cache else None
+        try:
+            results = analyze_files(files, cache=cache, max_workers=max_workers, rules=rules)
+        except UnicodeDecodeError:
+            return None, "Erro de codificacao: nao foi possivel ler os arquivos como UTF-8"
+
+        return {
+            'files': list(zip(files, results)),
+            'cache_hits': cache.hits if cache else 0,
+            'cache_misses': cache.misses if cache else 0,
+            'profile': merge_profiles(r.rule_profile for r in results) if profile else None,
+        }, None
+
+    def lint_projects(self, paths, use_cache=True, cache_dir=None, max_workers=None, rules=None, profile=False):
+        """
+        Como lint_paths, mas cada caminho é um projeto (diretório com
+        tonto.json): as referências a classes de pacotes importados são
+        resolvidas entre os arquivos do projeto e das dependências locais.
+        """
+        cache = AnalysisCache(cache_dir) if use_cache else None
+        files, diagnostics = [], []
+        for path in paths:
+            if not os.path.exists(path):
+                return None, f"Projeto nao encontrado: {path}"
+            project = Project.load(path)
+            if not project.files:
+                diagnostics.append(f"{project.name}: nenhum arquivo .tonto encontrado")
+                continue
+            try:
+                result = project.analyze(cache=cache, max_workers=max_workers, rules=rules)
+            except UnicodeDecodeError:
+                return None, "Erro de codificacao: nao foi possivel ler os arquivos como UTF-8"
+            files.extend(zip(result.files, result.analyses))
+            diagnostics.extend(result.diagnostics)
+
+        return {
+            'files': files,
+            'cache_hits': cache.hits if cache else 0,
+            'cache_misses': cache.misses if cache else 0,
+            'diagnostics': diagnostics,
+            'profile': merge_profiles(a.rule_profile for _, a in files) if profile else None,
+        }, None
+
     def clear_screen(self):
         os.system('cls' if os.name == 'nt' else 'clear')
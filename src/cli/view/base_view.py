@@ -73,3 +73,43 @@ USO:
             print("\nERROS LEXICOS ENCONTRADOS:")
             for error in lexical_errors:
                 print(f"   - {error}")
+
+    def print_lint_results(self, files, cache_hits=0, cache_misses=0, diagnostics=(), profile=None):
+        """Imprime os erros de cada arquivo no formato caminho:linha:coluna e um resumo"""
+        totals = {'LEXICO': 0, 'SINTATICO': 0, 'SEMANTICO': 0}
+
+        for path, analysis in files:
+            errors = (
+                [('LEXICO', e.line, e.column, e.message) for e in analysis.lexical_errors]
+                + [('SINTATICO', e.line, e.column, e.message) for e in analysis.syntactic_errors]
+                + [('SEMANTICO', e.line or 0, 0, e.message) for e in analysis.semantic_errors]
+            )
+            for kind, line, column, message in errors:
+                totals[kind] += 1
+                print(f"{path}:{line}:{column}: [{kind}] {message}")
+
+        for diagnostic in diagnostics:
+            print(f"[PROJETO] {diagnostic}")
+
+        print("\n" + "=" * 70)
+        print(f"{len(files)} arquivo(s) analisado(s): "
+              f"{totals['LEXICO']} erro(s) lexico(s), "
+              f"{totals['SINTATICO']} sintatico(s), "
+              f"{totals['SEMANTICO']} semantico(s)")
+        if cache_hits or cache_misses:
+            print(f"Cache: {cache_hits} acerto(s), {cache_misses} arquivo(s) reanalisado(s)")
+        if profile is not None:
+            self.print_rule_profile(profile)
+
+        return sum(totals.values())
+
+    def print_rule_profile(self, profile):
+        """Tabela do tempo por regra do PatternValidator, da mais lenta para a mais rapida"""
+        print("\nPERFIL DAS REGRAS (arquivos reanalisados)")
+        print("-" * 70)
+        print(f"{'Regra':<22} {'Chamadas':>9} {'Tempo (ms)':>12} {'Erros':>8}")
+        for rule_id, stats in sorted(profile.items(), key=lambda item: -item[1].seconds):
+            print(f"{rule_id:<22} {stats.calls:>9} "
+                  f"{stats.seconds * 1000:>12.2f} {stats.diagnostics:>8}")
+        if not profile:
+            print("Nenhuma regra executada.")
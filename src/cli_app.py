@@ -1,6 +1,10 @@
+import argparse
+import sys
+
 from cli.controller.main_controller import TontoController
 from cli.view.interactive_view import InteractiveView
 from cli.view.text_view import TextView
+from semantic.pattern_validator import DISABLED_RULES, RULES_BY_ID, select_rules
 
 class TontoCLI:
     def __init__(self):
@@ -32,8 +36,67 @@ class TontoCLI:
         view = TextView(self.controller, self.banner)
         view.run()
 
-def main():
+    def lint(self, args) -> int:
+        """Modo não interativo (ex.: CI); retorna o código de saída do processo"""
+        try:
+            rules = select_rules(only=args.only_rule, disabled=DISABLED_RULES + tuple(args.disable_rule or ()))
+        except ValueError as e:
+            print(e)
+            return 2
+
+        lint = self.controller.lint_projects if args.project else self.controller.lint_paths
+        result, error = lint(
+            args.paths,
+            use_cache=not args.no_cache,
+            cache_dir=args.cache_dir,
+            max_workers=args.workers,
+            rules=rules,
+            profile=args.profile,
+        )
+        if error:
+            print(error)
+            return 2
+
+        view = TextView(self.controller, self.banner)
+        error_count = view.print_lint_results(**result)
+        return 1 if error_count else 0
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Tonto CLI. Sem argumentos, abre o modo interativo."
+    )
+    commands = parser.add_subparsers(dest='command')
+
+    lint = commands.add_parser('lint', help="Analisa arquivos ou diretorios .tonto e lista os erros")
+    lint.add_argument('paths', nargs='+', help="Arquivos .tonto ou diretorios (busca recursiva)")
+    lint.add_argument('--no-cache', action='store_true',
+                      help="Ignora o cache em disco e reanalisa todos os arquivos")
+    lint.add_argument('--cache-dir', default=None,
+                      help="Diretorio do cache (padrao: .tonto-cache ou TONTO_CACHE_DIR)")
+    lint.add_argument('--workers', type=int, default=None,
+                      help="Numero de processos para arquivos fora do cache")
+    lint.add_argument('--project', action='store_true',
+                      help="Trata cada caminho como um projeto (diretorio com tonto.json) e "
+                           "resolve os imports entre os seus pacotes")
+    rule_ids = ', '.join(RULES_BY_ID)
+    lint.add_argument('--only-rule', action='append', metavar='REGRA',
+                      help=f"Executa so esta regra de padrao (pode repetir): {rule_ids}")
+    lint.add_argument('--disable-rule', action='append', metavar='REGRA',
+                      help="Desliga uma regra de padrao (pode repetir; TONTO_DISABLED_RULES "
+                           "desliga regras por padrao)")
+    lint.add_argument('--profile', action='store_true',
+                      help="Mostra tempo, chamadas e erros de cada regra de padrao")
+    return parser
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    args = build_arg_parser().parse_args(argv)
+
     cli = TontoCLI()
+    if args.command == 'lint':
+        sys.exit(cli.lint(args))
     cli.run()
 
 if __name__ == '__main__':
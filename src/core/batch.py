@@ -0,0 +1,168 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, replace
+from functools import partial
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Union
+
+from lexer.lexer import LexerError, create_lexer
+from lexer.token_buffer import TokenBuffer
+
+# Número de processos (None = os.cpu_count()) e limites abaixo dos quais
+# o custo de subir o pool supera o ganho e a análise roda em série
+BATCH_WORKERS = int(os.environ['TONTO_WORKERS']) if os.environ.get('TONTO_WORKERS') else None
+PARALLEL_MIN_FILES = 4
+PARALLEL_MIN_CHARS = 256 * 1024
+
+
+@dataclass
+class SourceAnalysis:
+    """Resultado (serializável) da análise de um arquivo"""
+    tokens: TokenBuffer
+    lexical_errors: List[LexerError] = field(default_factory=list)
+    syntactic_errors: List[Any] = field(default_factory=list)
+    ast: Optional[Dict[str, Any]] = None
+    # Preenchidos apenas com semantic=True
+    symbol_table: Optional[Any] = None
+    semantic_errors: List[Any] = field(default_factory=list)
+    # Perfil por regra do PatternValidator (id -> RuleStats); não vai para o cache
+    rule_profile: Optional[Dict[str, Any]] = None
+
+
+def analyze_source(data: str, incremental=None, semantic: bool = False,
+                   split: Optional[bool] = False, max_workers: Optional[int] = None,
+                   rules: Optional[Sequence[str]] = None, validation_mode: Optional[str] = None) -> SourceAnalysis:
+    """
+    Tokeniza e faz o parsing de um texto em uma única passada.
+
+    Com um IncrementalParser em `incremental` (ex.: um por aba do editor),
+    só as declarações alteradas desde a última análise são reparseadas.
+    Com split, o texto é dividido em trechos parseados em paralelo
+    (parser.parallel), com o mesmo resultado; com split=None, só se for
+    grande. Com semantic=True, também roda a análise semântica sobre a AST,
+    com as regras `rules` do PatternValidator (padrão: select_rules()) e
+    as verificações rodando como indicado em validation_mode
+    (semantic.parallel).
+    """
+    # Import tardio: o módulo do parser gera as tabelas LALR ao ser importado
+    from parser.parallel import parse_ontology_parallel
+
+    try:
+        if incremental is not None:
+            result = incremental.update(data)
+        else:
+            result = parse_ontology_parallel(data, max_workers=max_workers, parallel=split)
+    except Exception as e:
+        # Mesmo comportamento do FilesHandler.parse: o arquivo fica sem AST
+        print(f"Erro ao fazer parsing: {e}")
+        lexer = create_lexer()
+        tokens = TokenBuffer.from_source(data, lexer)
+        return SourceAnalysis(tokens=tokens, lexical_errors=list(lexer.errors))
+
+    analysis = SourceAnalysis(
+        tokens=result['tokens'],
+        lexical_errors=result['lexical_errors'],
+        syntactic_errors=result['syntactic_errors'],
+        ast=result,
+    )
+    if semantic:
+        from semantic.analyzer import SemanticAnalyzer
+        analyzer = SemanticAnalyzer(rules, validation_mode, max_workers)
+        analysis.symbol_table, analysis.semantic_errors = analyzer.analyze(result)
+        analysis.rule_profile = analyzer.rule_profile
+    return analysis
+
+
+def should_run_in_parallel(sources: Sequence[str], max_workers: Optional[int] = None) -> bool:
+    workers = max_workers if max_workers is not None else (BATCH_WORKERS or os.cpu_count() or 1)
+    if workers < 2 or len(sources) < PARALLEL_MIN_FILES:
+        return False
+    return sum(len(data) for data in sources) >= PARALLEL_MIN_CHARS
+
+
+def analyze_sources(sources: Sequence[str], max_workers: Optional[int] = None,
+                    parallel: Optional[bool] = None, semantic: bool = False,
+                    rules: Optional[Sequence[str]] = None) -> List[SourceAnalysis]:
+    """
+    Analisa vários textos de forma independente, em um pool de processos.
+
+    Os resultados voltam na mesma ordem de `sources`, qualquer que seja a
+    ordem de término dos processos. Lotes pequenos (ver PARALLEL_MIN_FILES
+    e PARALLEL_MIN_CHARS) são analisados em série, a menos que `parallel`
+    seja informado explicitamente; neles, um arquivo grande ainda pode ser
+    dividido em trechos parseados em paralelo e validado com as regras em
+    paralelo (ver analyze_source); no pool, cada arquivo roda em série.
+    """
+    if max_workers is None:
+        max_workers = BATCH_WORKERS
+    split: Optional[bool] = False
+    if parallel is None:
+        parallel = should_run_in_parallel(sources, max_workers)
+        split = None
+
+    if not parallel:
+        return [analyze_source(data, semantic=semantic, split=split, max_workers=max_workers, rules=rules)
+                for data in sources]
+
+    # 'spawn' evita herdar, via fork, o estado do Qt do processo da interface
+    context = multiprocessing.get_context('spawn')
+    workers = max_workers or os.cpu_count() or 1
+    chunksize = max(1, len(sources) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        return list(pool.map(partial(analyze_source, semantic=semantic, rules=rules, validation_mode='serial'), sources, chunksize=chunksize))
+
+
+def discover_files(paths: Iterable[Union[str, Path]]) -> List[Path]:
+    """Expande diretórios nos arquivos .tonto que contêm (em ordem), sem repetições"""
+    files: List[Path] = []
+    seen = set()
+    for path in map(Path, paths):
+        candidates = sorted(path.rglob('*.tonto')) if path.is_dir() else [path]
+        for candidate in candidates:
+            resolved = candidate.resolve()
+            if resolved not in seen:
+                seen.add(resolved)
+                files.append(candidate)
+    return files
+
+
+def analyze_files(paths: Sequence[Union[str, Path]], cache=None, max_workers: Optional[int] = None,
+                  semantic: bool = True, rules: Optional[Sequence[str]] = None) -> List[SourceAnalysis]:
+    """
+    Analisa arquivos do disco, na ordem de `paths`.
+
+    Com um AnalysisCache (core.cache), arquivos cujo conteúdo já foi
+    analisado pela mesma versão do analisador (e com as mesmas regras) são
+    lidos do cache, sem rule_profile; só os demais passam por
+    analyze_sources, e seus resultados são gravados.
+    """
+    from core.cache import content_key
+
+    sources = [Path(path).read_text(encoding='utf-8') for path in paths]
+    results: List[Optional[SourceAnalysis]] = [None] * len(sources)
+    suffix = ''
+    if semantic:
+        from semantic.pattern_validator import PATTERN_RULES, select_rules
+
+        # Regras efetivas (já com TONTO_DISABLED_RULES); fazem parte da chave
+        rules = select_rules() if rules is None else select_rules(only=rules, disabled=())
+        suffix = 's' if len(rules) == len(PATTERN_RULES) else 's' + content_key(','.join(rules))[:8]
+    keys = [content_key(data) + suffix for data in sources]
+
+    pending = []
+    for index, key in enumerate(keys):
+        cached = cache.get(key) if cache is not None else None
+        if cached is not None:
+            results[index] = cached
+        else:
+            pending.append(index)
+
+    analyzed = analyze_sources([sources[index] for index in pending],
+                               max_workers=max_workers, semantic=semantic, rules=rules)
+    for index, analysis in zip(pending, analyzed):
+        results[index] = analysis
+        if cache is not None:
+            cache.put(keys[index], replace(analysis, rule_profile=None))
+
+    return results
@@ -0,0 +1,165 @@
+import os
+import pickle
+import sys
+import tempfile
+import zlib
+from hashlib import blake2b
+from pathlib import Path
+from typing import List, Optional
+
+# Diretório padrão (relativo ao diretório de trabalho) e limite de tamanho;
+# TONTO_CACHE_DIR e TONTO_CACHE_MAX_MB sobrescrevem os padrões
+CACHE_DIR = os.environ.get('TONTO_CACHE_DIR', '.tonto-cache')
+CACHE_MAX_BYTES = int(os.environ.get('TONTO_CACHE_MAX_MB', '256')) * 1024 * 1024
+# Ao passar do limite, as entradas menos usadas saem até sobrar esta fração
+CACHE_PRUNE_TARGET = 0.9
+
+# Pacotes cujo código define o resultado guardado: qualquer alteração em um
+# dos seus módulos (gramática, ações, lexer, análise semântica) invalida o
+# cache inteiro
+FINGERPRINT_PACKAGES = ('lexer', 'parser', 'semantic', 'core')
+# Gerado a partir de parser.py por parser.build_tables, que já entra no hash
+FINGERPRINT_EXCLUDED = frozenset({'parser/parsetab.py'})
+SOURCE_ROOT = Path(__file__).resolve().parents[1]
+
+_fingerprint: Optional[str] = None
+
+
+def fingerprint_modules() -> List[str]:
+    """Todos os *.py de FINGERPRINT_PACKAGES (e subpacotes), em ordem fixa"""
+    modules = []
+    for package in FINGERPRINT_PACKAGES:
+        for path in (SOURCE_ROOT / package).rglob('*.py'):
+            module = path.relative_to(SOURCE_ROOT).as_posix()
+            if module not in FINGERPRINT_EXCLUDED:
+                modules.append(module)
+    return sorted(modules)
+
+
+def analyzer_fingerprint() -> str:
+    """Versão do analisador: hash do código dos módulos de fingerprint_modules()"""
+    global _fingerprint
+    if _fingerprint is None:
+        digest = blake2b(digest_size=8)
+        digest.update(f"{sys.version_info[0]}.{sys.version_info[1]}".encode())
+        for module in fingerprint_modules():
+            digest.update(module.encode())
+            digest.update((SOURCE_ROOT / module).read_bytes())
+        _fingerprint = digest.hexdigest()
+    return _fingerprint
+
+
+def content_key(data: str) -> str:
+    return blake2b(data.encode('utf-8'), digest_size=16).hexdigest()
+
+
+class AnalysisCache:
+    """
+    Cache em disco dos resultados de análise (SourceAnalysis) por arquivo.
+
+    Cada entrada é um pickle comprimido com zlib, guardado em
+    <diretório>/<versão do analisador>/<hash do conteúdo>.bin, então
+    arquivos com o mesmo conteúdo compartilham a entrada e uma versão
+    nova do analisador nunca lê entradas antigas. As escritas são
+    atômicas (arquivo temporário + os.replace), o que permite execuções
+    simultâneas sobre o mesmo diretório.
+
+    O tamanho total é limitado por max_bytes: ao ultrapassá-lo, as
+    entradas de outras versões e depois as de acesso mais antigo (mtime,
+    atualizado a cada leitura) são removidas.
+    """
+
+    def __init__(self, directory: Optional[str] = None, max_bytes: int = CACHE_MAX_BYTES):
+        self.root = Path(directory if directory is not None else CACHE_DIR)
+        self.directory = self.root / analyzer_fingerprint()
+        self.max_bytes = max_bytes
+        self._size: Optional[int] = None
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.bin"
+
+    def get(self, key: str):
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                entry = pickle.loads(zlib.decompress(f.read()))
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except (OSError, EOFError, zlib.error, pickle.UnpicklingError, AttributeError, ImportError):
+            # Entrada corrompida ou de um formato incompatível: descarta
+            self._remove(path)
+            self.misses += 1
+            return None
+        try:
+            os.utime(path)  # marca o acesso, para a remoção por LRU
+        except OSError:
+            pass  # cache somente leitura: a entrada continua válida
+        self.hits += 1
+        return entry
+
+    def put(self, key: str, entry):
+        payload = zlib.compress(pickle.dumps(entry, protocol=pickle.HIGHEST_PROTOCOL))
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        except OSError:
+            return  # diretório sem permissão de escrita: o resultado só não fica no cache
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(payload)
+            os.replace(temp_path, self._path(key))
+        except OSError:
+            self._remove(Path(temp_path))
+            return
+
+        if self._size is None:
+            self._size = self._disk_usage()
+        else:
+            self._size += len(payload)
+        if self._size > self.max_bytes:
+            self.prune()
+
+    def prune(self, max_bytes: Optional[int] = None):
+        """Remove entradas até o total ficar abaixo de CACHE_PRUNE_TARGET do limite"""
+        limit = int((max_bytes if max_bytes is not None else self.max_bytes) * CACHE_PRUNE_TARGET)
+        entries = []
+        for path in self.root.glob('*/*.bin'):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            # Versões antigas saem primeiro, depois as entradas menos usadas
+            entries.append((path.parent == self.directory, stat.st_mtime, stat.st_size, path))
+        entries.sort(key=lambda entry: entry[:2])
+
+        total = sum(size for _, _, size, _ in entries)
+        for _, _, size, path in entries:
+            if total <= limit:
+                break
+            self._remove(path)
+            total -= size
+        self._size = total
+
+    def clear(self):
+        for path in self.root.glob('*/*.bin'):
+            self._remove(path)
+        self._size = 0
+
+    def _disk_usage(self) -> int:
+        total = 0
+        for path in self.root.glob('*/*.bin'):
+            try:
+                total += path.stat().st_size
+            except OSError:
+                pass
+        return total
+
+    @staticmethod
+    def _remove(path: Path):
+        try:
+            path.unlink()
+        except OSError:
+            pass
@@ -0,0 +1,240 @@
+import json
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple, Union
+
+from core.batch import BATCH_WORKERS, PARALLEL_MIN_CHARS, SourceAnalysis, analyze_files, discover_files
+
+MANIFEST_NAME = 'tonto.json'
+
+
+@dataclass
+class Manifest:
+    """Campos do tonto.json usados na análise"""
+    name: str
+    out_folder: Optional[str] = None
+    dependencies: Dict[str, Any] = field(default_factory=dict)
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> 'Manifest':
+        path = Path(path)
+        data = json.loads(path.read_text(encoding='utf-8'))
+        return cls(
+            name=data.get('projectName') or data.get('name') or path.parent.name,
+            out_folder=data.get('outFolder'),
+            dependencies=data.get('dependencies') or {},
+        )
+
+
+@dataclass
+class ProjectAnalysis:
+    """Resultado de Project.analyze"""
+    files: List[Path]
+    # Na ordem de files, com symbol_table e semantic_errors preenchidos
+    analyses: List[SourceAnalysis]
+    # Grupos de pacotes na ordem em que foram analisados; pacotes que se
+    # importam mutuamente ficam no mesmo grupo
+    order: List[List[str]]
+    diagnostics: List[str] = field(default_factory=list)
+
+
+def _analyze_component(asts: List[Dict[str, Any]], imported: Dict[str, Any],
+                       rules: Optional[Sequence[str]] = None, validation_mode: Optional[str] = None
+                       ) -> List[Tuple[Any, List[Any], Dict[str, Any]]]:
+    """
+    Análise semântica dos arquivos de um grupo de pacotes. As tabelas de
+    símbolos de todos são construídas antes da validação, então cada
+    arquivo enxerga as classes dos demais do grupo, além de `imported`.
+    Retorna, por arquivo, a tabela, os erros e o perfil das regras.
+    """
+    from semantic.analyzer import SemanticAnalyzer
+
+    analyzers = [SemanticAnalyzer(rules, validation_mode) for _ in asts]
+    component: Dict[str, Any] = {}
+    for analyzer, ast in zip(analyzers, asts):
+        for name, tonto_class in analyzer.build_symbol_table(ast).classes.items():
+            component.setdefault(name, tonto_class)
+
+    visible = {**imported, **component}
+    return [(*analyzer.validate(visible), analyzer.rule_profile) for analyzer in analyzers]
+
+
+class Project:
+    """
+    Projeto Tonto com vários arquivos: um diretório com tonto.json (ou sem
+    ele, tratado como projeto anônimo).
+
+    Os arquivos .tonto do diretório (exceto os de outFolder) e das
+    dependências com "directory" local fazem parte do projeto; dependências
+    só com "url" não são baixadas, apenas registradas em diagnostics.
+
+    analyze() faz o parsing de todos os arquivos (em paralelo e com o
+    cache de core.batch.analyze_files), monta o grafo de imports entre os
+    pacotes e faz a análise semântica em ordem topológica: cada pacote
+    enxerga as classes dos pacotes que importa, direta ou indiretamente, e
+    referências a elas deixam de ser erros. Pacotes que se importam
+    mutuamente são analisados juntos, e grupos independentes rodam em
+    paralelo.
+    """
+
+    def __init__(self, root: Union[str, Path], manifest: Optional[Manifest] = None):
+        self.root = Path(root)
+        self.manifest = manifest
+        self.name = manifest.name if manifest else self.root.resolve().name
+        self.files: List[Path] = []
+        self.diagnostics: List[str] = []
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> 'Project':
+        """Carrega o projeto de um diretório ou do caminho do seu tonto.json"""
+        path = Path(path)
+        root = path.parent if path.name == MANIFEST_NAME else path
+        manifest_path = root / MANIFEST_NAME
+        manifest = Manifest.load(manifest_path) if manifest_path.is_file() else None
+        project = cls(root, manifest)
+        project._discover(project, set(), set())
+        return project
+
+    def _discover(self, project: 'Project', roots: Set[Path], seen: Set[Path]):
+        """Acrescenta a project os arquivos deste projeto e, recursivamente, das dependências locais"""
+        roots.add(self.root.resolve())
+        excluded = None
+        if self.manifest and self.manifest.out_folder:
+            excluded = (self.root / self.manifest.out_folder).resolve()
+
+        for path in discover_files([self.root]):
+            resolved = path.resolve()
+            if resolved in seen or (excluded and excluded in resolved.parents):
+                continue
+            seen.add(resolved)
+            project.files.append(path)
+
+        dependencies = self.manifest.dependencies if self.manifest else {}
+        for name, spec in dependencies.items():
+            directory = spec.get('directory') if isinstance(spec, dict) else None
+            if not directory:
+                if name != self.name:
+                    project.diagnostics.append(
+                        f"{self.name}: dependencia '{name}' sem diretorio local; "
+                        f"apenas dependencias locais sao resolvidas")
+                continue
+            dependency_root = self.root / directory
+            if not dependency_root.is_dir():
+                project.diagnostics.append(
+                    f"{self.name}: diretorio '{directory}' da dependencia '{name}' nao encontrado")
+            elif dependency_root.resolve() not in roots:
+                manifest_path = dependency_root / MANIFEST_NAME
+                dependency = Project(dependency_root,
+                                     Manifest.load(manifest_path) if manifest_path.is_file() else None)
+                dependency._discover(project, roots, seen)
+
+    def analyze(self, cache=None, max_workers: Optional[int] = None,
+                parallel: Optional[bool] = None, rules: Optional[Sequence[str]] = None) -> ProjectAnalysis:
+        """
+        Parsing de todos os arquivos e análise semântica por pacote (ver a
+        classe), com as regras `rules` do PatternValidator
+        """
+        from semantic.graph import strongly_connected_components
+        from semantic.pattern_validator import select_rules
+
+        # Resolvidas aqui: os processos do pool não dependem do ambiente
+        rules = select_rules() if rules is None else select_rules(only=rules, disabled=())
+
+        analyses = analyze_files(self.files, cache=cache, max_workers=max_workers, semantic=False)
+        diagnostics = list(self.diagnostics)
+
+        # Arquivos por pacote; arquivos sem package formam um pacote cada
+        packages: Dict[str, List[int]] = {}
+        for index, analysis in enumerate(analyses):
+            package = analysis.ast.get('package') if analysis.ast else None
+            packages.setdefault(package or f"<{self.files[index]}>", []).append(index)
+
+        graph: Dict[str, List[str]] = {}
+        for package, indices in packages.items():
+            imports = graph[package] = []
+            for index in indices:
+                ast = analyses[index].ast or {}
+                for name in ast.get('imports', []):
+                    if name == package or name in imports:
+                        continue
+                    if name in packages:
+                        imports.append(name)
+                    else:
+                        diagnostics.append(f"{self.files[index]}: pacote importado '{name}' nao encontrado no projeto")
+
+        # Componentes em ordem topológica reversa: dependências primeiro
+        components = strongly_connected_components(graph)
+        component_of = {package: number for number, component in enumerate(components) for package in component}
+        levels: List[List[int]] = []
+        level_of: List[int] = []
+        for number, component in enumerate(components):
+            depends = {component_of[name] for package in component for name in graph[package]} - {number}
+            level = 1 + max((level_of[dependency] for dependency in depends), default=-1)
+            level_of.append(level)
+            if level == len(levels):
+                levels.append([])
+            levels[level].append(number)
+
+        if parallel is None:
+            workers = max_workers if max_workers is not None else (BATCH_WORKERS or os.cpu_count() or 1)
+            size = sum(len(analysis.tokens.source) for analysis in analyses)
+            parallel = workers >= 2 and size >= PARALLEL_MIN_CHARS
+
+        # Classes visíveis de cada componente (as suas e as das dependências)
+        visible: List[Dict[str, Any]] = [{} for _ in components]
+        pool: Optional[Executor] = None
+        try:
+            for level in levels:
+                tasks = []
+                for number in level:
+                    imported: Dict[str, Any] = {}
+                    for package in components[number]:
+                        for name in graph[package]:
+                            dependency = component_of[name]
+                            if dependency != number:
+                                imported.update(visible[dependency])
+                    indices = [index for package in components[number] for index in packages[package]]
+                    tasks.append((number, indices, imported))
+
+                pooled = parallel and len(tasks) > 1
+                # No pool, as regras de cada arquivo rodam em série
+                jobs = [([analyses[index].ast or {} for index in indices], imported, rules,
+                         'serial' if pooled else None)
+                        for _, indices, imported in tasks]
+                if pooled:
+                    if pool is None:
+                        pool = self._executor(max_workers)
+                    results = pool.map(_analyze_component, *zip(*jobs))
+                else:
+                    results = (_analyze_component(*job) for job in jobs)
+
+                for (number, indices, imported), component_results in zip(tasks, results):
+                    declared: Dict[str, Any] = {}
+                    for index, (symbol_table, errors, profile) in zip(indices, component_results):
+                        analyses[index].symbol_table = symbol_table
+                        analyses[index].semantic_errors = errors
+                        analyses[index].rule_profile = profile
+                        for name, tonto_class in symbol_table.classes.items():
+                            declared.setdefault(name, tonto_class)
+                    visible[number] = {**imported, **declared}
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+        return ProjectAnalysis(
+            files=list(self.files),
+            analyses=analyses,
+            order=[components[number] for level in levels for number in level],
+            diagnostics=diagnostics,
+        )
+
+    @staticmethod
+    def _executor(max_workers: Optional[int]) -> Executor:
+        # 'spawn', como em core.batch.analyze_sources
+        context = multiprocessing.get_context('spawn')
+        return ProcessPoolExecutor(max_workers=max_workers or BATCH_WORKERS or os.cpu_count() or 1,
+                                   mp_context=context)
+
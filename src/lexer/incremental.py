@@ -0,0 +1,228 @@
+from array import array
+from dataclasses import dataclass, replace
+from typing import List, Optional, Tuple
+
+from lexer.lexer import LexerError, Token, create_lexer
+from lexer.token_buffer import TOKEN_TYPE_CODES, TokenBuffer
+
+
+@dataclass
+class RelexResult:
+    """Resultado de uma edição aplicada ao IncrementalLexer"""
+    changed_tokens: List[Token]  # tokens relexados, com as posições do novo texto
+    errors: List[LexerError]
+    start: int              # índice do primeiro token relexado
+    old_end: int            # fim (exclusivo) do trecho substituído na lista antiga
+    new_end: int            # fim (exclusivo) do trecho novo na lista resultante
+    text_range: Tuple[int, int]  # trecho do novo texto que foi relexado
+    offset_delta: int = 0   # deslocamento de lexpos dos tokens a partir de old_end
+    line_delta: int = 0     # deslocamento de lineno dos tokens a partir de old_end
+
+
+class IncrementalLexer:
+    """
+    Mantém a lista de tokens de um texto e relexa apenas o trecho editado.
+
+    Nenhuma regra do TontoLexer casa através de '\\n' (comentários /* */
+    inclusive: o '.' da regra não casa quebras de linha), então o estado
+    do lexer no início de cada linha é apenas o número da linha. O ponto
+    seguro de reinício é o início da linha da edição e o novo fluxo se
+    ressincroniza com o antigo na primeira quebra de linha após a edição;
+    daí em diante os tokens antigos são reaproveitados, apenas deslocados.
+
+    O deslocamento não é aplicado a cada edição: os tokens a partir de
+    _pending_from guardam as posições de antes e o deslocamento pendente
+    vale para todos eles, como o intervalo de um gap buffer. Uma edição só
+    corrige os tokens entre ela e o início desse trecho, então digitar em
+    um mesmo ponto custa o tamanho da linha, não o do arquivo. Os tokens
+    corrigidos são cópias: um Token já devolvido nunca é alterado.
+
+    Com include_error_tokens, a lista guarda também os tokens 'ERROR'
+    (como os que o parser recebe); token_buffer() continua sem eles.
+
+    Pensado para o QTextDocument.contentsChange(posição, removidos,
+    adicionados) do editor.
+    """
+
+    def __init__(self, text: str = "", backend: Optional[str] = None,
+                 include_error_tokens: bool = False):
+        self._lexer = create_lexer(backend=backend)
+        self._include_error_tokens = include_error_tokens
+        self.text = text
+        self._tokens: List[Token] = list(self._lexer.tokenize(text, include_error_tokens))
+        self.errors: List[LexerError] = list(self._lexer.errors)
+        self._pending_from = len(self._tokens)
+        self._pending_offset = 0
+        self._pending_lines = 0
+
+    @property
+    def tokens(self) -> List[Token]:
+        """Lista nova com os tokens do texto atual (aplica o deslocamento pendente)"""
+        self._shift(self._pending_from, len(self._tokens), self._pending_offset, self._pending_lines)
+        self._pending_from = len(self._tokens)
+        self._pending_offset = self._pending_lines = 0
+        return list(self._tokens)
+
+    @property
+    def raw_tokens(self) -> List[Token]:
+        """
+        Os tokens guardados, sem aplicar o deslocamento pendente: tipos e
+        valores estão certos, mas lexpos e lineno podem se referir a um
+        texto anterior. Para quem só olha tipos e valores (ex.:
+        IncrementalParser); não deve ser alterada.
+        """
+        return self._tokens
+
+    def token_at(self, index: int) -> Token:
+        """O token de índice index, com a posição no texto atual"""
+        return self.token_slice(index, index + 1)[0]
+
+    def token_slice(self, start: int, end: int) -> List[Token]:
+        """Os tokens de [start, end), com as posições do texto atual (cópias só dos deslocados)"""
+        tokens = self._tokens[start:end]
+        first_pending = self._pending_from - start
+        if first_pending < len(tokens) and (self._pending_offset or self._pending_lines):
+            offset, lines = self._pending_offset, self._pending_lines
+            first_pending = max(0, first_pending)
+            tokens[first_pending:] = [
+                Token(token.type, token.value, token.lineno + lines, token.lexpos + offset, token.token_pos)
+                for token in tokens[first_pending:]
+            ]
+        return tokens
+
+    def token_buffer(self) -> TokenBuffer:
+        """
+        TokenBuffer do texto atual, com o deslocamento pendente aplicado só
+        nos arrays; sem tokens 'ERROR', como o 'tokens' de parse_ontology
+        """
+        token_list, start = self._tokens, self._pending_from
+        if self._include_error_tokens and self.errors:
+            before = [token for token in token_list[:start] if token.type != 'ERROR']
+            token_list = before + [token for token in token_list[start:] if token.type != 'ERROR']
+            start = len(before)
+        # Os tokens pendentes podem guardar posições negativas (ver apply_edit):
+        # o deslocamento é somado antes de preencher os arrays
+        buffer = TokenBuffer.from_tokens(token_list[:start], self.text)
+        pending = token_list[start:]
+        offset, lines = self._pending_offset, self._pending_lines
+        buffer.types.extend(array('B', [TOKEN_TYPE_CODES[token.type] for token in pending]))
+        buffer.starts.extend(array('I', [token.lexpos + offset for token in pending]))
+        buffer.ends.extend(array('I', [token.lexpos + len(token.value) + offset for token in pending]))
+        buffer.lines.extend(array('I', [token.lineno + lines for token in pending]))
+        buffer.columns.extend(array('I', [token.token_pos for token in pending]))
+        return buffer
+
+    def apply_edit(self, offset: int, removed: int, inserted: str) -> RelexResult:
+        """
+        Aplica a edição (remove `removed` caracteres a partir de `offset` e
+        insere `inserted`) e relexa só as linhas afetadas.
+        """
+        old_text = self.text
+        if not 0 <= offset <= len(old_text) or removed < 0 or offset + removed > len(old_text):
+            raise ValueError(f"Edição fora do texto: offset={offset}, removidos={removed}")
+
+        new_text = old_text[:offset] + inserted + old_text[offset + removed:]
+        delta = len(inserted) - removed
+        line_delta = inserted.count('\n') - old_text.count('\n', offset, offset + removed)
+
+        # Ponto seguro de reinício: início da linha que contém a edição
+        restart = old_text.rfind('\n', 0, offset) + 1
+        start = self._find(restart, 0)
+        restart_line = self._line_at(restart, start)
+
+        # Ressincronização: primeira quebra de linha após o fim da edição
+        old_stop = old_text.find('\n', offset + removed)
+        if old_stop == -1:
+            old_stop = len(old_text)
+        new_stop = old_stop + delta
+        old_stop_line = restart_line + old_text.count('\n', restart, old_stop)
+
+        # Relexa apenas o trecho afetado do novo texto
+        new_tokens = self._lexer.tokenize_range(new_text[restart:new_stop], restart, restart_line,
+                                                self._include_error_tokens)
+        new_errors = list(self._lexer.errors)
+
+        # Tokens antigos substituídos: os que começam dentro de [restart, old_stop)
+        old_end = self._find(old_stop, start)
+
+        # O trecho pendente passa a começar logo após os tokens novos, com o
+        # deslocamento desta edição somado ao pendente. Só os tokens entre a
+        # edição e o início antigo do trecho são copiados: antes da edição,
+        # com o deslocamento pendente aplicado; depois dela (ainda sem
+        # deslocamento), descontando o pendente que passará a valer para eles
+        pending_from = self._pending_from
+        if pending_from <= start:
+            self._shift(pending_from, start, self._pending_offset, self._pending_lines)
+        else:
+            self._shift(old_end, pending_from, -self._pending_offset, -self._pending_lines)
+        self._tokens[start:old_end] = new_tokens
+        self._pending_from = start + len(new_tokens)
+        if self._pending_from < len(self._tokens):
+            self._pending_offset += delta
+            self._pending_lines += line_delta
+        else:
+            # Nenhum token pendente: a próxima edição não tem o que descontar
+            self._pending_offset = self._pending_lines = 0
+
+        self.errors = self._splice_errors(new_errors, restart_line, old_stop_line, line_delta)
+        self.text = new_text
+
+        return RelexResult(
+            changed_tokens=new_tokens,
+            errors=self.errors,
+            start=start,
+            old_end=old_end,
+            new_end=start + len(new_tokens),
+            text_range=(restart, new_stop),
+            offset_delta=delta,
+            line_delta=line_delta,
+        )
+
+    def _find(self, position: int, lo: int) -> int:
+        """Primeiro índice a partir de lo cujo token começa em position ou depois (no texto atual)"""
+        tokens = self._tokens
+        pending_from, pending_offset = self._pending_from, self._pending_offset
+        hi = len(tokens)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            lexpos = tokens[mid].lexpos
+            if mid >= pending_from:
+                lexpos += pending_offset
+            if lexpos < position:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _line_at(self, position: int, index: int) -> int:
+        """
+        Linha de position, contando as quebras a partir do token anterior
+        a index em vez de a partir do início do texto
+        """
+        if index == 0:
+            return self.text.count('\n', 0, position) + 1
+        token = self._tokens[index - 1]
+        lexpos, lineno = token.lexpos, token.lineno
+        if index - 1 >= self._pending_from:
+            lexpos += self._pending_offset
+            lineno += self._pending_lines
+        return lineno + self.text.count('\n', lexpos, position)
+
+    def _shift(self, lo: int, hi: int, offset: int, lines: int):
+        """Troca os tokens de [lo, hi) por cópias deslocadas"""
+        if lo >= hi or not (offset or lines):
+            return
+        # O construtor direto custa bem menos que dataclasses.replace
+        self._tokens[lo:hi] = [
+            Token(token.type, token.value, token.lineno + lines, token.lexpos + offset, token.token_pos)
+            for token in self._tokens[lo:hi]
+        ]
+
+    def _splice_errors(self, new_errors: List[LexerError], first_line: int,
+                       last_line: int, line_delta: int) -> List[LexerError]:
+        """Troca os erros das linhas relexadas e desloca (em cópias) os posteriores"""
+        before = [e for e in self.errors if e.line < first_line]
+        after = [e for e in self.errors if e.line > last_line]
+        if line_delta:
+            after = [replace(error, line=error.line + line_delta) for error in after]
+        return before + new_errors + after
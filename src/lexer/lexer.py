@@ -1,5 +1,8 @@
+import os
+import re
+from bisect import bisect_right
 from ply import lex
-from typing import List, Iterator, Dict
+from typing import List, Iterator, Dict, Optional, TextIO
 from dataclasses import dataclass
 
 SYMBOLS = {
@@ -140,6 +143,43 @@ class Token:
         return f"Token({self.type}, '{self.value}', line={self.lineno}, col={self.token_pos})"
 
 
+# Tamanho dos blocos lidos no modo de tokenização por streaming
+STREAM_CHUNK_SIZE = 1 << 20
+
+
+class LineIndex:
+    """
+    Índice dos offsets de início de cada linha de um texto.
+
+    Construído em uma única passada linear; converte offsets em linha/coluna
+    (busca binária) e linha/coluna em offsets (O(1)). Linhas e colunas são
+    contadas a partir de 1, como nos tokens do lexer.
+    """
+    __slots__ = ('line_starts',)
+
+    def __init__(self, text: str = ""):
+        line_starts = [0]
+        find = text.find
+        pos = find('\n')
+        while pos != -1:
+            line_starts.append(pos + 1)
+            pos = find('\n', pos + 1)
+        self.line_starts: List[int] = line_starts
+
+    def __len__(self) -> int:
+        return len(self.line_starts)
+
+    def line_of(self, offset: int) -> int:
+        return bisect_right(self.line_starts, offset)
+
+    def column_of(self, offset: int) -> int:
+        return offset - self.line_starts[self.line_of(offset) - 1] + 1
+
+    def offset_of(self, line: int, column: int = 1) -> int:
+        line = min(max(line, 1), len(self.line_starts))
+        return self.line_starts[line - 1] + max(column, 1) - 1
+
+
 class TontoLexer:
     tokens = tokens
 
@@ -167,10 +207,34 @@ class TontoLexer:
 
     t_ignore = ' \t'
 
-    def __init__(self):
+    def __init__(self, optimize: Optional[bool] = None, backend: Optional[str] = None,
+                 standalone: bool = False):
+        """
+        standalone: executa lex.lex() sobre esta instância em vez de clonar
+        o lexer mestre (reflexão e regex mestre próprias; é assim que o
+        mestre é construído). Só vale para o backend 'ply'.
+        """
+        if backend is None:
+            backend = LEXER_BACKEND
+        if backend not in LEXER_BACKENDS:
+            raise ValueError(f"Backend de lexer desconhecido: '{backend}' (use {', '.join(LEXER_BACKENDS)})")
+
+        self.backend = backend
         self.errors: List[LexerError] = []
-        self.lexer = lex.lex(module=self)
         self._input_data = ""
+        self.input_length = 0
+        self.line_index = LineIndex()
+        if standalone:
+            if backend != 'ply':
+                raise ValueError("Apenas o backend 'ply' pode ser construido sem o lexer mestre")
+            self.lexer = _build_ply_lexer(self, LEXER_OPTIMIZE if optimize is None else optimize)
+            return
+        # Clona o lexer mestre: as tabelas e a regex compilada são
+        # compartilhadas, mas o buffer de entrada e as regras são deste objeto
+        self.lexer = get_master_lexer(optimize).clone(self)
+        # clone() só religa as tabelas por estado; begin() ativa as regras
+        # e a função de erro já ligadas a esta instância
+        self.lexer.begin('INITIAL')
 
     # Regras de Função (Prioridade Alta)
     def t_COMMENT_MULTILINE(self, t):
@@ -222,27 +286,265 @@ class TontoLexer:
 
     def _get_column_position(self, lexpos: int) -> int:
         if not self._input_data: return 0
-        last_newline = self._input_data.rfind('\n', 0, lexpos)
-        return lexpos - last_newline if last_newline != -1 else lexpos + 1
-
-    def tokenize(self, data: str) -> Iterator[Token]:
+        return self.line_index.column_of(lexpos)
+
+    def tokenize(self, data: str, include_error_tokens: bool = False, lineno: int = 1) -> Iterator[Token]:
+        """
+        Tokeniza o texto. Com include_error_tokens, os identificadores
+        hifenizados inválidos também são emitidos como tokens 'ERROR' (é o
+        que o parser recebe), além de registrados em self.errors.
+
+        lineno é o número da primeira linha: um trecho de um arquivo
+        maior, cortado no início de uma linha, sai com as mesmas linhas e
+        colunas que teria no arquivo inteiro.
+        """
+        self.errors.clear()
+        self.input_length = len(data)
+        return self._scan(data, lineno=lineno, include_error_tokens=include_error_tokens)
+
+    def tokenize_range(self, data: str, offset: int = 0, lineno: int = 1,
+                       include_error_tokens: bool = False) -> List[Token]:
+        """
+        Tokeniza um trecho de um texto maior, que começa no caractere
+        `offset` e na linha `lineno` do texto e no início de uma linha.
+
+        Os tokens saem com lexpos/linha/coluna relativos ao texto inteiro,
+        e os erros do trecho ficam em self.errors. Ao contrário de
+        tokenize(), a lista é produzida de uma vez e o lexer não guarda o
+        trecho depois (ex.: relexar só as linhas editadas).
+        """
         self.errors.clear()
+        tokens = list(self._scan(data, offset, lineno, include_error_tokens))
+        self._input_data = ""
+        self.line_index = LineIndex()
+        return tokens
+
+    def tokenize_stream(self, stream: TextIO, chunk_size: int = STREAM_CHUNK_SIZE,
+                        include_error_tokens: bool = False) -> Iterator[Token]:
+        """
+        Tokeniza um arquivo texto lendo blocos de tamanho fixo.
+
+        Nenhuma regra de token casa através de '\n' (inclusive comentários
+        /* ... */, cujo '.' não casa quebras de linha), então cada bloco é
+        cortado na última quebra de linha e o restante é levado ao próximo.
+        Conectores como '<o>--' e termos hifenizados nunca são partidos, e a
+        memória fica limitada ao maior entre o bloco e a linha mais longa.
+        Os tokens saem com lexpos/linha/coluna relativos ao arquivo inteiro;
+        include_error_tokens tem o mesmo efeito que em tokenize().
+        """
+        self.errors.clear()
+        self.input_length = 0
+        lineno = 1
+        pending = ""
+
+        while True:
+            chunk = stream.read(chunk_size)
+            pending += chunk
+
+            if chunk:
+                cut = pending.rfind('\n') + 1
+                if cut == 0:
+                    continue
+            else:
+                cut = len(pending)
+
+            piece, pending = pending[:cut], pending[cut:]
+            yield from self._scan(piece, self.input_length, lineno, include_error_tokens)
+            self.input_length += len(piece)
+            lineno = self.lexer.lineno
+
+            if not chunk:
+                break
+
+        # Libera o último bloco; o índice de linhas só valia para ele
+        self._input_data = ""
+        self.line_index = LineIndex()
+        self.lexer.input("")
+
+    def tokenize_path(self, path, encoding: str = 'utf-8', chunk_size: int = STREAM_CHUNK_SIZE,
+                      include_error_tokens: bool = False) -> Iterator[Token]:
+        """Tokeniza um arquivo sem carregá-lo inteiro em memória"""
+        with open(path, 'r', encoding=encoding) as stream:
+            yield from self.tokenize_stream(stream, chunk_size, include_error_tokens)
+
+    def _scan(self, data: str, offset: int = 0, lineno: int = 1,
+              include_error_tokens: bool = False) -> Iterator[Token]:
+        if self.backend == 'regex':
+            return self._scan_regex(data, offset, lineno, include_error_tokens)
+        return self._scan_ply(data, offset, lineno, include_error_tokens)
+
+    def _scan_ply(self, data: str, offset: int = 0, lineno: int = 1,
+                  include_error_tokens: bool = False) -> Iterator[Token]:
         self._input_data = data
-        self.lexer.lineno = 1
+        self.line_index = LineIndex(data)
+        self.lexer.lineno = lineno
         self.lexer.input(data)
 
         for tok in self.lexer:
-            if tok.type == 'ERROR': continue
+            if tok.type == 'ERROR' and not include_error_tokens: continue
             
             yield Token(
                 type=tok.type,
                 value=tok.value,
                 lineno=tok.lineno,
-                lexpos=tok.lexpos,
+                lexpos=tok.lexpos + offset,
                 token_pos=self._get_column_position(tok.lexpos)
             )
 
+    def _scan_regex(self, data: str, offset: int = 0, lineno: int = 1,
+                    include_error_tokens: bool = False) -> Iterator[Token]:
+        """
+        Backend alternativo: uma única regex com re.finditer.
+
+        Evita o despacho por função e a alocação de LexToken do PLY, mas
+        reproduz a mesma ordem de regras, os mesmos tokens e os mesmos
+        LexerErrors (ver _build_scanner_regex).
+        """
+        self._input_data = data
+        self.line_index = LineIndex(data)
+        reserved_get = RESERVED.get
+        line_start = 0
+
+        for match in SCANNER_REGEX.finditer(data):
+            kind = match.lastgroup
+            if kind == 'ignore':
+                continue
+
+            pos = match.start()
+            value = match.group()
+
+            if kind == 'newline':
+                lineno += len(value)
+                line_start = match.end()
+                continue
+
+            if kind == 'IDENTIFIER':
+                kind = reserved_get(value, 'IDENTIFIER')
+                if kind == 'IDENTIFIER' and value.endswith('DataType') and value[0].isupper():
+                    kind = 'USER_TYPE'
+            elif kind == 'HYPHENATED_ID':
+                kind = HYPHENATED_TERMS.get(value)
+                if kind is None:
+                    self.errors.append(LexerError(
+                        lineno, pos - line_start + 1, value[0], f"Illegal hyphenated identifier '{value}'"
+                    ))
+                    if not include_error_tokens:
+                        continue
+                    kind = 'ERROR'
+            elif kind == 'error':
+                self.errors.append(LexerError(lineno, pos - line_start + 1, value, "Illegal character"))
+                continue
+            elif kind == 'COMMENT_MULTILINE':
+                lineno += value.count('\n')
+                continue
+            elif kind == 'COMMENT_SINGLE':
+                continue
+
+            yield Token(
+                type=kind,
+                value=value,
+                lineno=lineno,
+                lexpos=pos + offset,
+                token_pos=pos - line_start + 1,
+            )
+
+        # Mantém o contador do PLY coerente para o modo de streaming
+        self.lexer.lineno = lineno
+
+
+# ============== Backend de Regex Única ==============
+
+def _build_scanner_regex() -> re.Pattern:
+    """
+    Monta a alternação com as mesmas regras e a mesma prioridade do PLY:
+    regras de função na ordem de definição, depois regras de string por
+    tamanho decrescente da regex, e por fim os caracteres ignorados e o
+    caractere ilegal.
+    """
+    function_rules = []
+    string_rules = []
+    for name in dir(TontoLexer):
+        if not name.startswith('t_') or name in ('t_ignore', 't_error'):
+            continue
+        rule = getattr(TontoLexer, name)
+        if callable(rule):
+            function_rules.append((rule.__code__.co_firstlineno, name[2:], rule.__doc__))
+        else:
+            string_rules.append((name[2:], rule))
+
+    function_rules.sort()
+    string_rules.sort(key=lambda item: len(item[1]), reverse=True)
+
+    parts = [f'(?P<{name}>{regex})' for _, name, regex in function_rules]
+    parts += [f'(?P<{name}>{regex})' for name, regex in string_rules]
+    parts.append(f'(?P<ignore>[{re.escape(TontoLexer.t_ignore)}]+)')
+    parts.append(r'(?P<error>(?s:.))')
+    return re.compile('|'.join(parts), re.VERBOSE)
+
+
+SCANNER_REGEX = _build_scanner_regex()
+
+
+# ============== Fábrica de Lexers ==============
+
+# Modo otimizado do PLY: pula a reflexão/validação da classe e carrega a
+# regex mestre do módulo lextab (gerado na primeira execução)
+LEXER_OPTIMIZE = os.environ.get('TONTO_LEXER_OPTIMIZE', '') not in ('', '0')
+LEXTAB_MODULE = 'lexer.lextab'
+
+# Backend de varredura: 'ply' (padrão) ou 'regex' (ver TontoLexer._scan_regex)
+LEXER_BACKENDS = ('ply', 'regex')
+LEXER_BACKEND = os.environ.get('TONTO_LEXER_BACKEND', 'ply')
+LEXTAB_OUTPUT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Lexers mestres já construídos, indexados pelo modo de otimização
+_master_lexers: Dict[bool, lex.Lexer] = {}
+
+
+def _build_ply_lexer(module: 'TontoLexer', optimize: bool) -> lex.Lexer:
+    """Executa lex.lex() sobre as regras de uma instância de TontoLexer"""
+    if optimize:
+        return lex.lex(
+            module=module,
+            optimize=True,
+            lextab=LEXTAB_MODULE,
+            outputdir=LEXTAB_OUTPUT_DIR,
+        )
+    return lex.lex(module=module)
+
+
+def _build_master_lexer(optimize: bool) -> lex.Lexer:
+    """Executa lex.lex() uma única vez sobre um protótipo de TontoLexer"""
+    return TontoLexer(optimize, backend='ply', standalone=True).lexer
+
+
+def get_master_lexer(optimize: Optional[bool] = None) -> lex.Lexer:
+    """
+    Retorna o lexer mestre do PLY, construindo-o apenas na primeira chamada.
+
+    O lexer mestre nunca deve receber entrada diretamente: use TontoLexer()
+    ou create_lexer(), que devolvem clones isolados dele.
+    """
+    if optimize is None:
+        optimize = LEXER_OPTIMIZE
+
+    master = _master_lexers.get(optimize)
+    if master is None:
+        master = _build_master_lexer(optimize)
+        _master_lexers[optimize] = master
+    return master
+
+
+def create_lexer(optimize: Optional[bool] = None, backend: Optional[str] = None) -> TontoLexer:
+    """Cria um TontoLexer com lista de erros e buffer de entrada próprios"""
+    return TontoLexer(optimize, backend)
+
 
 def tokenize(data: str) -> Iterator[Token]:
-    lexer = TontoLexer()
+    lexer = create_lexer()
     return lexer.tokenize(data)
+
+
+def tokenize_path(path, encoding: str = 'utf-8') -> Iterator[Token]:
+    lexer = create_lexer()
+    return lexer.tokenize_path(path, encoding)
@@ -0,0 +1,141 @@
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+from lexer.lexer import Token, TontoLexer, create_lexer, tokens
+
+# Códigos inteiros pequenos para os tipos de token (cabem em um byte).
+# Ordenados para que os códigos sejam os mesmos em qualquer processo
+TOKEN_TYPE_NAMES: Sequence[str] = tuple(sorted(tokens))
+TOKEN_TYPE_CODES: Dict[str, int] = {name: code for code, name in enumerate(TOKEN_TYPE_NAMES)}
+
+
+class TokenBuffer:
+    """
+    Sequência compacta de tokens em formato struct-of-arrays.
+
+    Em vez de um objeto Token por lexema, guarda o tipo como código inteiro
+    e offsets, linha e coluna em arrays; o valor de cada token é fatiado
+    do texto-fonte apenas quando acessado. A indexação e a iteração devolvem
+    objetos Token, então o buffer pode substituir a lista de tokens nos
+    chamadores existentes.
+    """
+
+    def __init__(self, source: str = ""):
+        self._source_parts: List[str] = [source] if source else []
+        self._source: Optional[str] = source
+        self._source_length = len(source)
+        self.types = array('B')
+        self.starts = array('I')
+        self.ends = array('I')
+        self.lines = array('I')
+        self.columns = array('I')
+
+    @classmethod
+    def from_source(cls, data: str, lexer: Optional[TontoLexer] = None) -> 'TokenBuffer':
+        """Tokeniza o texto e preenche o buffer; os erros ficam em lexer.errors"""
+        if lexer is None:
+            lexer = create_lexer()
+
+        buffer = cls(data)
+        for token in lexer.tokenize(data):
+            buffer.append(token)
+        return buffer
+
+    @classmethod
+    def from_tokens(cls, token_list: Iterable[Token], source: str) -> 'TokenBuffer':
+        # Preenche cada array de uma vez, em vez de um append por token
+        token_list = list(token_list)
+        buffer = cls(source)
+        buffer.types = array('B', [TOKEN_TYPE_CODES[token.type] for token in token_list])
+        buffer.starts = array('I', [token.lexpos for token in token_list])
+        buffer.ends = array('I', [token.lexpos + len(token.value) for token in token_list])
+        buffer.lines = array('I', [token.lineno for token in token_list])
+        buffer.columns = array('I', [token.token_pos for token in token_list])
+        return buffer
+
+    @property
+    def source(self) -> str:
+        if self._source is None:
+            self._source = "".join(self._source_parts)
+            self._source_parts = [self._source]
+        return self._source
+
+    def append(self, token: Token):
+        """Adiciona um token cujo lexpos se refere ao texto-fonte do buffer"""
+        self.types.append(TOKEN_TYPE_CODES[token.type])
+        self.starts.append(token.lexpos)
+        self.ends.append(token.lexpos + len(token.value))
+        self.lines.append(token.lineno)
+        self.columns.append(token.token_pos)
+
+    def extend(self, other: 'TokenBuffer'):
+        """
+        Concatena outro buffer (com seu próprio texto-fonte) ao final deste.
+
+        Linhas e colunas são preservadas; os offsets do outro buffer são
+        deslocados para o texto combinado. Tokens soltos não trazem o texto
+        de onde vieram: use TokenBuffer.from_tokens(tokens, texto) antes.
+        """
+        if not isinstance(other, TokenBuffer):
+            raise TypeError(f"TokenBuffer.extend espera um TokenBuffer, recebeu {type(other).__name__}")
+
+        shift = self._source_length
+        self.types.extend(other.types)
+        self.starts.extend(array('I', (start + shift for start in other.starts)))
+        self.ends.extend(array('I', (end + shift for end in other.ends)))
+        self.lines.extend(other.lines)
+        self.columns.extend(other.columns)
+
+        if other._source_length:
+            self._source_parts.extend(other._source_parts)
+            self._source_length += other._source_length
+            self._source = None
+
+    def clear(self):
+        self.__init__()
+
+    def type_of(self, index: int) -> str:
+        return TOKEN_TYPE_NAMES[self.types[index]]
+
+    def value_of(self, index: int) -> str:
+        return self.source[self.starts[index]:self.ends[index]]
+
+    def _token_at(self, index: int, source: str) -> Token:
+        start = self.starts[index]
+        return Token(
+            type=TOKEN_TYPE_NAMES[self.types[index]],
+            value=source[start:self.ends[index]],
+            lineno=self.lines[index],
+            lexpos=start,
+            token_pos=self.columns[index],
+        )
+
+    def __len__(self) -> int:
+        return len(self.types)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._token_at(i, self.source) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("TokenBuffer index out of range")
+        return self._token_at(index, self.source)
+
+    def __iter__(self) -> Iterator[Token]:
+        source = self.source
+        for index in range(len(self)):
+            yield self._token_at(index, source)
+
+    def __eq__(self, other):
+        if isinstance(other, TokenBuffer):
+            return (self.types == other.types and self.lines == other.lines
+                    and self.columns == other.columns and list(self) == list(other))
+        if isinstance(other, list):
+            return list(self) == other
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"TokenBuffer({len(self)} tokens)"
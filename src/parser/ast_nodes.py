@@ -0,0 +1,164 @@
+from dataclasses import dataclass, field
+from typing import Any, ClassVar, Dict, List, Optional, Union
+
+
+@dataclass(slots=True)
+class Cardinality:
+    """Cardinalidade de atributo ou relação, com os limites já convertidos"""
+    lower: int
+    upper: Optional[int]  # None = ilimitado ('*')
+    text: str             # forma original, ex.: "[1..*]"
+
+    @classmethod
+    def from_tokens(cls, parts: List[str]) -> 'Cardinality':
+        """Constrói a partir dos lexemas da regra: '[' n ('..' m)? ']' ou '[' '*' ']'"""
+        text = "".join(parts)
+        bounds = parts[1:-1]
+        if bounds[0] == '*':
+            return cls(0, None, text)
+        lower = int(bounds[0])
+        if len(bounds) == 1:
+            return cls(lower, lower, text)
+        upper = None if bounds[2] == '*' else int(bounds[2])
+        return cls(lower, upper, text)
+
+    @property
+    def is_many(self) -> bool:
+        return self.upper is None or self.upper > 1
+
+    def to_dict(self) -> str:
+        # A AST em dicionários guardava a cardinalidade como texto
+        return self.text
+
+    def __str__(self):
+        return self.text
+
+
+@dataclass(slots=True)
+class RelationConnector:
+    """Conector de relação ('--', '<>--', '--<o>', ...) com rótulo opcional"""
+    node_type: ClassVar[str] = 'relation_connector'
+
+    connector: str
+    label: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"type": self.node_type, "label": self.label, "connector": self.connector}
+
+
+@dataclass(slots=True)
+class AttributeDecl:
+    node_type: ClassVar[str] = 'attribute'
+
+    name: str
+    datatype: str
+    cardinality: Optional[Cardinality] = None
+    meta_attributes: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'type': self.node_type, 'name': self.name, 'datatype': self.datatype}
+
+
+@dataclass(slots=True)
+class RelationDecl:
+    """Relação interna (domain = None, dentro do corpo da classe) ou externa"""
+    relation_stereotype: str
+    connector: RelationConnector
+    domain: Optional[str]
+    domain_cardinality: Cardinality
+    image: str
+    image_cardinality: Cardinality
+    external: bool = False
+
+    @property
+    def node_type(self) -> str:
+        return 'relation_external' if self.external else 'relation_internal'
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "type": self.node_type,
+            "relation_stereotype": self.relation_stereotype,
+            "connector": self.connector.to_dict(),
+            "domain": self.domain,
+            "domain_cardinality": self.domain_cardinality.to_dict(),
+            "image": self.image,
+            "image_cardinality": self.image_cardinality.to_dict(),
+        }
+
+
+@dataclass(slots=True)
+class ClassDecl:
+    node_type: ClassVar[str] = 'class'
+
+    stereotype: str
+    name: str
+    category: Optional[str] = None
+    specializes: Optional[List[str]] = None
+    attributes: List[AttributeDecl] = field(default_factory=list)
+    relations: List[RelationDecl] = field(default_factory=list)
+    has_body: bool = False  # False para "kind X" sem '{ ... }'
+
+    def to_dict(self) -> Dict[str, Any]:
+        result = {"type": self.node_type, "stereotype": self.stereotype, "name": self.name}
+        if self.category is not None:
+            result['category'] = self.category
+        if self.specializes is not None:
+            result['specializes'] = self.specializes
+        result['content'] = {
+            "attributes": [attr.to_dict() for attr in self.attributes],
+            "relations": [rel.to_dict() for rel in self.relations],
+        } if self.has_body else None
+        return result
+
+
+@dataclass(slots=True)
+class GensetDecl:
+    node_type: ClassVar[str] = 'genset'
+
+    name: str
+    general: str
+    specifics: List[str]
+    restrictions: List[str] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "type": self.node_type,
+            "genset_restrictions": self.restrictions,
+            "name": self.name,
+            "specifics": self.specifics,
+            "general": self.general,
+        }
+
+
+@dataclass(slots=True)
+class EnumDecl:
+    node_type: ClassVar[str] = 'enum'
+
+    name: str
+    values: List[str]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"type": self.node_type, "name": self.name, "values": self.values}
+
+
+@dataclass(slots=True)
+class DatatypeDecl:
+    node_type: ClassVar[str] = 'datatype'
+
+    name: str
+    attributes: List[AttributeDecl] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "type": self.node_type,
+            "name": self.name,
+            "attributes": [attr.to_dict() for attr in self.attributes],
+        }
+
+
+Declaration = Union[ClassDecl, DatatypeDecl, EnumDecl, GensetDecl, RelationDecl]
+
+
+def declarations_to_dicts(declarations: List[Declaration]) -> List[Dict[str, Any]]:
+    """Converte as declarações para a AST antiga, em dicionários"""
+    return [decl.to_dict() for decl in declarations]
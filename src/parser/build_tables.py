@@ -0,0 +1,15 @@
+"""
+Etapa de build: gera as tabelas LALR do parser em parser/parsetab.py.
+
+Uso (a partir de src/):
+    python -m parser.build_tables [--debug]
+
+Com --debug, também gera o parser.out com a descrição dos estados.
+"""
+import sys
+
+from parser.parser import build_tables
+
+if __name__ == "__main__":
+    path = build_tables(debug='--debug' in sys.argv[1:])
+    print(f"Tabelas LALR geradas em {path}")
@@ -0,0 +1,246 @@
+from dataclasses import dataclass, replace
+from hashlib import blake2b
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from lexer.incremental import IncrementalLexer
+from lexer.lexer import Token
+from parser.parallel import (
+    ChunkResult,
+    merge_syntactic_errors,
+    parse_chunk_tokens,
+    split_declarations,
+    suggest_earlier_names,
+)
+from parser.parser import ParseError, ParserSession
+
+
+# Máximo de trechos seguidos, todos fora do cache, parseados em um só
+# grupo: menos chamadas ao parser no primeiro parsing, e uma edição
+# reparseia no máximo esse número de declarações (a menos que o grupo não
+# termine limpo)
+GROUP_MAX_SPANS = 32
+
+
+def span_key(token_list: Sequence[Token]) -> bytes:
+    """
+    Hash do conteúdo dos tokens; não depende da posição no texto nem de
+    espaços e comentários. O tipo de cada token é função do seu valor no
+    TontoLexer, então basta o hash dos valores.
+    """
+    joined = "\x00".join([tok.value for tok in token_list])
+    return blake2b(joined.encode(), digest_size=16).digest()
+
+
+def common_prefix_length(a: str, b: str) -> int:
+    """Tamanho do maior prefixo comum de a e b"""
+    limit = min(len(a), len(b))
+    lo, size = 0, 1024
+    # Blocos cada vez maiores comparados de uma vez; no primeiro diferente,
+    # busca binária dentro dele
+    while lo < limit:
+        hi = min(limit, lo + size)
+        if a[lo:hi] != b[lo:hi]:
+            while hi - lo > 1:
+                mid = (lo + hi) // 2
+                if a[lo:mid] == b[lo:mid]:
+                    lo = mid
+                else:
+                    hi = mid
+            return lo
+        lo = hi
+        size *= 2
+    return limit
+
+
+def common_suffix_length(a: str, b: str, limit: int) -> int:
+    """Tamanho do maior sufixo comum de a e b, até limit caracteres"""
+    len_a, len_b = len(a), len(b)
+    lo, size = 0, 1024
+    while lo < limit:
+        hi = min(limit, lo + size)
+        if a[len_a - hi:len_a - lo] != b[len_b - hi:len_b - lo]:
+            while hi - lo > 1:
+                mid = (lo + hi) // 2
+                if a[len_a - mid:len_a - lo] == b[len_b - mid:len_b - lo]:
+                    lo = mid
+                else:
+                    hi = mid
+            return lo
+        lo = hi
+        size *= 2
+    return limit
+
+
+@dataclass
+class ParsedGroup:
+    """
+    Parsing de um grupo de trechos consecutivos (ver IncrementalParser).
+
+    Cada erro sintático de `part` é guardado junto de uma âncora (índice
+    do token no grupo, distância da coluna do token), de onde sai a sua
+    posição em qualquer texto em que o grupo reapareça.
+    """
+    keys: Tuple[bytes, ...]  # span_key de cada trecho do grupo
+    first: bool              # grupo inicial (com o preâmbulo)
+    part: ChunkResult
+    anchors: Optional[List[Tuple[int, int]]]  # None: não fica em cache
+
+
+def _anchor_errors(token_list: List[Token], errors: List[ParseError]) -> Optional[List[Tuple[int, int]]]:
+    """
+    Âncoras dos erros: o token em que o erro foi apontado, ou aquele logo
+    antes do fim do texto (erro de fim de arquivo). None se algum erro
+    não corresponder a um token do grupo.
+    """
+    if not errors:
+        return []
+    starts = {(tok.lineno, tok.token_pos): index for index, tok in enumerate(token_list)}
+    ends = {(tok.lineno, tok.token_pos + len(tok.value)): index
+            for index, tok in enumerate(token_list) if tok.type != 'ERROR'}
+    anchors = []
+    for error in errors:
+        position = (error.line, error.column)
+        if position in starts:
+            anchors.append((starts[position], 0))
+        elif position in ends:
+            index = ends[position]
+            anchors.append((index, len(token_list[index].value)))
+        else:
+            return None
+    return anchors
+
+
+class IncrementalParser:
+    """
+    Reparseia apenas as declarações de topo que mudaram desde o último
+    parsing.
+
+    Os tokens (com os 'ERROR', como no parsing completo) são divididos nas
+    fronteiras das declarações de topo (split_declarations) e cada trecho
+    é identificado pelo hash de seus tokens. Como no parsing em trechos de
+    parser.parallel, os trechos são parseados em grupos que terminam
+    limpos (ChunkResult.clean_end): o parser serial chegaria ao fim do
+    grupo no mesmo estado em que começa o seguinte. Um grupo que não
+    termina limpo é estendido aos trechos seguintes até terminar limpo ou
+    chegar ao fim do texto.
+
+    Grupos já vistos, com os mesmos trechos e na mesma situação (inicial
+    ou não, limpo ou no fim do texto), reaproveitam as declarações e os
+    erros em cache, apenas com as posições dos erros refeitas; só os novos
+    passam pelo parser, mesmo que outros grupos tenham erros. As sugestões
+    para identificadores e o limite de erros sintáticos são refeitos sobre
+    o texto inteiro (ver parser.parallel), então o resultado é o mesmo de
+    parse_ontology.
+    """
+
+    def __init__(self, text: str = "", backend: Optional[str] = None):
+        self._lexer = IncrementalLexer(text, backend=backend, include_error_tokens=True)
+        # Grupos do último parsing, pelo span_key do primeiro trecho
+        self._groups: Dict[bytes, List[ParsedGroup]] = {}
+        # Estatísticas do último parsing, em trechos
+        self.reparsed = 0
+        self.reused = 0
+
+    @property
+    def text(self) -> str:
+        return self._lexer.text
+
+    def update(self, text: str) -> Dict[str, Any]:
+        """
+        Faz o parsing de um novo texto completo, reaproveitando as
+        declarações inalteradas. O trecho entre o prefixo e o sufixo em
+        comum com o texto anterior é aplicado como uma edição
+        (apply_edit), então só as linhas alteradas são relexadas.
+        """
+        old_text = self._lexer.text
+        if text != old_text:
+            prefix = common_prefix_length(old_text, text)
+            suffix = common_suffix_length(old_text, text, min(len(old_text), len(text)) - prefix)
+            self._lexer.apply_edit(prefix, len(old_text) - prefix - suffix,
+                                   text[prefix:len(text) - suffix])
+        return self._reparse()
+
+    def apply_edit(self, offset: int, removed: int, inserted: str) -> Dict[str, Any]:
+        """Aplica a edição (ver IncrementalLexer.apply_edit) e refaz o parsing"""
+        self._lexer.apply_edit(offset, removed, inserted)
+        return self._reparse()
+
+    def _reparse(self) -> Dict[str, Any]:
+        # Só tipos e valores importam para dividir e identificar os
+        # trechos; as posições vêm de token_slice()/token_at(), só para os
+        # grupos parseados e os erros
+        token_list = self._lexer.raw_tokens
+        spans = split_declarations(token_list)
+        keys = [span_key(token_list[start:end]) for start, end in spans]
+        self.reparsed = self.reused = 0
+
+        groups: Dict[bytes, List[ParsedGroup]] = {}
+        parts: List[ChunkResult] = []
+        index = 0
+        while index < len(spans):
+            group = self._cached_group(keys, index)
+            if group is None:
+                group = self._parse_group(spans, keys, index)
+                self.reparsed += len(group.keys)
+            else:
+                self.reused += len(group.keys)
+            if group.anchors is not None:
+                groups.setdefault(keys[index], []).append(group)
+            parts.append(self._place(group, spans[index][0]))
+            index += len(group.keys)
+
+        # Apenas os grupos do texto atual permanecem em cache
+        self._groups = groups
+        return self._build_result(parts)
+
+    def _cached_group(self, keys: List[bytes], index: int) -> Optional[ParsedGroup]:
+        for group in self._groups.get(keys[index], ()):
+            end = index + len(group.keys)
+            if (group.first == (index == 0) and end <= len(keys)
+                    and (group.part.clean_end or end == len(keys))
+                    and tuple(keys[index:end]) == group.keys):
+                return group
+        return None
+
+    def _parse_group(self, spans: List[Tuple[int, int]], keys: List[bytes], index: int) -> ParsedGroup:
+        # O grupo vai até o início do próximo grupo em cache
+        last = index
+        while (last + 1 < len(spans) and last + 1 - index < GROUP_MAX_SPANS
+               and self._cached_group(keys, last + 1) is None):
+            last += 1
+        while True:
+            token_list = self._lexer.token_slice(spans[index][0], spans[last][1])
+            part = parse_chunk_tokens(token_list, first=index == 0)
+            if part.clean_end or last == len(spans) - 1:
+                break
+            # Dobra o grupo, para não reparsear muitas vezes uma sequência
+            # longa de trechos com erros
+            last = min(len(spans) - 1, 2 * last - index + 1)
+        return ParsedGroup(tuple(keys[index:last + 1]), index == 0, part,
+                           _anchor_errors(token_list, part.syntactic_errors))
+
+    def _place(self, group: ParsedGroup, start: int) -> ChunkResult:
+        """Cópia do resultado do grupo com os erros nas posições do texto atual"""
+        if group.anchors is None:
+            # Grupo que não fica em cache: acabou de ser parseado no texto atual
+            errors = [replace(error) for error in group.part.syntactic_errors]
+        else:
+            errors = []
+            for error, (index, delta) in zip(group.part.syntactic_errors, group.anchors):
+                tok = self._lexer.token_at(start + index)
+                errors.append(replace(error, line=tok.lineno, column=tok.token_pos + delta))
+        return replace(group.part, syntactic_errors=errors)
+
+    def _build_result(self, parts: List[ChunkResult]) -> Dict[str, Any]:
+        session = ParserSession()
+        report = session.error_report
+        session.report_lexical_errors(self._lexer.errors)
+        declarations = [decl for part in parts for decl in part.declarations]
+        suggest_earlier_names(parts)
+        report.syntactic_errors = merge_syntactic_errors(parts)
+
+        result = session.build_result(parts[0].package, parts[0].imports, declarations)
+        result['tokens'] = self._lexer.token_buffer()
+        result['lexical_errors'] = list(self._lexer.errors)
+        result['syntactic_errors'] = list(report.syntactic_errors)
+        return result
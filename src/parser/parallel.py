@@ -0,0 +1,347 @@
+import multiprocessing
+import os
+import re
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from lexer.lexer import HYPHENATED_TERMS, RESERVED, LexerError, Token, create_lexer
+from lexer.token_buffer import TokenBuffer
+from parser.ast_nodes import Declaration
+from parser.parser import (
+    BLOCK_SYNC_TOKENS,
+    DECLARATION_START_TOKENS,
+    GENSET_RESTRICTION_TOKENS,
+    SYNTAX_ERROR_LIMIT,
+    SYNTAX_ERROR_LIMIT_MESSAGE,
+    ParseError,
+    ParserSession,
+    parse_ontology,
+)
+from parser.utils import SuggestionIndex, generate_smart_suggestion
+
+# Abaixo deste tamanho o custo de subir os processos supera o ganho
+SPLIT_MIN_CHARS = 1 << 20
+# Trechos por processo: trechos menores equilibram melhor a carga, mas
+# cada um tem um custo fixo (processo, pickle do resultado)
+CHUNKS_PER_WORKER = 4
+
+# Pré-passo: comentários (para ignorar as chaves dentro deles), chaves e o
+# primeiro lexema de cada linha, com as mesmas regras do TontoLexer.
+# Nenhum token atravessa uma quebra de linha, então o início de uma linha é
+# sempre uma fronteira entre tokens
+_PREPASS_REGEX = re.compile(
+    r"/\*.*?\*/|//[^\n]*|(?P<open>\{)|(?P<close>\})"
+    r"|^[ \t]*(?P<word>[a-zA-Z][a-zA-Z0-9]*(?:-[a-zA-Z0-9]+)+|[a-zA-Z_][a-zA-Z0-9_]*|@)",
+    re.MULTILINE,
+)
+_SPLIT_TOKENS = DECLARATION_START_TOKENS | GENSET_RESTRICTION_TOKENS
+
+
+# Pacote fictício que torna um trecho isolado uma ontologia válida
+PACKAGE_PREFIX = (
+    Token(type='PACKAGE_KW', value='package', lineno=0, lexpos=0, token_pos=0),
+    Token(type='IDENTIFIER', value='_', lineno=0, lexpos=0, token_pos=0),
+)
+
+
+def split_declarations(token_list: Sequence[Token]) -> List[Tuple[int, int]]:
+    """
+    Divide os tokens em trechos [início, fim) nas fronteiras das
+    declarações de topo.
+
+    O primeiro trecho é o preâmbulo (imports e package, possivelmente
+    vazio); cada um dos demais começa em um token de
+    DECLARATION_START_TOKENS, ou na primeira restrição de um genset, fora
+    de qualquer par de chaves. Como em TokenStream, um token de
+    BLOCK_SYNC_TOKENS fecha os blocos abertos (só muda algo em textos com
+    um '}' faltando).
+    """
+    bounds = [0]
+    depth = 0
+    previous = None
+    for index, tok in enumerate(token_list):
+        kind = tok.type
+        if kind in BLOCK_SYNC_TOKENS:
+            depth = 0
+        if depth == 0:
+            if kind in GENSET_RESTRICTION_TOKENS:
+                if previous not in GENSET_RESTRICTION_TOKENS:
+                    bounds.append(index)
+            elif kind in DECLARATION_START_TOKENS:
+                if not (kind == 'GENSET_KW' and previous in GENSET_RESTRICTION_TOKENS):
+                    bounds.append(index)
+
+        if kind == 'OPEN_BRACE':
+            depth += 1
+        elif kind == 'CLOSE_BRACE' and depth:
+            depth -= 1
+        previous = kind
+
+    bounds.append(len(token_list))
+    return list(zip(bounds, bounds[1:]))
+
+
+def _token_type(word: str) -> Optional[str]:
+    if word == '@':
+        return 'AT'
+    if '-' in word:
+        return HYPHENATED_TERMS.get(word)
+    return RESERVED.get(word, 'IDENTIFIER')
+
+
+def find_split_points(data: str, target: int) -> List[int]:
+    """
+    Offsets onde o texto pode ser cortado, a cada `target` caracteres
+    aproximadamente: inícios de linha fora de chaves cujo primeiro token
+    inicia uma declaração de topo (DECLARATION_START_TOKENS ou uma
+    restrição de genset). As chaves são contadas como em TokenStream,
+    que considera fechados os blocos abertos ao encontrar um token de
+    BLOCK_SYNC_TOKENS.
+
+    É só uma varredura com uma regex, sem tokenizar o texto; um corte
+    ruim (ex.: entre 'disjoint' e 'genset' em linhas diferentes) é
+    detectado depois pelo trecho anterior, que não termina limpo.
+    """
+    points = []
+    depth = 0
+    last = 0
+    for match in _PREPASS_REGEX.finditer(data):
+        kind = match.lastgroup
+        if kind == 'open':
+            depth += 1
+        elif kind == 'close':
+            if depth:
+                depth -= 1
+        elif kind == 'word':
+            token_type = _token_type(match.group('word'))
+            if token_type in BLOCK_SYNC_TOKENS:
+                # Como em TokenStream: um '}' esquecido não impede os cortes seguintes
+                depth = 0
+            start = match.start()
+            if depth == 0 and start - last >= target and token_type in _SPLIT_TOKENS:
+                points.append(start)
+                last = start
+    return points
+
+
+@dataclass
+class ChunkResult:
+    """Parsing de um trecho do arquivo; linhas e colunas já são as do arquivo inteiro"""
+    package: Optional[str]
+    imports: List[str]
+    declarations: List[Declaration]
+    tokens: TokenBuffer = field(default_factory=TokenBuffer)
+    lexical_errors: List[LexerError] = field(default_factory=list)
+    lexical_reports: List[ParseError] = field(default_factory=list)
+    syntactic_errors: List[ParseError] = field(default_factory=list)
+    syntax_error_count: int = 0
+    # Ver ParserSession.declared_names e identifier_errors
+    declared_names: List[str] = field(default_factory=list)
+    identifier_errors: List[Tuple[int, str, Tuple[str, ...], int]] = field(default_factory=list)
+    # O trecho termina em uma declaração completa e sem erros: o parser
+    # serial estaria, neste ponto, no mesmo estado em que começa o próximo
+    clean_end: bool = False
+
+
+def parse_chunk(data: str, lineno: int = 1, first: bool = True) -> ChunkResult:
+    """
+    Faz o parsing de um trecho que começa no início da linha `lineno`.
+
+    Os trechos seguintes ao primeiro não têm package; o parser recebe
+    antes deles o PACKAGE_PREFIX, e chega ao início do trecho no mesmo
+    estado em que o parser serial chega entre duas declarações.
+    """
+    lexer = create_lexer()
+    token_list = list(lexer.tokenize(data, include_error_tokens=True, lineno=lineno))
+    part = parse_chunk_tokens(token_list, first, lexer.errors)
+    part.tokens = TokenBuffer.from_tokens([tok for tok in token_list if tok.type != 'ERROR'], data)
+    return part
+
+
+def parse_chunk_tokens(token_list: List[Token], first: bool = True,
+                       lexical_errors: Sequence[LexerError] = ()) -> ChunkResult:
+    """
+    Parsing de um trecho já tokenizado, com os tokens 'ERROR' (ver
+    parse_chunk). O resultado não traz os tokens; os erros léxicos
+    informados entram em lexical_errors e lexical_reports.
+    """
+    session = ParserSession()
+    session.report_lexical_errors(lexical_errors)
+    result = session.parse_tokens(token_list if first else [*PACKAGE_PREFIX, *token_list])
+    if result is None:
+        result = session.build_result(session.package_name, session.imports, session.declarations)
+
+    declarations = result['declarations']
+    errors = session.error_report.syntactic_errors
+    return ChunkResult(
+        package=result['package'],
+        imports=result['imports'],
+        declarations=declarations,
+        lexical_errors=list(lexical_errors),
+        lexical_reports=list(session.error_report.lexical_errors),
+        syntactic_errors=list(errors),
+        syntax_error_count=session.syntax_error_count,
+        declared_names=list(session.declared_names),
+        identifier_errors=session.identifier_errors,
+        clean_end=_ends_clean(token_list, declarations, errors, prefixed=not first),
+    )
+
+
+def _ends_clean(token_list, declarations: List[Declaration], errors: List[ParseError],
+                prefixed: bool = False) -> bool:
+    """
+    A última declaração de topo do trecho não tem erros a partir do seu
+    primeiro token e é a mesma que se obtém fazendo o parsing dela
+    sozinha: o parser a reduziu normalmente, e um erro anterior já foi
+    encerrado por uma produção de recuperação (que chama errok).
+    """
+    spans = split_declarations(token_list)
+    if len(spans) < 2 or not declarations:
+        return False
+    start = token_list[spans[-1][0]]
+    if any((error.line, error.column) >= (start.lineno, start.token_pos) for error in errors):
+        return False
+    if prefixed and spans[-1][0] == 0:
+        # O trecho é só a última declaração, já parseada sozinha
+        return True
+
+    session = ParserSession()
+    alone = session.parse_tokens([*PACKAGE_PREFIX, *token_list[spans[-1][0]:]])
+    return (alone is not None and not session.error_report.has_errors()
+            and alone['declarations'] == declarations[-1:])
+
+
+def suggest_earlier_names(parts: List[ChunkResult]):
+    """
+    Os erros em identificadores de cada trecho só tiveram como sugestão os
+    nomes declarados no próprio trecho; refaz as sugestões com os nomes
+    declarados antes do erro em todo o arquivo, como no parsing serial
+    """
+    # Os nomes só crescem ao longo do texto: um único índice recebe, a cada
+    # erro, os nomes declarados desde o erro anterior
+    names = SuggestionIndex([()])
+    pending: List[str] = []  # nomes ainda fora do índice
+    count = 0  # erros sintáticos dos trechos anteriores
+    for part in parts:
+        if count >= SYNTAX_ERROR_LIMIT:
+            break  # os erros seguintes são descartados por merge_syntactic_errors
+        added = 0
+        if len(names) or pending:
+            for index, value, exclude, known in part.identifier_errors:
+                if count + index >= SYNTAX_ERROR_LIMIT:
+                    break
+                names.add([*pending, *part.declared_names[added:known]])
+                pending = []
+                added = known
+                part.syntactic_errors[index].suggestion = generate_smart_suggestion(
+                    value, 'IDENTIFIER', identifiers=names, exclude=exclude)
+        pending.extend(part.declared_names[added:])
+        count += part.syntax_error_count
+
+
+def merge_syntactic_errors(parts: List[ChunkResult]) -> List[ParseError]:
+    """
+    Concatena os erros dos trechos aplicando SYNTAX_ERROR_LIMIT ao total,
+    como ParserSession._add_syntax_error faria no parsing serial
+    """
+    errors: List[ParseError] = []
+    count = 0
+    for part in parts:
+        # Cada trecho guarda até SYNTAX_ERROR_LIMIT + 1 erros; basta o
+        # suficiente para chegar a esse número no total
+        errors.extend(part.syntactic_errors[:max(0, SYNTAX_ERROR_LIMIT + 1 - count)])
+        count += part.syntax_error_count
+    if count > SYNTAX_ERROR_LIMIT:
+        overflow = errors[SYNTAX_ERROR_LIMIT]
+        errors[SYNTAX_ERROR_LIMIT:] = [
+            ParseError(overflow.line, overflow.column, SYNTAX_ERROR_LIMIT_MESSAGE, "SYNTACTIC")
+        ]
+    return errors
+
+
+def _build_result(parts: List[ChunkResult]) -> Dict[str, Any]:
+    session = ParserSession()
+    report = session.error_report
+    declarations: List[Declaration] = []
+    tokens = TokenBuffer()
+    lexical_errors: List[LexerError] = []
+    for part in parts:
+        declarations.extend(part.declarations)
+        tokens.extend(part.tokens)
+        lexical_errors.extend(part.lexical_errors)
+        report.lexical_errors.extend(part.lexical_reports)
+    suggest_earlier_names(parts)
+    report.syntactic_errors = merge_syntactic_errors(parts)
+
+    result = session.build_result(parts[0].package, parts[0].imports, declarations)
+    result['tokens'] = tokens
+    result['lexical_errors'] = lexical_errors
+    result['syntactic_errors'] = list(report.syntactic_errors)
+    return result
+
+
+def parse_ontology_parallel(data: str, max_workers: Optional[int] = None,
+                            parallel: Optional[bool] = None,
+                            executor: Optional[Executor] = None) -> Dict[str, Any]:
+    """
+    Parsing de um único arquivo grande em um pool de processos, com o
+    mesmo resultado de parse_ontology(data).
+
+    O texto é cortado em inícios de linha fora de chaves onde começa uma
+    declaração de topo (find_split_points), cada trecho é tokenizado e
+    parseado em um processo (parse_chunk) e as listas de declarações,
+    tokens e erros são concatenadas, já com as linhas do arquivo inteiro.
+
+    Um trecho que não termina limpo (declaração cortada ao meio, ou com
+    erro que a recuperação poderia estender ao trecho seguinte) é juntado
+    ao seguinte e os dois são reparseados, até o trecho terminar limpo ou
+    chegar ao fim do arquivo; assim a recuperação de erros e o limite de
+    erros sintáticos dão o mesmo resultado do parsing serial.
+
+    Textos menores que SPLIT_MIN_CHARS, ou com um único processo, vão
+    direto para parse_ontology, a menos que `parallel` seja informado.
+    Com `executor`, os trechos são parseados nele (ex.: um pool
+    reaproveitado entre vários arquivos) em vez de em um pool novo.
+    """
+    workers = max_workers or os.cpu_count() or 1
+    if parallel is None:
+        parallel = workers >= 2 and len(data) >= SPLIT_MIN_CHARS
+    if not parallel:
+        return parse_ontology(data)
+
+    points = find_split_points(data, max(1, len(data) // (workers * CHUNKS_PER_WORKER)))
+    if not points:
+        return parse_ontology(data)
+
+    bounds = [0, *points, len(data)]
+    linenos = [1]
+    for start, end in zip(bounds, bounds[1:-1]):
+        linenos.append(linenos[-1] + data.count('\n', start, end))
+    chunks: List[Tuple[str, int, bool]] = [
+        (data[start:end], lineno, index == 0)
+        for index, (start, end, lineno) in enumerate(zip(bounds, bounds[1:], linenos))
+    ]
+
+    if executor is not None:
+        results = list(executor.map(parse_chunk, *zip(*chunks)))
+    else:
+        # 'spawn', como em core.batch.analyze_sources
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            results = list(pool.map(parse_chunk, *zip(*chunks)))
+
+    parts: List[ChunkResult] = []
+    index = 0
+    while index < len(results):
+        part = results[index]
+        end = index
+        while not part.clean_end and end + 1 < len(results):
+            end += 1
+            while not results[end].clean_end and end + 1 < len(results):
+                end += 1
+            part = parse_chunk(data[bounds[index]:bounds[end + 1]], linenos[index], index == 0)
+        parts.append(part)
+        index = end + 1
+
+    return _build_result(parts)
@@ -1,19 +1,59 @@
+import copy
+import os
+import sys
+import threading
 from dataclasses import dataclass
-from typing import Any, Dict, List
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 
 from ply import yacc
 
 from lexer.lexer import (
+    LexerError,
     Token,
     TontoLexer,
+    create_lexer,
     tokens,
 )
-from parser.utils import find_similar_token, generate_smart_suggestion
+from lexer.token_buffer import TokenBuffer
+from parser.ast_nodes import (
+    AttributeDecl,
+    Cardinality,
+    ClassDecl,
+    DatatypeDecl,
+    Declaration,
+    EnumDecl,
+    GensetDecl,
+    RelationConnector,
+    RelationDecl,
+)
+from parser.utils import SuggestionIndex, find_similar_token, generate_smart_suggestion
 
 _ = Token, tokens
 
-errors = []
-warnings = []
+# Tokens que iniciam uma declaração de topo e restrições que precedem 'genset'
+DECLARATION_START_TOKENS = frozenset({
+    'CLASS_STEREOTYPE', 'GENSET_KW', 'AT', 'ENUM_KW', 'DATATYPE_KW',
+})
+GENSET_RESTRICTION_TOKENS = frozenset({
+    'DISJOINT_KW', 'COMPLETE_KW', 'INCOMPLETE_KW', 'OVERLAPPING_KW',
+})
+# Tokens que iniciam o preâmbulo (imports e package)
+PREAMBLE_START_TOKENS = frozenset({'PACKAGE_KW', 'IMPORT_KW'})
+# Pontos de sincronização da recuperação de erros (quando fora de chaves)
+SYNC_TOKENS = DECLARATION_START_TOKENS | GENSET_RESTRICTION_TOKENS | PREAMBLE_START_TOKENS
+# Tokens de SYNC_TOKENS que nunca aparecem dentro de chaves ('@' aparece nas
+# relações internas): encontrá-los fecha os blocos abertos, então um '}'
+# esquecido não faz a recuperação descartar o resto do arquivo
+BLOCK_SYNC_TOKENS = SYNC_TOKENS - {'AT'}
+
+# Declarações cujo nome pode ser usado como tipo; sugeridos nos erros sintáticos
+NAMED_TYPE_DECLARATIONS = (ClassDecl, DatatypeDecl, EnumDecl)
+
+# Máximo de erros sintáticos registrados por arquivo
+SYNTAX_ERROR_LIMIT = int(os.environ.get('TONTO_MAX_SYNTAX_ERRORS', '100'))
+SYNTAX_ERROR_LIMIT_MESSAGE = f"Limite de {SYNTAX_ERROR_LIMIT} erros sintáticos atingido; os erros seguintes foram omitidos"
+
 
 @dataclass
 class ParseError:
@@ -41,8 +81,8 @@ class OntologySummary:
         self.classes: Dict[str, Dict] = {}  # {nome: {stereotype, attributes, relations, specializes}}
         self.datatypes: List[str] = []
         self.enums: Dict[str, List[str]] = {}  # {nome: [valores]}
-        self.gensets: List[Dict] = []
-        self.external_relations: List[Dict] = []
+        self.gensets: List[GensetDecl] = []
+        self.external_relations: List[RelationDecl] = []
 
     def add_class(self, name: str, stereotype: str, specializes=None, category=None):
         if name not in self.classes:
@@ -58,10 +98,35 @@ class OntologySummary:
         if class_name in self.classes:
             self.classes[class_name]['attributes'].append({'name': attr_name, 'type': attr_type})
 
-    def add_relation_to_class(self, class_name: str, relation: Dict):
+    def add_relation_to_class(self, class_name: str, relation: RelationDecl):
         if class_name in self.classes:
             self.classes[class_name]['relations'].append(relation)
 
+    def add_declarations(self, declarations: Iterable[Declaration]):
+        """Coleta as estatísticas de uma lista de declarações"""
+        for decl in declarations:
+            if isinstance(decl, ClassDecl):
+                self.add_class(decl.name, decl.stereotype, decl.specializes, decl.category)
+                for attr in decl.attributes:
+                    self.add_attribute_to_class(decl.name, attr.name, attr.datatype)
+                for rel in decl.relations:
+                    self.add_relation_to_class(decl.name, rel)
+
+            elif isinstance(decl, DatatypeDecl):
+                self.datatypes.append(decl.name)
+
+            elif isinstance(decl, EnumDecl):
+                self.enums[decl.name] = decl.values
+
+            elif isinstance(decl, GensetDecl):
+                self.gensets.append(decl)
+
+            elif isinstance(decl, RelationDecl):
+                self.external_relations.append(decl)
+
+    def __str__(self):
+        return self.get_summary_table()
+
     def get_summary_table(self) -> str:
         """Gera tabela de síntese formatada"""
         lines = []
@@ -92,13 +157,13 @@ class OntologySummary:
                     stereotype_str += f" of {class_info['category']}"
                 lines.append(f"\n  • {class_name} [{stereotype_str}]")
                 if class_info['specializes']:
-                    lines.append(f"    Especializa: {class_info['specializes']}")
+                    lines.append(f"    Especializa: {', '.join(class_info['specializes'])}")
                 lines.append(f"    Atributos ({len(class_info['attributes'])}):")
                 for attr in class_info['attributes']:
                     lines.append(f"      - {attr['name']}: {attr['type']}")
                 lines.append(f"    Relações internas ({len(class_info['relations'])}):")
                 for rel in class_info['relations']:
-                    lines.append(f"      - {rel['relation_stereotype']} -> {rel['image']}")
+                    lines.append(f"      - {rel.relation_stereotype} -> {rel.image}")
         else:
             lines.append("  (nenhuma)")
 
@@ -122,8 +187,8 @@ class OntologySummary:
         lines.append(f"\nGENERALIZATION SETS ({len(self.gensets)}):")
         if self.gensets:
             for genset in self.gensets:
-                restrictions = ', '.join(genset['genset_restrictions']) if genset['genset_restrictions'] else 'nenhuma'
-                lines.append(f"  • {genset['name']}: {genset['general']} -> {', '.join(genset['specifics'])}")
+                restrictions = ', '.join(genset.restrictions) if genset.restrictions else 'nenhuma'
+                lines.append(f"  • {genset.name}: {genset.general} -> {', '.join(genset.specifics)}")
                 lines.append(f"    Restrições: {restrictions}")
         else:
             lines.append("  (nenhum)")
@@ -132,7 +197,7 @@ class OntologySummary:
         lines.append(f"\nRELAÇÕES EXTERNAS ({len(self.external_relations)}):")
         if self.external_relations:
             for rel in self.external_relations:
-                lines.append(f"  • {rel['relation_stereotype']}: {rel['domain']} -> {rel['image']}")
+                lines.append(f"  • {rel.relation_stereotype}: {rel.domain} -> {rel.image}")
         else:
             lines.append("  (nenhuma)")
 
@@ -155,6 +220,9 @@ class ErrorReport:
     def has_errors(self) -> bool:
         return len(self.lexical_errors) > 0 or len(self.syntactic_errors) > 0
 
+    def __str__(self):
+        return self.get_error_report()
+
     def get_error_report(self) -> str:
         """Gera relatório de erros formatado"""
         lines = []
@@ -188,79 +256,31 @@ class ErrorReport:
 
         return "\n".join(lines)
 
-# Instâncias globais
-summary = OntologySummary()
-error_report = ErrorReport()
-
 # Regra principal que define a estrutura de uma ontologia
 def p_ontology(p):
     """ontology : imports package declarations"""
-    package_name = None
-    imports = []
-    declarations = []
-
-    if len(p) == 4:
-        imports = p[1]
-        package_name = p[2]
-        declarations = p[3]
-    elif len(p) == 3:
-        imports = p[1]
-        declarations = p[2]
-
-    # Preencher sumário
-    summary.package_name = package_name
-    summary.imports = imports
-
-    # Processar declarações para coleta de estatísticas
-    current_class = None
-    for decl in declarations:
-        if decl['type'] in ['kind', 'category', 'subkind', 'role', 'phase', 'mixin',
-                            'roleMixin', 'phaseMixin', 'mode', 'quality', 'collective',
-                            'quantity', 'event', 'situation', 'process', 'historicalRole',
-                            'historicalRoleMixin', 'intrinsicMode', 'extrinsicMode', 'relator']:
-            # É uma classe
-            current_class = decl['name']
-            summary.add_class(decl['name'], decl['type'], decl.get('specializes'), decl.get('category'))
-
-            if decl.get('content'):
-                for attr in decl['content'].get('attributes', []):
-                    summary.add_attribute_to_class(current_class, attr['name'], attr['datatype'])
-                for rel in decl['content'].get('relations', []):
-                    summary.add_relation_to_class(current_class, rel)
-
-        elif decl['type'] == 'datatype':
-            summary.datatypes.append(decl['name'])
-
-        elif decl['type'] == 'enum':
-            summary.enums[decl['name']] = decl['values']
-
-        elif decl['type'] == 'genset':
-            summary.gensets.append(decl)
-
-        elif decl['type'] == 'relation_external':
-            summary.external_relations.append(decl)
-
-    p[0] = {
-        'package': package_name,
-        'imports': imports,
-        'declarations': declarations,
-        'summary': summary.get_summary_table(),
-        'error_report': error_report.get_error_report(),
-        'has_errors': error_report.has_errors(),
-    }
+    p[0] = p.parser.session.build_result(p[2], p[1], p[3])
 
 
 # Lista de declarações (classes, enums, gensets, etc.)
-# Retorna lista com declarações ou lista vazia
+# Retorna lista com declarações ou lista vazia. A sessão guarda a mesma
+# lista, para não perder as declarações completas se o parsing for
+# abandonado no fim do arquivo
 def p_declarations(p):
     """
     declarations : declarations declaration
                  | empty
     """
     if len(p) == 3:
-        p[0] = p[1] + [p[2]]
+        session = p.parser.session
+        if session.on_declaration is not None:
+            # Parsing em streaming: a declaração é entregue e não fica na lista
+            session.on_declaration(p[2])
+        elif p[2] is not None:
+            p[1].append(p[2])
+        p[0] = p[1]
     else:
-        p[0] = []
+        p[0] = p.parser.session.declarations = []
 
 
 # Define os tipos de declaração válidos na linguagem
@@ -272,16 +292,25 @@ def p_declaration(p):
                    | relation_external
     """
     p[0] = p[1]
+    if isinstance(p[1], NAMED_TYPE_DECLARATIONS):
+        p.parser.session.declared_names[p[1].name] = None
+
+
+# Recuperação de erros: a declaração com erro é descartada (None) e o
+# parsing recomeça no próximo token que inicia uma declaração. O errok
+# encerra a recuperação: os tokens até aqui já foram descartados por
+# TokenStream.skip_to_sync, então o próximo erro é um erro novo e deve ser
+# reportado, mesmo que o PLY ainda não tenha empilhado três tokens
+def p_declaration_error(p):
+    """declaration : error"""
+    p[0] = None
+    p.parser.errok()
 
 
 # Declaração de tipo de dados personalizado
 def p_datatype_declarion(p):
     """datatype_declaration : DATATYPE_KW USER_TYPE OPEN_BRACE attr_list CLOSE_BRACE"""
-    p[0] = {
-        "type": "datatype",
-        "name": p[2],
-        "attributes": p[4],
-    }
+    p[0] = DatatypeDecl(name=p[2], attributes=p[4])
 
 
 # Tipos de dados (nativos ou definidos pelo usuário)
@@ -301,9 +330,11 @@ def p_imports(p):
             | empty
     """
     if len(p) == 3:
-        p[0] = p[1] + [p[2]]
+        if p[2] is not None:
+            p[1].append(p[2])
+        p[0] = p[1]
     else:
-        p[0] = []
+        p[0] = p.parser.session.imports = []
 
 
 # Declaração de import de um pacote
@@ -312,10 +343,24 @@ def p_import(p):
     p[0] = p[2]
 
 
+# Import inválido: descartado até o próximo import ou package
+def p_import_error(p):
+    """import : IMPORT_KW error"""
+    p[0] = None
+    p.parser.errok()
+
+
 # Declaração do nome do pacote
 def p_package(p):
     """package : PACKAGE_KW IDENTIFIER"""
-    p[0] = p[2]
+    p[0] = p.parser.session.package_name = p[2]
+
+
+# Package ausente ou inválido: as declarações seguintes ainda são analisadas
+def p_package_error(p):
+    """package : error"""
+    p[0] = None
+    p.parser.errok()
 
 
 # ============== Class ==============
@@ -329,35 +374,22 @@ def p_class_declaration(p):
     '''
 
     if len(p) == 4:
-        p[0] = {
-            "type": "class",
-            "stereotype": p[1],
-            "name": p[2],
-            "content": p[3],
-        }
+        p[0] = _class_decl(p[1], p[2], body=p[3])
     elif len(p) == 3:
-        p[0] = {
-            "type": "class",
-            "stereotype": p[1],
-            "name": p[2],
-            "content": None,
-        }
+        p[0] = _class_decl(p[1], p[2])
     elif len(p) == 6:
-        p[0] = {
-            "type": "class",
-            "stereotype": p[1],
-            'name': p[2],
-            'category': p[4],
-            'content': p[5],
-        }
+        p[0] = _class_decl(p[1], p[2], category=p[4], body=p[5])
     else:  # len(p) == 5
-        p[0] = {
-            "type": "class",
-            "stereotype": p[1],
-            'name': p[2],
-            'category': p[4],
-            'content': None,
-        }
+        p[0] = _class_decl(p[1], p[2], category=p[4])
+
+
+# Monta o ClassDecl; body é a tupla (atributos, relações) de class_body
+def _class_decl(stereotype, name, category=None, specializes=None, body=None):
+    decl = ClassDecl(stereotype=stereotype, name=name, category=category, specializes=specializes)
+    if body is not None:
+        decl.attributes, decl.relations = body
+        decl.has_body = True
+    return decl
 
 
 def p_class_body(p):
@@ -367,25 +399,22 @@ def p_class_body(p):
     relations = []
 
     for item in p[2]:
-        if item is None:
-            continue
-        if item["type"] == "attribute":
+        if isinstance(item, AttributeDecl):
             attributes.append(item)
-        elif item["type"] == "relation_internal":
+        elif isinstance(item, RelationDecl):
             relations.append(item)
 
-    p[0] = {
-        "attributes": attributes,
-        "relations": relations,
-    }
+    p[0] = (attributes, relations)
 
 
+# Recursão à esquerda: a pilha do LALR não cresce com o número de membros
 def p_class_attribute_and_relation_list(p):
-    """class_attribute_and_relation_list : class_attribute_and_relation class_attribute_and_relation_list
+    """class_attribute_and_relation_list : class_attribute_and_relation_list class_attribute_and_relation
                                          | class_attribute_and_relation
     """
     if len(p) == 3:
-        p[0] = [p[1]] + p[2]
+        p[1].append(p[2])
+        p[0] = p[1]
     else:
         p[0] = [p[1]]
 
@@ -406,39 +435,13 @@ def p_class_specialization(p):
     """
 
     if len(p) == 6:
-        p[0] = {
-            "type": "class",
-            "stereotype": p[1],
-            "name": p[2],
-            "specializes": p[4],
-            "content": p[5],
-        }
+        p[0] = _class_decl(p[1], p[2], specializes=p[4], body=p[5])
     elif len(p) == 5:
-        p[0] = {
-            "type": "class",
-            "stereotype": p[1],
-            "name": p[2],
-            "specializes": p[4],
-            "content": None,
-        }
+        p[0] = _class_decl(p[1], p[2], specializes=p[4])
     elif len(p) == 8:
-        p[0] = {
-            "type": "class",
-            "stereotype": p[1],
-            'name': p[2],
-            'category': p[4],
-            'specializes': p[6],
-            'content': p[7],
-        }
+        p[0] = _class_decl(p[1], p[2], category=p[4], specializes=p[6], body=p[7])
     else:  # len(p) == 7
-        p[0] = {
-            "type": "class",
-            "stereotype": p[1],
-            'name': p[2],
-            'category': p[4],
-            'specializes': p[6],
-            'content': None,
-        }
+        p[0] = _class_decl(p[1], p[2], category=p[4], specializes=p[6])
 
 # Retorna uma lista não vazia de identificadores
 def p_identifier_list(p):
@@ -447,7 +450,8 @@ def p_identifier_list(p):
     """
 
     if len(p) == 4:
-        p[0] = p[1] + [p[3]]
+        p[1].append(p[3])
+        p[0] = p[1]
     else:
         p[0] = [p[1]]
 
@@ -459,7 +463,8 @@ def p_attr_list(p):
               | empty
     """
     if len(p) == 3:
-        p[0] = p[1] + [p[2]]
+        p[1].append(p[2])
+        p[0] = p[1]
     else:
         p[0] = []
 
@@ -476,11 +481,20 @@ def p_attribute(p):
               | IDENTIFIER COLON IDENTIFIER cardinality meta_attributes
               | IDENTIFIER COLON IDENTIFIER meta_attributes
     """
-    p[0] = {
-        'type': 'attribute',
-        'name': p[1],
-        'datatype': p[3],
-    }
+    cardinality = None
+    meta_attributes = None
+    for item in p[4:]:
+        if isinstance(item, Cardinality):
+            cardinality = item
+        else:
+            meta_attributes = item
+
+    p[0] = AttributeDecl(
+        name=p[1],
+        datatype=p[3],
+        cardinality=cardinality,
+        meta_attributes=meta_attributes,
+    )
 
 
 # Metaatributos como ordered, const, derived, etc.
@@ -496,7 +510,8 @@ def p_relation_list(p):
                   | empty
     """
     if len(p) == 3:
-        p[0] = p[1] + [p[2]]
+        p[1].append(p[2])
+        p[0] = p[1]
     else:
         p[0] = []
 
@@ -508,7 +523,7 @@ def p_cardinality(p):
                    | OPEN_BRACKET NUMBER RANGE NUMBER CLOSE_BRACKET
                    | OPEN_BRACKET NUMBER RANGE MULTIPLICATION CLOSE_BRACKET
     """
-    p[0] = "".join(p[1:])
+    p[0] = Cardinality.from_tokens(p[1:])
 
 
 # =============== Enum ===============
@@ -519,11 +534,7 @@ def p_enum_declaration(p):
     """enum_declaration : ENUM_KW IDENTIFIER OPEN_BRACE enum_values CLOSE_BRACE"""
     # TODO: o identificador de instancia deve terminar com um número
 
-    p[0] = {
-        "type": "enum",
-        "name": p[2],
-        "values": p[4],
-    }
+    p[0] = EnumDecl(name=p[2], values=p[4])
 
 
 # Valor individual de uma enumeração
@@ -539,7 +550,8 @@ def p_enum_values(p):
                 | enum_value
     """
     if len(p) == 4:
-        p[0] = p[1] + [p[3]]
+        p[1].append(p[3])
+        p[0] = p[1]
     else:
         p[0] = [p[1]]
 
@@ -550,25 +562,13 @@ def p_enum_values(p):
 # Declaração de genset (conjunto de generalização)
 def p_genset_declaration(p):
     """genset_declaration : optional_genset_restrictions GENSET_KW IDENTIFIER OPEN_BRACE GENERAL_KW IDENTIFIER SPECIFICS_KW comma_separated_identifiers CLOSE_BRACE"""
-    p[0] = {
-        "type": "genset",
-        "genset_restrictions": p[1],
-        "name": p[3],
-        "specifics": p[8],
-        "general": p[6],
-    }
+    p[0] = GensetDecl(name=p[3], general=p[6], specifics=p[8], restrictions=p[1])
 
 
 # Declaração de genset na forma inline com restrições
 def p_genset_declaration_inline(p):
     """genset_declaration : optional_genset_restrictions GENSET_KW IDENTIFIER WHERE_KW comma_separated_identifiers SPECIALIZES_KW IDENTIFIER"""
-    p[0] = {
-        "type": "genset",
-        "genset_restrictions": p[1],
-        "name": p[3],
-        "specifics": p[5],
-        "general": p[7],
-    }
+    p[0] = GensetDecl(name=p[3], general=p[7], specifics=p[5], restrictions=p[1])
 
 
 # Lista opcional de restrições de genset (disjoint, complete, etc.)
@@ -578,7 +578,8 @@ def p_optional_genset_restrictions(p):
                                  | empty
     """
     if len(p) == 3:
-        p[0] = p[1] + [p[2]]
+        p[1].append(p[2])
+        p[0] = p[1]
     else:
         p[0] = []
 
@@ -604,7 +605,8 @@ def p_comma_separated_identifiers(p):
 
     if len(p) == 4:
         # Regra -> comma_separated_identifiers : comma_separated_identifiers COMMA IDENTIFIER
-        p[0] = p[1] + [p[3]]
+        p[1].append(p[3])
+        p[0] = p[1]
     else:
         # Regra -> comma_separated_identifiers : IDENTIFIER
         p[0] = [p[1]]
@@ -618,15 +620,14 @@ def p_relation_internal(p):
     """
     relation_internal : AT RELATION_STEREOTYPE cardinality relation_connector cardinality IDENTIFIER
     """
-    p[0] = {
-        "type": "relation_internal",
-        "relation_stereotype": p[2],
-        "connector": p[4],
-        "domain": None,
-        "domain_cardinality": p[3],
-        "image": p[6],
-        "image_cardinality": p[5],
-    }
+    p[0] = RelationDecl(
+        relation_stereotype=p[2],
+        connector=p[4],
+        domain=None,
+        domain_cardinality=p[3],
+        image=p[6],
+        image_cardinality=p[5],
+    )
 
 
 # Declaração de relações externa (fora do corpo das classes)
@@ -634,15 +635,15 @@ def p_relation_external(p):
     """
     relation_external : AT RELATION_STEREOTYPE RELATION_KW IDENTIFIER cardinality relation_connector cardinality IDENTIFIER
     """
-    p[0] = {
-        "type": "relation_external",
-        "relation_stereotype": p[2],
-        "connector": p[6],
-        "domain": p[4],
-        "domain_cardinality": p[5],
-        "image": p[8],
-        "image_cardinality": p[7],
-    }
+    p[0] = RelationDecl(
+        relation_stereotype=p[2],
+        connector=p[6],
+        domain=p[4],
+        domain_cardinality=p[5],
+        image=p[8],
+        image_cardinality=p[7],
+        external=True,
+    )
 
 
 # Conector de relação sem rótulo
@@ -652,7 +653,7 @@ def p_relation_connector_unlabeled(p):
                        | relation_connector_end
                        | DOUBLE_DASH
     """
-    p[0] = {"type": "relation_connector", "label": None, "connector": p[1]}
+    p[0] = RelationConnector(connector=p[1])
 
 
 # Conector de relação com rótulo à esquerda (agregação/composição).
@@ -663,7 +664,7 @@ def p_relation_connector_labeled_left(p):
     relation_connector : relation_connector_start IDENTIFIER DOUBLE_DASH
     """
 
-    p[0] = {"type": "relation_connector", "label": p[2], "connector": p[1]}
+    p[0] = RelationConnector(connector=p[1], label=p[2])
 
 
 # Conector de relação à direita com rótulo.
@@ -675,7 +676,7 @@ def p_relation_connector_labeled_right(p):
     relation_connector : DOUBLE_DASH IDENTIFIER relation_connector_end
                        | DOUBLE_DASH IDENTIFIER DOUBLE_DASH
     """
-    p[0] = {"type": "relation_connector", "label": p[2], "connector": p[3]}
+    p[0] = RelationConnector(connector=p[3], label=p[2])
 
 
 # Conectores de início de relação (agregação/composição)
@@ -699,105 +700,427 @@ def p_relation_connector_symbol_inverse(p):
 # ============= Parser Utils ==============
 
 
-def p_catch_error(p):
-    """
-    catch : error
-    """
-    print(p[1])
-
-
 # Regra para produções vazias
 def p_empty(p):
     """empty :"""
     pass
 
 
-# Trata erros sintáticos durante o parsing
+# Trata erros sintáticos durante o parsing.
+# O PLY exige p_error no módulo, mas o parser de cada ParserSession chama
+# diretamente ParserSession.handle_syntax_error, que também recebe o fim de
+# arquivo inesperado (p is None)
 def p_error(p):
-    if p:
-        # Gerar sugestão inteligente baseada no token
-        suggestion = generate_smart_suggestion(str(p.value), p.type)
+    if p is not None:
+        p.lexer.session.handle_syntax_error(p)
+
+
+# Produções de recuperação (X : ... error): o estado após o 'error' não pode
+# reduzir por padrão, sem olhar o lookahead, senão o PLY volta a encontrar o
+# mesmo token inválido a cada redução e não sai do lugar
+ERROR_PRODUCTIONS = ('declaration -> error', 'package -> error', 'import -> IMPORT_KW error')
+
+
+class TokenStream:
+    """
+    Fonte de tokens do parser em uma única passada sobre o texto.
 
-        error_report.add_syntactic_error(
+    Expõe o método token() esperado pelo PLY e, enquanto o parser consome
+    os tokens, guarda-os em um TokenBuffer e acumula os erros léxicos do
+    lexer, para que o texto nunca precise ser tokenizado duas vezes.
+    """
+
+    def __init__(self, data: str, lexer: Optional[TontoLexer] = None, on_exhausted=None,
+                 session: Optional['ParserSession'] = None):
+        lexer = lexer if lexer is not None else create_lexer()
+        # Tokens 'ERROR' seguem para o parser, como no lexer do PLY
+        self._init_stream(lexer.tokenize(data, include_error_tokens=True), TokenBuffer(data),
+                          lexer, on_exhausted, session)
+
+    def _init_stream(self, iterator: Iterator[Token], tokens: Optional[TokenBuffer],
+                     lexer: Optional[TontoLexer] = None, on_exhausted=None,
+                     session: Optional['ParserSession'] = None):
+        """Estado comum às fontes de tokens"""
+        self.session = session
+        self.lexer = lexer
+        self.tokens = tokens
+        self.on_exhausted = on_exhausted
+        self._exhausted = False
+        self._iterator = iterator
+        self._pending: Optional[Token] = None
+        self.depth = 0  # profundidade de chaves após o último token entregue
+        self.last_token: Optional[Token] = None
+
+    @property
+    def errors(self) -> List[LexerError]:
+        return self.lexer.errors
+
+    def token(self) -> Optional[Token]:
+        if self._pending is not None:
+            tok, self._pending = self._pending, None
+            return tok
+        return self._next_token()
+
+    def _next_token(self) -> Optional[Token]:
+        tok = next(self._iterator, None)
+        if tok is None:
+            self._finish()
+        elif tok.type != 'ERROR':
+            self._record(tok)
+            if tok.type == 'OPEN_BRACE':
+                self.depth += 1
+            elif tok.type == 'CLOSE_BRACE' and self.depth:
+                self.depth -= 1
+            elif tok.type in BLOCK_SYNC_TOKENS:
+                self.depth = 0
+            self.last_token = tok
+        return tok
+
+    def _record(self, tok: Token):
+        self.tokens.append(tok)
+
+    @property
+    def pending_token(self) -> Optional[Token]:
+        """Token já lido que será o próximo devolvido por token(), se houver"""
+        return self._pending
+
+    def push_back(self, tok: Token):
+        """Faz tok ser o próximo token devolvido por token()"""
+        self._pending = tok
+
+    def skip_to_sync(self) -> int:
+        """
+        Recuperação em modo pânico: descarta tokens até o próximo de
+        SYNC_TOKENS fora de chaves, que será o próximo devolvido por
+        token(). Retorna o número de tokens descartados.
+        """
+        skipped = 0
+        while True:
+            tok = self._next_token()
+            if tok is None:
+                return skipped
+            if self.depth == 0 and tok.type in SYNC_TOKENS:
+                self._pending = tok
+                return skipped
+            skipped += 1
+
+    def drain(self):
+        """Consome os tokens que o parser não chegou a pedir"""
+        while self.token() is not None:
+            pass
+
+    def _finish(self):
+        if not self._exhausted:
+            self._exhausted = True
+            if self.on_exhausted:
+                self.on_exhausted(self.errors)
+
+
+class TokenListStream(TokenStream):
+    """
+    Fonte de tokens de qualquer iterável (tokens já produzidos, para
+    reparsear trechos sem relexar, ou um gerador do lexer), sem guardá-los
+    """
+
+    def __init__(self, token_list: Iterable[Token]):
+        self._init_stream(iter(token_list), None)
+
+    @property
+    def errors(self) -> List[LexerError]:
+        return []
+
+    def _record(self, tok: Token):
+        pass
+
+
+# ============= Construção do Parser ==============
+
+# As tabelas LALR ficam em parser/parsetab.py, geradas pela etapa explícita
+# `python -m parser.build_tables`. O PLY só usa o arquivo se a versão das
+# tabelas e a assinatura da gramática baterem; caso contrário, gera as
+# tabelas em memória sem escrever nada em disco.
+PARSER_TABMODULE = 'parser.parsetab'
+PARSER_OUTPUT_DIR = os.path.dirname(os.path.abspath(__file__))
+PARSER_DEBUG = os.environ.get('TONTO_PARSER_DEBUG', '') not in ('', '0')
+
+_parser: Optional[yacc.LRParser] = None
+_parser_lock = threading.Lock()
+
+
+def build_tables(debug: bool = PARSER_DEBUG) -> str:
+    """Gera (ou regenera, se a gramática mudou) o parsetab.py do pacote"""
+    yacc.yacc(
+        module=sys.modules[__name__],
+        tabmodule=PARSER_TABMODULE,
+        outputdir=PARSER_OUTPUT_DIR,
+        debug=debug,
+        write_tables=True,
+    )
+    return os.path.join(PARSER_OUTPUT_DIR, 'parsetab.py')
+
+
+def get_parser() -> yacc.LRParser:
+    """
+    Retorna o parser LALR compartilhado, construído na primeira chamada.
+
+    Não deve ser usado diretamente para parsing: cada ParserSession faz
+    uma cópia rasa dele.
+    """
+    global _parser
+    if _parser is None:
+        with _parser_lock:
+            if _parser is None:
+                parser = yacc.yacc(
+                    module=sys.modules[__name__],
+                    tabmodule=PARSER_TABMODULE,
+                    outputdir=PARSER_OUTPUT_DIR,
+                    debug=PARSER_DEBUG,
+                    write_tables=False,
+                    errorlog=None if PARSER_DEBUG else yacc.NullLogger(),
+                )
+                _disable_error_default_reductions(parser)
+                _parser = parser
+    return _parser
+
+
+def _disable_error_default_reductions(parser: yacc.LRParser):
+    """Ver ERROR_PRODUCTIONS: os estados dessas reduções passam a consultar o lookahead"""
+    error_rules = {number for number, production in enumerate(parser.productions)
+                   if production.str in ERROR_PRODUCTIONS}
+    for state, action in list(parser.defaulted_states.items()):
+        if -action in error_rules:
+            del parser.defaulted_states[state]
+
+
+class ParserSession:
+    """
+    Estado de um único parsing: sumário, relatório de erros e a cópia do
+    parser que o executa.
+
+    As tabelas LALR (ações, gotos e produções) do parser do módulo são
+    compartilhadas e apenas lidas; o estado mutável do PLY (pilhas,
+    errorok) fica na cópia rasa da sessão. As ações da gramática chegam à
+    sessão por p.parser.session, então parsings em threads diferentes não
+    interferem entre si.
+    """
+
+    def __init__(self):
+        self.summary = OntologySummary()
+        self.error_report = ErrorReport()
+        self.parser = copy.copy(get_parser())
+        self.parser.session = self
+        self.parser.errorfunc = self.handle_syntax_error
+        self.stream: Optional[TokenStream] = None
+        self.syntax_error_count = 0
+        # Se definido, recebe cada declaração de topo (None se descartada
+        # pela recuperação de erros) em vez de acumulá-la; ver parser.streaming
+        self.on_declaration: Optional[Callable[[Optional[Declaration]], None]] = None
+        # Preenchidos pelas ações da gramática à medida que são reduzidos
+        self.package_name: Optional[str] = None
+        self.imports: List[str] = []
+        self.declarations: List[Declaration] = []
+        # Nomes de classes, datatypes e enums já declarados, na ordem do
+        # texto, sugeridos nos erros em identificadores
+        self.declared_names: Dict[str, None] = {}
+        self._names_index: Optional[SuggestionIndex] = None
+        # Erros em identificadores registrados: (índice em syntactic_errors,
+        # identificador, nomes excluídos, quantos nomes já estavam
+        # declarados); ver parser.parallel
+        self.identifier_errors: List[Tuple[int, str, Tuple[str, ...], int]] = []
+
+    def build_result(self, package_name: Optional[str], imports: List[str],
+                     declarations: List[Declaration]) -> Dict[str, Any]:
+        """Preenche o sumário e monta o resultado do parsing"""
+        self.summary.package_name = package_name
+        self.summary.imports = imports
+        self.summary.add_declarations(declarations)
+
+        return {
+            'package': package_name,
+            'imports': imports,
+            'declarations': declarations,
+            'summary': self.summary,
+            'error_report': self.error_report,
+            'has_errors': self.error_report.has_errors(),
+        }
+
+    def handle_syntax_error(self, p):
+        """
+        Registra o erro e faz a recuperação em modo pânico.
+
+        Tokens 'ERROR' (lexemas inválidos, já registrados como erros
+        léxicos) são apenas descartados. Nos demais erros, os tokens são
+        descartados até o próximo de SYNC_TOKENS fora de chaves e o PLY
+        desempilha a declaração incompleta até uma produção com 'error'
+        (declaration, package ou import), de onde o parsing recomeça.
+        """
+        if p is None:
+            last = self.stream.last_token if self.stream is not None else None
+            self._add_syntax_error(
+                line=last.lineno if last else 0,
+                column=last.token_pos + len(last.value) if last else 0,
+                message="Fim de arquivo inesperado",
+                suggestion=lambda: "Verifique se todos os blocos foram fechados corretamente com '}' e se a sintaxe está completa.",
+            )
+            return None
+
+        # Um identificador nunca é sugerido para a própria classe em que aparece
+        exclude = self._current_class_name() if p.type == 'IDENTIFIER' else ()
+        added = self._add_syntax_error(
             line=p.lineno,
-            column=0,
+            column=p.token_pos,
             message=f"Token inesperado '{p.value}' do tipo {p.type}",
-            suggestion=suggestion
-        )
-        parser.errok()
-    else:
-        error_report.add_syntactic_error(
-            line=0,
-            column=0,
-            message="Fim de arquivo inesperado",
-            suggestion="Verifique se todos os blocos foram fechados corretamente com '}' e se a sintaxe está completa."
+            suggestion=lambda: generate_smart_suggestion(
+                str(p.value), p.type, identifiers=self._declared_names_index(), exclude=exclude),
         )
+        if added and p.type == 'IDENTIFIER':
+            self.identifier_errors.append((len(self.error_report.syntactic_errors) - 1, str(p.value),
+                                           exclude, len(self.declared_names)))
+
+        if p.type == 'ERROR':
+            self.parser.errok()
+            return None
+
+        at_start = len(self.parser.statestack) <= 1
+        if not (self.stream.depth == 0 and p.type in SYNC_TOKENS):
+            self.stream.skip_to_sync()
+        elif at_start:
+            self.stream.push_back(p)
+
+        if at_start:
+            self.parser.errok()
+            sync = self.stream.pending_token
+            if sync is not None and sync.type in PREAMBLE_START_TOKENS:
+                # 'package' e 'import' ainda são válidos no estado inicial:
+                # o parsing recomeça por eles, sem 'package : error' (que
+                # faria o 'package' verdadeiro virar um segundo erro)
+                return None
+            # No estado inicial o PLY descartaria os tokens sem nunca
+            # empilhar 'error'; o token 'error' é entregue explicitamente
+            # e o parsing recomeça pela produção 'package : error'
+            return Token(type='error', value=p.value, lineno=p.lineno,
+                         lexpos=p.lexpos, token_pos=p.token_pos)
+        return None
+
+    def _declared_names_index(self) -> Optional[SuggestionIndex]:
+        """Índice de declared_names, refeito só quando surgem nomes novos"""
+        if not self.declared_names:
+            return None
+        if self._names_index is None:
+            self._names_index = SuggestionIndex([self.declared_names])
+        elif len(self._names_index) != len(self.declared_names):
+            # Os nomes novos ficam no fim de declared_names
+            self._names_index.add(islice(self.declared_names, len(self._names_index), None))
+        return self._names_index
+
+    def _current_class_name(self) -> Tuple[str, ...]:
+        """Nome da classe cuja declaração está na pilha do parser, se houver"""
+        symbols = self.parser.symstack
+        for i in range(len(symbols) - 2, -1, -1):
+            if symbols[i].type == 'CLASS_STEREOTYPE' and symbols[i + 1].type == 'IDENTIFIER':
+                return (symbols[i + 1].value,)
+        return ()
+
+    def _add_syntax_error(self, line: int, column: int, message: str, suggestion) -> bool:
+        """
+        Registra até SYNTAX_ERROR_LIMIT erros; a sugestão só é gerada se o
+        erro entrar no relatório. Retorna se o erro entrou.
+        """
+        count = self.syntax_error_count
+        self.syntax_error_count += 1
+        if count > SYNTAX_ERROR_LIMIT:
+            return False
+        if count == SYNTAX_ERROR_LIMIT:
+            self.error_report.add_syntactic_error(
+                line=line,
+                column=column,
+                message=SYNTAX_ERROR_LIMIT_MESSAGE,
+            )
+            return False
+        self.error_report.add_syntactic_error(line=line, column=column, message=message,
+                                              suggestion=suggestion())
+        return True
+
+    def report_lexical_errors(self, lexical_errors: List[LexerError]):
+        """Registra os erros léxicos no relatório, com sugestões"""
+        for lex_error in lexical_errors:
+            # Gerar sugestão inteligente para erros léxicos
+            suggestion = f"Caractere ilegal '{lex_error.character}'."
+
+            # Tentar identificar se é uma palavra-chave escrita errada
+            if hasattr(lex_error, 'value') and len(lex_error.character) > 1:
+                similar = find_similar_token(lex_error.character)
+                if similar:
+                    suggestion += f" {similar}"
+                else:
+                    suggestion += " Verifique se este caractere é válido na linguagem Tonto."
+            else:
+                suggestion += " Verifique se este caractere é válido na linguagem Tonto."
 
+            self.error_report.add_lexical_error(
+                line=lex_error.line,
+                column=lex_error.column,
+                message=lex_error.message,
+                suggestion=suggestion
+            )
+
+    def parse_tokens(self, token_list: Iterable[Token]) -> Optional[Dict[str, Any]]:
+        """
+        Faz o parsing de tokens já produzidos pelo lexer. O resultado não
+        inclui 'tokens', 'lexical_errors' nem 'syntactic_errors'; os erros
+        sintáticos ficam em self.error_report.
+        """
+        self.stream = TokenListStream(token_list)
+        result = self.parser.parse(lexer=self.stream)
+        if result is None and self.error_report.has_errors():
+            result = self.build_result(self.package_name, self.imports, self.declarations)
+        return result
+
+    def parse(self, data: str) -> Dict[str, Any]:
+        # Os erros léxicos entram no relatório assim que o texto termina,
+        # antes da redução final (p_ontology), que calcula has_errors
+        stream = TokenStream(data, on_exhausted=self.report_lexical_errors, session=self)
+        self.stream = stream
+        result = self.parser.parse(lexer=stream)
+        stream.drain()
+
+        if result is None:
+            # O PLY abandona o parsing em um erro no fim do arquivo; as
+            # declarações completas até ali continuam no resultado
+            result = self.build_result(self.package_name, self.imports, self.declarations)
+            result['has_errors'] = True
+
+        result['tokens'] = stream.tokens
+        result['lexical_errors'] = list(stream.errors)
+        result['syntactic_errors'] = list(self.error_report.syntactic_errors)
+        return result
 
-lexer = TontoLexer()
-parser = yacc.yacc()
 
 def parse_ontology(data: str) -> Dict[str, Any]:
     """
     Realiza o parsing de uma ontologia Tonto e retorna a árvore sintática,
     tabela de síntese e relatório de erros.
 
+    O texto é tokenizado uma única vez: o parser consome um TokenStream
+    que também guarda os tokens e os erros léxicos. Cada chamada usa sua
+    própria ParserSession, então é seguro chamar de várias threads.
+
     Args:
         data: Código fonte da ontologia em formato string
 
     Returns:
         Dicionário contendo:
         - ast: Árvore sintática abstrata
-        - summary: Tabela de síntese formatada
-        - error_report: Relatório de erros formatado
+        - summary: OntologySummary (a tabela formatada é gerada sob
+          demanda por str() ou get_summary_table())
+        - error_report: ErrorReport (o relatório formatado é gerado sob
+          demanda por str() ou get_error_report())
         - has_errors: Boolean indicando se há erros
+        - tokens: TokenBuffer com os tokens válidos
+        - lexical_errors: Lista de LexerError
+        - syntactic_errors: Lista de ParseError sintáticos
     """
-    # Resetar estado global
-    global summary, error_report
-    summary = OntologySummary()
-    error_report = ErrorReport()
-
-    # Processar erros léxicos
-    lexer_instance = TontoLexer()
-    list(lexer_instance.tokenize(data))  # Força tokenização para coletar erros
-
-    for lex_error in lexer_instance.errors:
-        # Gerar sugestão inteligente para erros léxicos
-        suggestion = f"Caractere ilegal '{lex_error.character}'."
-
-        # Tentar identificar se é uma palavra-chave escrita errada
-        if hasattr(lex_error, 'value') and len(lex_error.character) > 1:
-            similar = find_similar_token(lex_error.character)
-            if similar:
-                suggestion += f" {similar}"
-            else:
-                suggestion += " Verifique se este caractere é válido na linguagem Tonto."
-        else:
-            suggestion += " Verifique se este caractere é válido na linguagem Tonto."
-
-        error_report.add_lexical_error(
-            line=lex_error.line,
-            column=lex_error.column,
-            message=lex_error.message,
-            suggestion=suggestion
-        )
-
-    # Parsing
-    lexer_instance.lexer.lineno = 1
-    lexer_instance.lexer.input(data)
-    result = parser.parse(lexer=lexer_instance.lexer)
-
-    if result is None:
-        result = {
-            'package': None,
-            'imports': [],
-            'declarations': [],
-            'summary': summary.get_summary_table(),
-            'error_report': error_report.get_error_report(),
-            'has_errors': True,
-        }
-
-    return result
+    return ParserSession().parse(data)
 
 def print_parse_results(result: Dict[str, Any]):
     """
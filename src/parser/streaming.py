@@ -0,0 +1,143 @@
+import codecs
+import mmap
+import os
+import queue
+import threading
+from dataclasses import dataclass, field
+from typing import Iterator, List, Optional, Union
+
+from lexer.lexer import STREAM_CHUNK_SIZE, Token, TontoLexer, create_lexer
+from parser.ast_nodes import Declaration
+from parser.parser import ParseError, ParserSession, TokenListStream
+
+# Declarações já reduzidas que podem aguardar o consumidor
+STREAM_QUEUE_SIZE = 16
+
+Source = Union[str, os.PathLike, bytes, bytearray, memoryview, mmap.mmap]
+
+
+@dataclass
+class StreamedDeclaration:
+    """
+    Uma declaração de topo entregue por iter_declarations.
+
+    errors traz os erros léxicos e sintáticos registrados desde a
+    declaração anterior, em ordem de linha. declaration é None quando a
+    recuperação de erros descartou a declaração, e também no último item,
+    que só existe se houver erros depois da última declaração.
+    """
+    declaration: Optional[Declaration]
+    errors: List[ParseError] = field(default_factory=list)
+
+
+class MappedText:
+    """
+    Leitura em blocos, como texto, de um buffer de bytes (mmap, bytes,
+    memoryview). Só o bloco corrente é copiado e decodificado, então um
+    arquivo mapeado em memória nunca é carregado inteiro.
+    """
+
+    def __init__(self, buffer, encoding: str = 'utf-8'):
+        self._buffer = buffer
+        self._position = 0
+        self._decoder = codecs.getincrementaldecoder(encoding)()
+
+    def read(self, size: int = STREAM_CHUNK_SIZE) -> str:
+        text = ""
+        while not text and self._position < len(self._buffer):
+            chunk = self._buffer[self._position:self._position + size]
+            self._position += len(chunk)
+            text = self._decoder.decode(bytes(chunk), final=self._position >= len(self._buffer))
+        return text
+
+
+def _tokenize_source(source: Source, lexer: TontoLexer, encoding: str) -> Iterator[Token]:
+    if isinstance(source, str):
+        return lexer.tokenize(source, include_error_tokens=True)
+    if isinstance(source, os.PathLike):
+        return lexer.tokenize_path(source, encoding, include_error_tokens=True)
+    if isinstance(source, (bytes, bytearray, memoryview, mmap.mmap)):
+        return lexer.tokenize_stream(MappedText(source, encoding), include_error_tokens=True)
+    if hasattr(source, 'read'):
+        return lexer.tokenize_stream(source, include_error_tokens=True)
+    raise TypeError(f"Fonte não suportada: {type(source).__name__}")
+
+
+class _Cancelled(Exception):
+    """O consumidor parou de iterar; encerra o parsing em andamento"""
+
+
+_DONE = object()
+
+
+def iter_declarations(source: Source, encoding: str = 'utf-8') -> Iterator[StreamedDeclaration]:
+    """
+    Faz o parsing entregando cada declaração de topo assim que é reduzida.
+
+    source pode ser o texto (str), o caminho de um arquivo (os.PathLike,
+    como pathlib.Path), um arquivo texto aberto ou um buffer de bytes
+    (mmap.mmap, bytes, memoryview); arquivos e buffers são lidos em
+    blocos. A gramática, as ações e a recuperação de erros são as de
+    parse_ontology, e as declarações saem na mesma ordem, mas nem as
+    declarações nem os tokens ficam guardados: a memória é limitada pela
+    maior declaração, não pelo arquivo.
+
+    O parser do PLY não pode ser pausado no meio, então roda em uma thread
+    própria e entrega as declarações por uma fila limitada; parar de
+    iterar (ou fechar o gerador) interrompe o parsing.
+    """
+    session = ParserSession()
+    lexer = create_lexer()
+    stream = TokenListStream(_tokenize_source(source, lexer, encoding))
+    session.stream = stream
+    items: queue.Queue = queue.Queue(maxsize=STREAM_QUEUE_SIZE)
+    cancelled = threading.Event()
+
+    def take_errors() -> List[ParseError]:
+        session.report_lexical_errors(lexer.errors)
+        lexer.errors.clear()
+        report = session.error_report
+        errors = sorted(report.lexical_errors + report.syntactic_errors,
+                        key=lambda error: (error.line, error.column))
+        report.lexical_errors.clear()
+        report.syntactic_errors.clear()
+        return errors
+
+    def emit(item):
+        items.put(item)
+        if cancelled.is_set():
+            raise _Cancelled
+
+    def run():
+        try:
+            session.on_declaration = lambda decl: emit(StreamedDeclaration(decl, take_errors()))
+            session.parser.parse(lexer=stream)
+            stream.drain()
+            errors = take_errors()
+            if errors:
+                emit(StreamedDeclaration(None, errors))
+        except _Cancelled:
+            pass
+        except BaseException as exc:
+            items.put(exc)
+        finally:
+            items.put(_DONE)
+
+    worker = threading.Thread(target=run, name='tonto-iter-declarations', daemon=True)
+    worker.start()
+    try:
+        while True:
+            item = items.get()
+            if item is _DONE:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        cancelled.set()
+        # Libera a thread se ela estiver bloqueada com a fila cheia
+        while worker.is_alive():
+            try:
+                items.get(timeout=0.05)
+            except queue.Empty:
+                pass
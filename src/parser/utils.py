@@ -1,5 +1,8 @@
-from difflib import get_close_matches
-from typing import Optional
+from collections import Counter, defaultdict
+from difflib import SequenceMatcher
+from functools import lru_cache
+from heapq import nlargest
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
 
 from lexer.lexer import (
     CLASS_STEREOTYPES,
@@ -9,11 +12,115 @@ from lexer.lexer import (
     RELATION_STEREOTYPES,
 )
 
+# Similaridade mínima (SequenceMatcher.ratio) e sugestões por vocabulário
+SUGGESTION_CUTOFF = 0.6
+SUGGESTIONS_PER_VOCABULARY = 3
+# Tokens distintos cujas sugestões ficam memorizadas
+SUGGESTION_CACHE_SIZE = 4096
+
+
+class SuggestionIndex:
+    """
+    Índice de palavras para sugestões de correção.
+
+    Equivale a chamar difflib.get_close_matches(token, vocabulário, n=3,
+    cutoff=0.6) em cada vocabulário e juntar os resultados na ordem dos
+    vocabulários, sem repetições. O filtro barato de get_close_matches
+    (quick_ratio: quantos caracteres, com repetição, as duas palavras têm
+    em comum) é calculado para todas as palavras de uma vez por um índice
+    invertido caractere -> (palavra, ocorrências); SequenceMatcher.ratio só
+    é calculado para as palavras que passam por ele.
+    """
+
+    def __init__(self, vocabularies: Sequence[Iterable[str]], cutoff: float = SUGGESTION_CUTOFF,
+                 cache_size: int = SUGGESTION_CACHE_SIZE):
+        self.cutoff = cutoff
+        self._vocabularies = len(vocabularies)
+        self._words: List[str] = []
+        self._membership: List[int] = []  # bit i: a palavra está no vocabulário i
+        self._ids: Dict[str, int] = {}
+        self._postings: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+        self.lookup = lru_cache(maxsize=cache_size)(self._lookup)
+        for position, vocabulary in enumerate(vocabularies):
+            self.add(vocabulary, position)
+
+    def add(self, words: Iterable[str], position: int = 0):
+        """
+        Acrescenta palavras ao vocabulário `position`, sem refazer o índice
+        das que já estavam (ex.: nomes declarados à medida que o texto é
+        lido); descarta as sugestões memorizadas.
+        """
+        for word in words:
+            word_id = self._ids.get(word)
+            if word_id is None:
+                word_id = self._ids[word] = len(self._words)
+                self._words.append(word)
+                self._membership.append(0)
+                for char, count in Counter(word).items():
+                    self._postings[char].append((word_id, count))
+            self._membership[word_id] |= 1 << position
+        self.lookup.cache_clear()
+
+    def __len__(self) -> int:
+        return len(self._words)
+
+    def _candidates(self, token: str) -> Iterable[int]:
+        """Palavras cujo limite superior de ratio (quick_ratio) atinge o cutoff"""
+        common = [0] * len(self._words)
+        for char, count in Counter(token).items():
+            for word_id, word_count in self._postings.get(char, ()):
+                common[word_id] += count if count < word_count else word_count
+
+        size = len(token)
+        for word_id, matches in enumerate(common):
+            if matches and 2.0 * matches / (size + len(self._words[word_id])) >= self.cutoff:
+                yield word_id
+
+    def _lookup(self, token: str) -> Tuple[str, ...]:
+        matcher = SequenceMatcher()
+        matcher.set_seq2(token)
+        scored: List[Tuple[float, str, int]] = []
+        for word_id in self._candidates(token):
+            word = self._words[word_id]
+            matcher.set_seq1(word)
+            score = matcher.ratio()
+            if score >= self.cutoff:
+                scored.append((score, word, self._membership[word_id]))
+
+        suggestions: Dict[str, None] = {}
+        for position in range(self._vocabularies):
+            matches = [(score, word) for score, word, mask in scored if mask >> position & 1]
+            for _, word in nlargest(SUGGESTIONS_PER_VOCABULARY, matches):
+                suggestions[word] = None
+        return tuple(suggestions)
+
+    def close_matches(self, token: str) -> List[str]:
+        """Palavras parecidas com token, das mais às menos parecidas em cada vocabulário"""
+        return list(self.lookup(token))
+
+
+# Vocabulário da linguagem, na ordem em que as sugestões são apresentadas
+LANGUAGE_INDEX = SuggestionIndex((
+    KEYWORDS,
+    CLASS_STEREOTYPES,
+    RELATION_STEREOTYPES,
+    NATIVE_TYPES,
+    META_ATTRIBUTES,
+))
+
+
+def format_suggestion(suggestions: List[str]) -> Optional[str]:
+    if not suggestions:
+        return None
+    if len(suggestions) == 1:
+        return f"Você quis dizer '{suggestions[0]}'?"
+    return f"Você quis dizer: {', '.join(f"'{s}'" for s in suggestions[:3])}?"
+
 
 # Função auxiliar para fuzzy matching
 def find_similar_token(token: str, token_type: Optional[str] = None) -> Optional[str]:
     """
-    Encontra tokens similares usando fuzzy matching.
+    Encontra tokens similares usando fuzzy matching (ver LANGUAGE_INDEX).
 
     Args:
         token: O token que causou erro
@@ -22,52 +129,12 @@ def find_similar_token(token: str, token_type: Optional[str] = None) -> Optional
     Returns:
         String com sugestão ou None
     """
-    token_lower = token.lower()
-    suggestions = []
-
-    # Buscar em palavras-chave
-    keywords = list(KEYWORDS.keys())
-    close_keywords = get_close_matches(token_lower, keywords, n=3, cutoff=0.6)
-    if close_keywords:
-        suggestions.extend(close_keywords)
-
-    # Buscar em estereótipos de classe
-    close_class_stereotypes = get_close_matches(
-        token_lower, CLASS_STEREOTYPES, n=3, cutoff=0.6
-    )
-    if close_class_stereotypes:
-        suggestions.extend(close_class_stereotypes)
-
-    # Buscar em estereótipos de relação
-    close_relation_stereotypes = get_close_matches(
-        token_lower, RELATION_STEREOTYPES, n=3, cutoff=0.6
-    )
-    if close_relation_stereotypes:
-        suggestions.extend(close_relation_stereotypes)
-
-    # Buscar em tipos nativos
-    close_native_types = get_close_matches(token_lower, NATIVE_TYPES, n=3, cutoff=0.6)
-    if close_native_types:
-        suggestions.extend(close_native_types)
-
-    # Buscar em meta-atributos
-    close_meta_attrs = get_close_matches(token_lower, META_ATTRIBUTES, n=3, cutoff=0.6)
-    if close_meta_attrs:
-        suggestions.extend(close_meta_attrs)
-
-    if suggestions:
-        # Remover duplicatas mantendo ordem
-        unique_suggestions = list(dict.fromkeys(suggestions))
-        if len(unique_suggestions) == 1:
-            return f"Você quis dizer '{unique_suggestions[0]}'?"
-        else:
-            return f"Você quis dizer: {', '.join(f"'{s}'" for s in unique_suggestions[:3])}?"
-
-    return None
+    return format_suggestion(LANGUAGE_INDEX.close_matches(token.lower()))
 
 
 def generate_smart_suggestion(
-    token_value: str, token_type: str, context: str = ""
+    token_value: str, token_type: str, context: str = "",
+    identifiers: Optional[SuggestionIndex] = None, exclude: Iterable[str] = (),
 ) -> str:
     """
     Gera sugestão inteligente baseada no token e contexto.
@@ -76,6 +143,10 @@ def generate_smart_suggestion(
         token_value: Valor do token que causou erro
         token_type: Tipo do token
         context: Contexto adicional do erro
+        identifiers: Índice dos nomes declarados no arquivo, sugeridos
+            para identificadores que não lembram nenhuma palavra da linguagem
+        exclude: Nomes que não podem ser sugeridos (a classe em que o
+            erro ocorreu)
 
     Returns:
         Sugestão de correção
@@ -86,6 +157,13 @@ def generate_smart_suggestion(
     if similar:
         return similar
 
+    if token_type == "IDENTIFIER" and identifiers is not None:
+        excluded = {token_value, *exclude}
+        similar = format_suggestion([name for name in identifiers.close_matches(token_value)
+                                     if name not in excluded])
+        if similar:
+            return similar
+
     # Sugestões baseadas no tipo de token
     if token_type == "IDENTIFIER":
         return "Verifique se o identificador está correto. Identificadores devem começar com letra ou underscore."
@@ -1,7 +1,10 @@
-from typing import List, Optional, Tuple
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
 
+from parser.ast_nodes import ClassDecl, DatatypeDecl, EnumDecl, GensetDecl, RelationDecl
 from semantic.dataclasses import Genset, SemanticError, TontoClass, TontoRelation
-from semantic.pattern_validator import PatternValidator
+from semantic.graph import strongly_connected_components
+from semantic.parallel import run_validation, validation_mode
+from semantic.pattern_validator import PatternValidator, RuleStats
 from semantic.symbol_table import SymbolTable
 
 
@@ -33,28 +36,74 @@ class SemanticAnalyzer:
         'mixin', 'phaseMixin'
     }
 
-    def __init__(self):
+    # Verificações da fase 2, na ordem em que os erros são reportados. Como
+    # as regras do PatternValidator, só leem a tabela de símbolos
+    # congelada e podem rodar em paralelo (semantic.parallel)
+    REFERENCE_CHECKS = (
+        '_validate_specialization_references',
+        '_validate_cycles',
+        '_validate_rigidity_hierarchy',
+        '_validate_genset_references',
+        '_validate_relation_references',
+    )
+
+    def __init__(self, rules: Optional[Sequence[str]] = None, validation_mode: Optional[str] = None,
+                 max_workers: Optional[int] = None):
         self.symbol_table = SymbolTable()
+        # Regras do PatternValidator (ids; None = select_rules()) e o perfil da última execução
+        self.rules = rules
+        self.rule_profile: Dict[str, RuleStats] = {}
+        # Execução das fases 2 e 3: 'serial', 'thread', 'process' ou None
+        # (automático, ver semantic.parallel.validation_mode)
+        self.validation_mode = validation_mode
+        self.max_workers = max_workers
         self.errors: List[SemanticError] = []
         self.package_name: Optional[str] = None
         self.imports: List[str] = []
 
-    def analyze(self, ast: dict) -> Tuple[SymbolTable, List[SemanticError]]:
+    def analyze(self, ast: dict, imported: Optional[Mapping[str, TontoClass]] = None
+                ) -> Tuple[SymbolTable, List[SemanticError]]:
         """
-        Analisa a AST e retorna a tabela de símbolos e lista de erros
+        Analisa a AST e retorna a tabela de símbolos e lista de erros.
+
+        imported traz as classes visíveis de outros arquivos do projeto
+        (ver core.project), que deixam de ser referências não definidas.
         """
         self.errors = []
 
         # Fase 1: Construir tabela de símbolos
         self._build_symbol_table(ast)
 
+        return self.validate(imported)
+
+    def build_symbol_table(self, ast: dict) -> SymbolTable:
+        """Só a fase 1; validate() completa a análise"""
+        self.errors = []
+        self._build_symbol_table(ast)
+        return self.symbol_table
+
+    def validate(self, imported: Optional[Mapping[str, TontoClass]] = None
+                 ) -> Tuple[SymbolTable, List[SemanticError]]:
+        """Fases 2 e 3, sobre a tabela de símbolos já construída"""
+        if imported:
+            self.symbol_table.set_imported(imported)
+
+        # Fim da fase 1: daqui em diante as verificações só leem a tabela
+        self.symbol_table.freeze()
+        mode = validation_mode(self.validation_mode, len(self.symbol_table.classes), self.max_workers)
+        if mode != 'serial':
+            errors, self.rule_profile = run_validation(self, mode, self.max_workers)
+            self.errors.extend(errors)
+            return self.symbol_table, self.errors
+
         # Fase 2: Validar referências
         self._validate_references()
 
         # Fase 3: Validar padrões ontológicos
-        validator = PatternValidator(self.symbol_table)
+        validator = PatternValidator(self.symbol_table, self.rules)
         validator.validate_all_patterns()
         self.errors.extend(validator.errors)
+        self.rule_profile = validator.profile
 
         return self.symbol_table, self.errors
 
@@ -65,33 +114,29 @@ class SemanticAnalyzer:
         self.imports = ast.get('imports', [])
 
         for declaration in ast.get('declarations', []):
-            decl_type = declaration.get('type')
-
-            if decl_type == 'class':
+            if isinstance(declaration, ClassDecl):
                 self._process_class_declaration(declaration)
-            elif decl_type == 'datatype':
+            elif isinstance(declaration, DatatypeDecl):
                 self._process_datatype_declaration(declaration)
-            elif decl_type == 'enum':
+            elif isinstance(declaration, EnumDecl):
                 self._process_enum_declaration(declaration)
-            elif decl_type == 'genset':
+            elif isinstance(declaration, GensetDecl):
                 self._process_genset_declaration(declaration)
-            elif decl_type == 'relation_external':
+            elif isinstance(declaration, RelationDecl) and declaration.external:
                 self._process_relation_external(declaration)
 
-    def _process_class_declaration(self, declaration: dict):
+    def _process_class_declaration(self, declaration: ClassDecl):
         """Processa declaração de classe"""
-        stereotype = declaration.get('stereotype', '')
-        name = declaration.get('name', '')
-        specializes = declaration.get('specializes')
-        category = declaration.get('category')
-        content = declaration.get('content')
+        stereotype = declaration.stereotype
+        name = declaration.name
+        specializes = declaration.specializes
 
         # Validação básica
         if not name or not stereotype:
             return
 
-        # Verifica se já existe
-        if name and self.symbol_table.get_class(name):
+        # Verifica se já existe (neste arquivo; classes importadas podem ser redeclaradas)
+        if name and name in self.symbol_table.classes:
             self.errors.append(SemanticError(
                 f"Class '{name}' is already defined."
             ))
@@ -115,43 +160,33 @@ class SemanticAnalyzer:
                 ))
 
         # Cria classe
-        attributes = []
-        relations = []
-
-        if content:
-            attributes = content.get('attributes', [])
-            relations = content.get('relations', [])
-
         tonto_class = TontoClass(
             name=str(name),
             stereotype=str(stereotype),
             specializes=specializes,
-            category=category,
-            attributes=attributes,
-            relations=relations
+            category=declaration.category,
+            attributes=declaration.attributes,
+            relations=declaration.relations
         )
 
         self.symbol_table.add_class(tonto_class)
 
-    def _process_datatype_declaration(self, declaration: dict):
+    def _process_datatype_declaration(self, declaration: DatatypeDecl):
         """Processa declaração de datatype"""
-        name = declaration.get('name', '')
+        name = declaration.name
         if name:
             self.symbol_table.datatypes.append(str(name))
 
-    def _process_enum_declaration(self, declaration: dict):
+    def _process_enum_declaration(self, declaration: EnumDecl):
         """Processa declaração de enum"""
-        name = declaration.get('name', '')
-        values = declaration.get('values', [])
+        name = declaration.name
         if name:
-            self.symbol_table.enums[str(name)] = values
+            self.symbol_table.enums[str(name)] = declaration.values
 
-    def _process_genset_declaration(self, declaration: dict):
+    def _process_genset_declaration(self, declaration: GensetDecl):
         """Processa declaração de genset"""
-        name = declaration.get('name', '')
-        general = declaration.get('general', '')
-        specifics = declaration.get('specifics', [])
-        restrictions = declaration.get('genset_restrictions', [])
+        name = declaration.name
+        general = declaration.general
 
         # Validação básica
         if not name or not general:
@@ -160,20 +195,17 @@ class SemanticAnalyzer:
         genset = Genset(
             name=str(name),
             general=str(general),
-            specifics=specifics,
-            restrictions=restrictions
+            specifics=declaration.specifics,
+            restrictions=declaration.restrictions
         )
 
         self.symbol_table.add_genset(genset)
 
-    def _process_relation_external(self, declaration: dict):
+    def _process_relation_external(self, declaration: RelationDecl):
         """Processa declaração de relação externa"""
-        stereotype = declaration.get('relation_stereotype', '')
-        domain = declaration.get('domain', '')
-        domain_card = declaration.get('domain_cardinality', '')
-        image = declaration.get('image', '')
-        image_card = declaration.get('image_cardinality', '')
-        connector = declaration.get('connector', {})
+        stereotype = declaration.relation_stereotype
+        domain = declaration.domain
+        image = declaration.image
 
         # Validação básica
         if not stereotype or not domain or not image:
@@ -182,18 +214,21 @@ class SemanticAnalyzer:
         relation = TontoRelation(
             stereotype=str(stereotype),
             domain=str(domain),
-            domain_cardinality=str(domain_card),
+            domain_cardinality=str(declaration.domain_cardinality),
             image=str(image),
-            image_cardinality=str(image_card),
-            connector=dict(connector) if connector else {}
+            image_cardinality=str(declaration.image_cardinality),
+            connector=declaration.connector
         )
 
         self.symbol_table.add_relation(relation)
 
     def _validate_references(self):
         """Segunda passada: valida referências entre símbolos"""
+        for check in self.REFERENCE_CHECKS:
+            getattr(self, check)()
 
-        # Valida especializações
+    def _validate_specialization_references(self):
+        """Valida que as classes especializadas existem"""
         for class_name, tonto_class in self.symbol_table.classes.items():
             if tonto_class.specializes:
                 for parent in tonto_class.specializes:
@@ -202,10 +237,8 @@ class SemanticAnalyzer:
                             f"Class '{class_name}' specializes undefined class '{parent}'."
                         ))
 
-        # Valida hierarquia de rigidez: rigid não pode especializar anti-rigid
-        self._validate_rigidity_hierarchy()
-
-        # Valida gensets
+    def _validate_genset_references(self):
+        """Valida que o general e os specifics de cada genset existem"""
         for genset in self.symbol_table.gensets:
             # Verifica se o general existe
             if not self.symbol_table.get_class(genset.general):
@@ -220,6 +253,8 @@ class SemanticAnalyzer:
                         f"Genset '{genset.name}' references undefined specific class '{specific}'."
                     ))
 
+    def _validate_relation_references(self):
+        """Valida as classes das relações externas e internas"""
         # Valida relações externas
         for relation in self.symbol_table.relations:
             if relation.domain and not self.symbol_table.get_class(relation.domain):
@@ -235,12 +270,40 @@ class SemanticAnalyzer:
         # Valida relações internas
         for class_name, tonto_class in self.symbol_table.classes.items():
             for relation in tonto_class.relations:
-                image = relation.get('image')
+                image = relation.image
                 if image and not self.symbol_table.get_class(image):
                     self.errors.append(SemanticError(
                         f"Class '{class_name}' has relation to undefined class '{image}'."
                     ))
 
+    def _validate_cycles(self):
+        """
+        Valida que nenhuma classe especializa a si mesma, direta ou
+        indiretamente, por specializes ou por gensets (specific -> general).
+
+        Uma única passada de Tarjan iterativa sobre o grafo combinado: cada
+        componente fortemente conexo com mais de uma classe, ou com uma
+        aresta para si mesma, gera um erro com todas as classes do ciclo.
+        """
+        classes = self.symbol_table.classes
+        graph = {name: list(tonto_class.specializes or ()) for name, tonto_class in classes.items()}
+        for genset in self.symbol_table.gensets:
+            for specific in genset.specifics:
+                if specific in graph:
+                    graph[specific].append(genset.general)
+
+        for component in strongly_connected_components(graph):
+            if len(component) == 1 and component[0] not in graph[component[0]]:
+                continue
+            if len(component) == 1:
+                message = f"Class '{component[0]}' specializes itself."
+            else:
+                members = ', '.join(f"'{name}'" for name in component)
+                message = f"Cyclic specialization among classes {members}."
+            self.errors.append(SemanticError(
+                f"{message} A class cannot specialize itself, directly or indirectly."
+            ))
+
     def _validate_rigidity_hierarchy(self):
         """
         Valida que rigid universals não podem especializar anti-rigid universals.
@@ -250,6 +313,7 @@ class SemanticAnalyzer:
         - kind especializando phase
         - category especializando roleMixin
         """
+        hierarchy = self.symbol_table.hierarchy
         for class_name, tonto_class in self.symbol_table.classes.items():
             stereotype = tonto_class.stereotype
 
@@ -257,47 +321,37 @@ class SemanticAnalyzer:
             if stereotype not in self.RIGID_STEREOTYPES:
                 continue
 
-            # Verifica todos os parents (diretos e indiretos)
-            visited = set()
-            to_visit = list(tonto_class.specializes) if tonto_class.specializes else []
-
-            while to_visit:
-                parent_name = to_visit.pop(0)
-
-                if parent_name in visited:
-                    continue
-                visited.add(parent_name)
-
-                parent_class = self.symbol_table.get_class(parent_name)
-                if not parent_class:
-                    continue
-
-                parent_stereotype = parent_class.stereotype
-
-                # ERRO: rigid especializando anti-rigid
-                if parent_stereotype in self.ANTI_RIGID_STEREOTYPES:
-                    self.errors.append(SemanticError(
-                        f"Rigid universal '{class_name}' ({stereotype}) cannot specialize "
-                        f"anti-rigid universal '{parent_name}' ({parent_stereotype}). "
-                    ))
-                    break
+            # Estereótipos de todos os parents (diretos e indiretos), memorizados
+            info = hierarchy.info(class_name)
+            if info.ancestor_stereotypes.isdisjoint(self.ANTI_RIGID_STEREOTYPES):
+                continue
 
-                if parent_class.specializes:
-                    to_visit.extend(parent_class.specializes)
+            # ERRO: rigid especializando anti-rigid (nomeia o mais próximo)
+            parent_class = hierarchy.first_ancestor(class_name, self.ANTI_RIGID_STEREOTYPES)
+            if parent_class:
+                self.errors.append(SemanticError(
+                    f"Rigid universal '{class_name}' ({stereotype}) cannot specialize "
+                    f"anti-rigid universal '{parent_class.name}' ({parent_class.stereotype}). "
+                ))
 
 
-def analyze(ast: dict) -> Tuple[SymbolTable, List[SemanticError]]:
+def analyze(ast: dict, imported: Optional[Mapping[str, TontoClass]] = None,
+            rules: Optional[Sequence[str]] = None, validation_mode: Optional[str] = None
+            ) -> Tuple[SymbolTable, List[SemanticError]]:
     """
     Interface principal do analisador semântico
 
     Args:
         ast: Árvore sintática abstrata do parser
+        imported: Classes de outros arquivos do projeto, por nome (opcional)
+        rules: Ids das regras do PatternValidator a executar (opcional)
+        validation_mode: 'serial', 'thread' ou 'process' (opcional; ver semantic.parallel)
 
     Returns:
         Tupla contendo (tabela_de_símbolos, lista_de_erros)
     """
-    analyzer = SemanticAnalyzer()
-    return analyzer.analyze(ast)
+    analyzer = SemanticAnalyzer(rules, validation_mode)
+    return analyzer.analyze(ast, imported)
 
 
 def print_analysis_results(symbol_table: SymbolTable, errors: List[SemanticError]):
@@ -1,6 +1,8 @@
 from dataclasses import dataclass, field
 from typing import Optional
 
+from parser.ast_nodes import AttributeDecl, RelationConnector, RelationDecl
+
 
 @dataclass
 class SemanticError:
@@ -22,8 +24,8 @@ class TontoClass:
     stereotype: str
     specializes: Optional[list[str]] = None
     category: Optional[str] = None
-    attributes: list[dict] = field(default_factory=list)
-    relations: list[dict] = field(default_factory=list)
+    attributes: list[AttributeDecl] = field(default_factory=list)
+    relations: list[RelationDecl] = field(default_factory=list)
 
     def __post_init__(self):
         if self.specializes is None:
@@ -61,5 +63,5 @@ class TontoRelation:
     domain_cardinality: str
     image: str
     image_cardinality: str
-    connector: dict
+    connector: Optional[RelationConnector]
     name: Optional[str] = None
@@ -0,0 +1,60 @@
+from typing import Dict, Hashable, Iterable, List, Mapping, TypeVar
+
+Node = TypeVar('Node', bound=Hashable)
+
+
+def strongly_connected_components(graph: Mapping[Node, Iterable[Node]]) -> List[List[Node]]:
+    """
+    Componentes fortemente conexos (algoritmo de Tarjan, iterativo: grafos
+    grandes não esbarram no limite de recursão do Python).
+
+    graph mapeia cada nó aos seus sucessores; sucessores que não são chaves
+    de graph são ignorados. Os componentes saem em ordem topológica
+    reversa: todo componente vem depois dos componentes que ele alcança, e
+    os nós de cada componente seguem a ordem de graph.
+    """
+    index: Dict[Node, int] = {}
+    lowlink: Dict[Node, int] = {}
+    on_stack = set()
+    stack: List[Node] = []
+    components: List[List[Node]] = []
+    position = {node: order for order, node in enumerate(graph)}
+
+    for root in graph:
+        if root in index:
+            continue
+        index[root] = lowlink[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(graph[root]))]
+
+        while work:
+            node, successors = work[-1]
+            for successor in successors:
+                if successor not in position:
+                    continue
+                if successor not in index:
+                    index[successor] = lowlink[successor] = len(index)
+                    stack.append(successor)
+                    on_stack.add(successor)
+                    work.append((successor, iter(graph[successor])))
+                    break
+                if successor in on_stack:
+                    lowlink[node] = min(lowlink[node], index[successor])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+                if lowlink[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    component.sort(key=position.__getitem__)
+                    components.append(component)
+
+    return components
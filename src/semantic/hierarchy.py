@@ -0,0 +1,153 @@
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Dict, FrozenSet, Iterable, Optional
+
+from semantic.dataclasses import TontoClass
+from semantic.graph import strongly_connected_components
+
+@dataclass(frozen=True)
+class HierarchyInfo:
+    """
+    Resumo da hierarquia acima de uma classe.
+
+    ancestors: todas as classes alcançadas por specializes (só as
+    definidas); ancestor_stereotypes: os estereótipos delas; depth: maior
+    número de passos até uma raiz; cyclic: a classe está num ciclo de
+    especialização, e então os membros do ciclo são ancestrais dela (e
+    dela mesma) e dividem o mesmo resumo.
+    """
+    ancestors: FrozenSet[str]
+    ancestor_stereotypes: FrozenSet[str]
+    depth: int
+    cyclic: bool = False
+
+
+class ClassHierarchy:
+    """
+    Fecho transitivo de specializes, calculado sob demanda e memorizado.
+
+    info() resolve de uma vez todas as classes ainda não calculadas
+    alcançáveis a partir da pedida: os componentes fortemente conexos saem
+    com as dependências primeiro, então cada classe só junta os resumos já
+    prontos dos pais. invalidate() descarta uma classe e seus descendentes,
+    únicos resumos que dependem dela.
+    """
+
+    def __init__(self, get_class: Callable[[str], Optional[TontoClass]],
+                 get_children: Callable[[str], Iterable[TontoClass]]):
+        self._get_class = get_class
+        self._get_children = get_children
+        self._cache: Dict[str, HierarchyInfo] = {}
+        # Resumos compartilhados por classes com os mesmos pais (já resolvidos)
+        self._by_parents: Dict[tuple, HierarchyInfo] = {}
+
+    def info(self, name: str) -> Optional[HierarchyInfo]:
+        """Resumo da classe, ou None se ela não está definida"""
+        cached = self._cache.get(name)
+        if cached is None and self._get_class(name) is not None:
+            self._resolve(name)
+            cached = self._cache.get(name)
+        return cached
+
+    def ancestors(self, name: str) -> FrozenSet[str]:
+        info = self.info(name)
+        return info.ancestors if info else frozenset()
+
+    def depth(self, name: str) -> int:
+        info = self.info(name)
+        return info.depth if info else 0
+
+    def first_ancestor(self, name: str, stereotypes) -> Optional[TontoClass]:
+        """
+        Primeiro ancestral com um dos estereótipos, em largura e na ordem de
+        specializes; para as mensagens, que nomeiam o pai mais próximo.
+        """
+        start = self._get_class(name)
+        if start is None:
+            return None
+        visited = set()
+        to_visit = deque(start.specializes or ())
+        while to_visit:
+            parent_name = to_visit.popleft()
+            if parent_name in visited:
+                continue
+            visited.add(parent_name)
+            parent = self._get_class(parent_name)
+            if parent is None:
+                continue
+            if parent.stereotype in stereotypes:
+                return parent
+            to_visit.extend(parent.specializes or ())
+        return None
+
+    def invalidate(self, name: str):
+        """Descarta o resumo da classe e o de todos os seus descendentes"""
+        # A própria classe pode não ter resumo (ainda não estava definida) e
+        # os filhos terem; abaixo dela, um descendente sem resumo já foi
+        # descartado junto com os seus
+        self._cache.pop(name, None)
+        self._by_parents.clear()
+        pending = [child.name for child in self._get_children(name)]
+        while pending:
+            current = pending.pop()
+            if self._cache.pop(current, None) is None:
+                continue
+            pending.extend(child.name for child in self._get_children(current))
+
+    def clear(self):
+        self._cache.clear()
+        self._by_parents.clear()
+
+    def _defined_parents(self, tonto_class: TontoClass) -> list:
+        return [p for p in dict.fromkeys(tonto_class.specializes or ())
+                if p in self._cache or self._get_class(p) is not None]
+
+    def _resolve(self, name: str):
+        tonto_class = self._get_class(name)
+        defined = self._defined_parents(tonto_class)
+        if name not in defined and all(p in self._cache for p in defined):
+            # Caso comum: os pais já têm resumo; irmãos com os mesmos pais
+            # dividem o mesmo
+            key = tuple(defined)
+            shared = self._by_parents.get(key)
+            if shared is None:
+                shared = self._by_parents[key] = self._combine([name], {name: defined}, cyclic=False)
+            self._cache[name] = shared
+            return
+
+        # Subgrafo das classes alcançáveis ainda sem resumo
+        parents: Dict[str, list] = {name: defined}
+        pending = list(defined)
+        while pending:
+            current = pending.pop()
+            if current in parents or current in self._cache:
+                continue
+            defined = self._defined_parents(self._get_class(current))
+            parents[current] = defined
+            pending.extend(defined)
+
+        for component in strongly_connected_components(parents):
+            cyclic = len(component) > 1 or component[0] in parents[component[0]]
+            shared = self._combine(component, parents, cyclic)
+            for member in component:
+                self._cache[member] = shared
+
+    def _combine(self, component: list, parents: Dict[str, list], cyclic: bool) -> HierarchyInfo:
+        """Resumo comum a um componente cujos pais externos já estão no cache"""
+        members = set(component)
+        ancestors = set(members) if cyclic else set()
+        stereotypes = set()
+        depth = 0
+        for member in component:
+            if cyclic:
+                stereotypes.add(self._get_class(member).stereotype)
+            for parent in parents[member]:
+                if parent in members:
+                    continue
+                parent_info = self._cache[parent]
+                ancestors.add(parent)
+                ancestors |= parent_info.ancestors
+                stereotypes.add(self._get_class(parent).stereotype)
+                stereotypes |= parent_info.ancestor_stereotypes
+                depth = max(depth, parent_info.depth + 1)
+        return HierarchyInfo(frozenset(ancestors), frozenset(stereotypes), depth, cyclic)
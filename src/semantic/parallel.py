@@ -0,0 +1,110 @@
+import copy
+import multiprocessing
+import os
+import pickle
+import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Dict, List, Optional, Tuple
+
+from semantic.dataclasses import SemanticError
+from semantic.pattern_validator import PatternValidator, RuleStats, merge_profiles, select_rules
+
+VALIDATION_MODES = ('serial', 'thread', 'process')
+# Modo padrão; sem ele, escolhido pelo tamanho da tabela e pelo interpretador
+VALIDATION_MODE = os.environ.get('TONTO_VALIDATION_MODE') or None
+# Abaixo deste número de classes o custo de distribuir as regras supera o ganho
+PARALLEL_MIN_CLASSES = 50_000
+
+# ('check', método do SemanticAnalyzer) ou ('rule', id de PatternRule)
+Task = Tuple[str, str]
+TaskResult = Tuple[List[SemanticError], Dict[str, RuleStats]]
+
+
+def free_threaded() -> bool:
+    """Python sem GIL (3.13t em diante): threads rodam as regras de fato em paralelo"""
+    is_gil_enabled = getattr(sys, '_is_gil_enabled', None)
+    return is_gil_enabled is not None and not is_gil_enabled()
+
+
+def validation_mode(mode: Optional[str], class_count: int, max_workers: Optional[int] = None) -> str:
+    """
+    Modo efetivo: o pedido, o de TONTO_VALIDATION_MODE ou, sem nenhum,
+    'thread' para tabelas grandes em Python sem GIL e 'serial' nos demais
+    casos. 'process' só quando pedido: cada processo carrega a tabela
+    inteira, o que custa tanto quanto as verificações em série das
+    ontologias de benchmarks.parallel_validation.
+    """
+    mode = mode or VALIDATION_MODE
+    if mode is None:
+        workers = max_workers or os.cpu_count() or 1
+        if workers < 2 or class_count < PARALLEL_MIN_CLASSES or not free_threaded():
+            return 'serial'
+        return 'thread'
+    if mode not in VALIDATION_MODES:
+        raise ValueError(f"Modo de validacao desconhecido: {mode} (modos: {', '.join(VALIDATION_MODES)})")
+    return mode
+
+
+def validation_tasks(analyzer) -> List[Task]:
+    """Verificações da fase 2 e regras habilitadas, na ordem da validação em série"""
+    rules = select_rules() if analyzer.rules is None else select_rules(only=analyzer.rules, disabled=())
+    return [('check', name) for name in analyzer.REFERENCE_CHECKS] + [('rule', rule_id) for rule_id in rules]
+
+
+def run_task(analyzer, task: Task) -> TaskResult:
+    """Executa uma tarefa com a sua própria lista de erros"""
+    kind, name = task
+    if kind == 'rule':
+        validator = PatternValidator(analyzer.symbol_table, [name])
+        validator.validate_all_patterns()
+        return validator.errors, validator.profile
+    worker = copy.copy(analyzer)
+    worker.errors = []
+    getattr(worker, name)()
+    return worker.errors, {}
+
+
+# Analisador de cada processo do pool, montado uma vez a partir do snapshot
+_worker_analyzer = None
+
+
+def _init_worker(snapshot: bytes):
+    global _worker_analyzer
+    from semantic.analyzer import SemanticAnalyzer
+
+    _worker_analyzer = SemanticAnalyzer()
+    _worker_analyzer.symbol_table = pickle.loads(snapshot)
+
+
+def _run_in_worker(task: Task) -> TaskResult:
+    return run_task(_worker_analyzer, task)
+
+
+def run_validation(analyzer, mode: str, max_workers: Optional[int] = None
+                   ) -> Tuple[List[SemanticError], Dict[str, RuleStats]]:
+    """
+    Fases 2 e 3 com as tarefas de validation_tasks rodando ao mesmo tempo,
+    sobre a tabela já congelada do analisador.
+
+    Em 'thread', as tarefas leem a mesma tabela. Em 'process', a tabela
+    vai serializada uma vez (só as coleções; cada processo refaz os
+    índices) para cada processo do pool 'spawn'. Os erros são juntados na
+    ordem das tarefas, não na de término: o resultado é o mesmo da
+    validação em série.
+    """
+    tasks = validation_tasks(analyzer)
+    workers = min(len(tasks), max_workers or os.cpu_count() or 1)
+    if mode == 'thread':
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(partial(run_task, analyzer), tasks))
+    else:
+        # 'spawn', como em core.batch.analyze_sources
+        context = multiprocessing.get_context('spawn')
+        snapshot = pickle.dumps(analyzer.symbol_table, protocol=pickle.HIGHEST_PROTOCOL)
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                                 initializer=_init_worker, initargs=(snapshot,)) as pool:
+            results = list(pool.map(_run_in_worker, tasks))
+
+    errors = [error for task_errors, _ in results for error in task_errors]
+    return errors, merge_profiles(profile for _, profile in results)
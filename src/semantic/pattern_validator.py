@@ -1,20 +1,104 @@
+import os
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
 from semantic.dataclasses import SemanticError
 from semantic.symbol_table import SymbolTable
 
 
+@dataclass(frozen=True)
+class PatternRule:
+    """Regra do PatternValidator, implementada pelo método validate_* `method`"""
+    id: str
+    method: str
+    # Partes da tabela de símbolos que a regra consulta: classes,
+    # stereotypes (get_classes_by_stereotype), specializations, gensets,
+    # relations (externas)
+    facets: Tuple[str, ...] = ()
+
+
+# Registro das regras, na ordem de execução
+PATTERN_RULES = (
+    PatternRule('subkind', 'validate_subkind_pattern',
+                facets=('classes', 'specializations', 'gensets')),
+    PatternRule('role', 'validate_role_pattern',
+                facets=('classes', 'specializations', 'gensets')),
+    PatternRule('phase', 'validate_phase_pattern',
+                facets=('classes', 'specializations', 'gensets')),
+    PatternRule('relator', 'validate_relator_pattern',
+                facets=('classes', 'stereotypes', 'relations')),
+    PatternRule('mode', 'validate_mode_pattern', facets=('classes',)),
+    PatternRule('rolemixin', 'validate_rolemixin_pattern',
+                facets=('classes', 'stereotypes', 'specializations', 'gensets')),
+    PatternRule('genset-homogeneity', 'validate_genset_homogeneity',
+                facets=('classes', 'gensets')),
+)
+RULES_BY_ID = {rule.id: rule for rule in PATTERN_RULES}
+
+# Regras desligadas por configuração (ids separados por vírgula)
+DISABLED_RULES = tuple(
+    rule_id.strip() for rule_id in os.environ.get('TONTO_DISABLED_RULES', '').split(',') if rule_id.strip()
+)
+
+
+def select_rules(only: Optional[Iterable[str]] = None,
+                 disabled: Optional[Iterable[str]] = None) -> Tuple[str, ...]:
+    """
+    Ids das regras habilitadas, na ordem de PATTERN_RULES: as de `only`
+    (ou todas) menos as de `disabled` (por padrão, DISABLED_RULES).
+    ValueError para ids desconhecidos.
+    """
+    only = None if only is None else set(only)
+    disabled = set(DISABLED_RULES if disabled is None else disabled)
+    unknown = sorted((only or set()) - RULES_BY_ID.keys() | disabled - RULES_BY_ID.keys())
+    if unknown:
+        raise ValueError(f"Regra desconhecida: {', '.join(unknown)} "
+                         f"(regras: {', '.join(RULES_BY_ID)})")
+    return tuple(rule.id for rule in PATTERN_RULES
+                 if (only is None or rule.id in only) and rule.id not in disabled)
+
+
+@dataclass
+class RuleStats:
+    """Perfil de uma regra: execuções, tempo total e erros gerados"""
+    calls: int = 0
+    seconds: float = 0.0
+    diagnostics: int = 0
+
+    def merge(self, other: 'RuleStats'):
+        self.calls += other.calls
+        self.seconds += other.seconds
+        self.diagnostics += other.diagnostics
+
+
+def merge_profiles(profiles: Iterable[Optional[Dict[str, RuleStats]]]) -> Dict[str, RuleStats]:
+    """Soma os perfis (ex.: um por arquivo), na ordem de PATTERN_RULES"""
+    merged = {}
+    for profile in profiles:
+        for rule_id, stats in (profile or {}).items():
+            merged.setdefault(rule_id, RuleStats()).merge(stats)
+    return {rule.id: merged[rule.id] for rule in PATTERN_RULES if rule.id in merged}
+
+
 class PatternValidator:
-    def __init__(self, symbol_table: SymbolTable):
+    def __init__(self, symbol_table: SymbolTable, rules: Optional[Sequence[str]] = None):
+        """rules: ids das regras a executar (padrão: select_rules())"""
         self.symbol_table = symbol_table
         self.errors: list[SemanticError] = []
+        rule_ids = select_rules() if rules is None else select_rules(only=rules, disabled=())
+        self.rules = [RULES_BY_ID[rule_id] for rule_id in rule_ids]
+        self.profile: Dict[str, RuleStats] = {}
 
     def validate_all_patterns(self):
-        self.validate_subkind_pattern()
-        self.validate_role_pattern()
-        self.validate_phase_pattern()
-        self.validate_relator_pattern()
-        self.validate_mode_pattern()
-        self.validate_rolemixin_pattern()
-        self.validate_genset_homogeneity()
+        for rule in self.rules:
+            found = len(self.errors)
+            start = time.perf_counter()
+            getattr(self, rule.method)()
+            stats = self.profile.setdefault(rule.id, RuleStats())
+            stats.calls += 1
+            stats.seconds += time.perf_counter() - start
+            stats.diagnostics += len(self.errors) - found
 
     # Pattern 1: Subkind Pattern
     def validate_subkind_pattern(self):
@@ -30,7 +114,7 @@ class PatternValidator:
                 # Verifica se há subkinds que especializam este kind
                 subkinds = [
                     c for c in self.symbol_table.get_specializations(class_name)
-                    if c.stereotype == 'subkind' and c.specializes and class_name in c.specializes
+                    if c.stereotype == 'subkind'
                 ]
 
                 # Genset só é necessário quando há 2 ou mais subkinds
@@ -59,7 +143,8 @@ class PatternValidator:
                         genset_specifics = set(genset.specifics)
 
                         if not subkind_names.issubset(genset_specifics):
-                            missing = subkind_names - genset_specifics
+                            # Na ordem das especializações: a mensagem não depende da ordem do set
+                            missing = [s.name for s in subkinds if s.name not in genset_specifics]
                             self.errors.append(SemanticError(
                                 f"Subkind Pattern warning: Genset '{genset.name}' for kind '{class_name}' "
                                 f"does not include all subkinds. Missing: {', '.join(missing)}"
@@ -109,7 +194,7 @@ class PatternValidator:
                         genset_specifics = set(genset.specifics)
 
                         if not role_names.issubset(genset_specifics):
-                            missing = role_names - genset_specifics
+                            missing = [r.name for r in roles if r.name not in genset_specifics]
                             self.errors.append(SemanticError(
                                 f"Role Pattern warning: Genset '{genset.name}' for kind '{class_name}' "
                                 f"does not include all roles. Missing: {', '.join(missing)}"
@@ -167,7 +252,7 @@ class PatternValidator:
                         genset_specifics = set(genset.specifics)
 
                         if not phase_names.issubset(genset_specifics):
-                            missing = phase_names - genset_specifics
+                            missing = [p.name for p in phases if p.name not in genset_specifics]
                             self.errors.append(SemanticError(
                                 f"Phase Pattern warning: Genset '{genset.name}' for kind '{class_name}' "
                                 f"does not include all phases. Missing: {', '.join(missing)}"
@@ -186,11 +271,17 @@ class PatternValidator:
         - @material relation RoleName1 [1..*] -- [1..*] RoleName2
         """
         # Encontra todos os relators
-        relators = [c for c in self.symbol_table.classes.values() if c.stereotype == 'relator']
+        relators = self.symbol_table.get_classes_by_stereotype('relator')
+
+        # Relações @material por domain, montadas uma vez para todos os relators
+        material_images: dict[str, list[str]] = {}
+        for relation in self.symbol_table.relations:
+            if relation.stereotype == 'material':
+                material_images.setdefault(relation.domain, []).append(relation.image)
 
         for relator in relators:
             # Verifica se o relator tem pelo menos 2 mediations
-            mediations = [r for r in relator.relations if r.get('relation_stereotype') == 'mediation']
+            mediations = [r for r in relator.relations if r.relation_stereotype == 'mediation']
 
             if len(mediations) < 2:
                 self.errors.append(SemanticError(
@@ -200,7 +291,7 @@ class PatternValidator:
                 continue
 
             # Coleta os roles mediados
-            mediated_roles = [m.get('image') for m in mediations if m.get('image')]
+            mediated_roles = [m.image for m in mediations if m.image]
 
             # Verifica se as classes mediadas existem
             for role_name in mediated_roles:
@@ -213,19 +304,13 @@ class PatternValidator:
                         f"'{role_name}' which is not defined."
                     ))
 
-            # Verifica se existe uma relação @material entre os roles
-            material_relations = [
-                r for r in self.symbol_table.relations
-                if r.stereotype == 'material'
-            ]
-
             # Verifica se há relação material entre pares de roles mediados
             if len(mediated_roles) >= 2:
-                found_material = False
-                for relation in material_relations:
-                    if (relation.domain in mediated_roles and relation.image in mediated_roles):
-                        found_material = True
-                        break
+                found_material = any(
+                    image in mediated_roles
+                    for domain in dict.fromkeys(mediated_roles)
+                    for image in material_images.get(domain, ())
+                )
 
                 if not found_material and len(mediated_roles) >= 2:
                     role_list = ', '.join(str(r) for r in mediated_roles if r)
@@ -252,7 +337,7 @@ class PatternValidator:
             # Verifica se tem @characterization
             characterizations = [
                 r for r in mode.relations
-                if r.get('relation_stereotype') == 'characterization'
+                if r.relation_stereotype == 'characterization'
             ]
 
             if not characterizations:
@@ -265,7 +350,7 @@ class PatternValidator:
             if mode.stereotype in ['extrinsicMode', 'mode']:
                 external_deps = [
                     r for r in mode.relations
-                    if r.get('relation_stereotype') == 'externalDependence'
+                    if r.relation_stereotype == 'externalDependence'
                 ]
 
                 if mode.stereotype == 'extrinsicMode' and not external_deps:
@@ -276,7 +361,7 @@ class PatternValidator:
 
             # Verifica se as classes alvo existem
             for relation in mode.relations:
-                target_class = relation.get('image')
+                target_class = relation.image
                 if target_class and not self.symbol_table.get_class(target_class):
                     self.errors.append(SemanticError(
                         f"Mode Pattern violation: Mode '{mode.name}' references undefined class "
@@ -294,14 +379,14 @@ class PatternValidator:
         - Deve ter genset com general=RoleMixinName e specifics=[RoleName1, RoleName2]
         - Genset deve ter 'disjoint' e 'complete'
         """
-        rolemixins = [c for c in self.symbol_table.classes.values() if c.stereotype == 'roleMixin']
+        rolemixins = self.symbol_table.get_classes_by_stereotype('roleMixin')
 
         for rolemixin in rolemixins:
             # Verifica se há roles que especializam este roleMixin
-            roles = []
-            for c in self.symbol_table.classes.values():
-                if c.stereotype == 'role' and c.specializes and rolemixin.name in c.specializes:
-                    roles.append(c)
+            roles = [
+                c for c in self.symbol_table.get_specializations(rolemixin.name)
+                if c.stereotype == 'role'
+            ]
 
             if len(roles) < 2:
                 self.errors.append(SemanticError(
@@ -1,34 +1,146 @@
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, fields
 from typing import Optional
 
 from semantic.dataclasses import Genset, TontoClass, TontoRelation
+from semantic.hierarchy import ClassHierarchy
 
 
 @dataclass
 class SymbolTable:
-    """Tabela de símbolos para análise semântica"""
+    """
+    Tabela de símbolos para análise semântica.
+
+    Além das coleções públicas, mantém índices (especializações por
+    classe-pai, gensets por general e por specific, classes por
+    estereótipo) atualizados por add_class e add_genset, para que as
+    consultas da validação não percorram todas as classes a cada chamada.
+    Classes e gensets devem ser incluídos por esses métodos. hierarchy
+    memoriza ancestrais, ultimate sortals e profundidade de cada classe;
+    add_class e remove_class descartam só os resumos afetados.
+
+    Ao fim da fase 1 a tabela é congelada (freeze): a validação só a lê,
+    o que permite rodar as regras em várias threads ou processos. No
+    pickle vão só as coleções; índices e hierarquia são refeitos ao
+    carregar.
+    """
     classes: dict[str, TontoClass] = field(default_factory=dict)
     gensets: list[Genset] = field(default_factory=list)
     relations: list[TontoRelation] = field(default_factory=list)
     datatypes: list[str] = field(default_factory=list)
     enums: dict[str, list[str]] = field(default_factory=dict)
+    # Classes declaradas em outros arquivos/pacotes do projeto (core.project):
+    # visíveis para get_class, mas não são validadas nem percorridas aqui
+    imported: dict[str, TontoClass] = field(default_factory=dict)
+
+    # Índices; os dicts internos (nome -> classe) mantêm a ordem de inclusão
+    _children: dict[str, dict[str, TontoClass]] = field(
+        default_factory=dict, init=False, repr=False, compare=False)
+    _by_stereotype: dict[str, dict[str, TontoClass]] = field(
+        default_factory=dict, init=False, repr=False, compare=False)
+    _gensets_by_general: dict[str, list[Genset]] = field(
+        default_factory=dict, init=False, repr=False, compare=False)
+    _gensets_by_specific: dict[str, list[Genset]] = field(
+        default_factory=dict, init=False, repr=False, compare=False)
+    hierarchy: ClassHierarchy = field(init=False, repr=False, compare=False)
+    _frozen: bool = field(default=False, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self.hierarchy = ClassHierarchy(self.get_class, self.get_specializations)
+        # Tabela criada já preenchida: monta os índices a partir das coleções
+        for tonto_class in self.classes.values():
+            self._index_class(tonto_class)
+        for genset in self.gensets:
+            self._index_genset(genset)
+
+    def __getstate__(self):
+        state = {f.name: getattr(self, f.name) for f in fields(self) if f.init}
+        state['_frozen'] = self._frozen
+        return state
+
+    def __setstate__(self, state):
+        frozen = state.pop('_frozen', False)
+        self.__init__(**state)
+        self._frozen = frozen
+
+    @property
+    def frozen(self) -> bool:
+        return self._frozen
+
+    def freeze(self):
+        """Torna a tabela só de leitura (as coleções não são copiadas)"""
+        self._frozen = True
+
+    def _check_mutable(self):
+        if self._frozen:
+            raise RuntimeError("Tabela de simbolos congelada: a validacao so pode le-la")
 
     def add_class(self, tonto_class: TontoClass):
+        self._check_mutable()
+        previous = self.classes.get(tonto_class.name)
+        if previous is not None:
+            self._unindex_class(previous)
         self.classes[tonto_class.name] = tonto_class
+        self._index_class(tonto_class)
+        self.hierarchy.invalidate(tonto_class.name)
+
+    def remove_class(self, name: str) -> Optional[TontoClass]:
+        self._check_mutable()
+        tonto_class = self.classes.pop(name, None)
+        if tonto_class is not None:
+            self._unindex_class(tonto_class)
+            self.hierarchy.invalidate(name)
+        return tonto_class
+
+    def set_imported(self, imported: dict[str, TontoClass]):
+        """Troca as classes importadas; os resumos da hierarquia podem depender de todas"""
+        self._check_mutable()
+        self.imported = dict(imported)
+        self.hierarchy.clear()
+
+    def _index_class(self, tonto_class: TontoClass):
+        name = tonto_class.name
+        self._by_stereotype.setdefault(tonto_class.stereotype, {})[name] = tonto_class
+        for parent in tonto_class.specializes or ():
+            self._children.setdefault(parent, {})[name] = tonto_class
+
+    def _unindex_class(self, tonto_class: TontoClass):
+        name = tonto_class.name
+        self._by_stereotype.get(tonto_class.stereotype, {}).pop(name, None)
+        for parent in tonto_class.specializes or ():
+            self._children.get(parent, {}).pop(name, None)
 
     def get_class(self, name: str) -> Optional[TontoClass]:
-        return self.classes.get(name)
+        tonto_class = self.classes.get(name)
+        if tonto_class is None and self.imported:
+            return self.imported.get(name)
+        return tonto_class
 
     def add_genset(self, genset: Genset):
+        self._check_mutable()
         self.gensets.append(genset)
+        self._index_genset(genset)
+
+    def _index_genset(self, genset: Genset):
+        self._gensets_by_general.setdefault(genset.general, []).append(genset)
+        for specific in dict.fromkeys(genset.specifics):
+            self._gensets_by_specific.setdefault(specific, []).append(genset)
 
     def add_relation(self, relation: TontoRelation):
+        self._check_mutable()
         self.relations.append(relation)
 
     def get_gensets_for_general(self, general_name: str) -> list[Genset]:
         """Retorna todos os gensets que têm a classe como general"""
-        return [g for g in self.gensets if g.general == general_name]
+        return list(self._gensets_by_general.get(general_name, ()))
+
+    def get_gensets_for_specific(self, specific_name: str) -> list[Genset]:
+        """Retorna todos os gensets que têm a classe entre os specifics"""
+        return list(self._gensets_by_specific.get(specific_name, ()))
 
     def get_specializations(self, class_name: str) -> list[TontoClass]:
         """Retorna todas as classes que especializam a classe dada"""
-        return [c for c in self.classes.values() if c.specializes and class_name in c.specializes]
+        return list(self._children.get(class_name, {}).values())
+
+    def get_classes_by_stereotype(self, stereotype: str) -> list[TontoClass]:
+        """Retorna as classes declaradas com o estereótipo, na ordem de declaração"""
+        return list(self._by_stereotype.get(stereotype, {}).values())
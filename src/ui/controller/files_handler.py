@@ -1,13 +1,18 @@
 
-from lexer.lexer import TontoLexer
+from core.batch import analyze_source, analyze_sources
+from lexer.lexer import create_lexer
+from lexer.token_buffer import TokenBuffer
+from parser.incremental import IncrementalParser
 from parser.parser import parse_ontology
 
 class FilesHandler:
     def __init__(self):
         self.files = {}
-        self.current_tokens = []
+        self.current_tokens = TokenBuffer()
         self.current_errors = []
         self.current_syntactic_errors = []
+        # Um IncrementalParser por arquivo: reanálises só reparseiam as declarações editadas
+        self.incremental_parsers = {}
 
     def add_file(self, filename, file_tab):
         self.files[filename] = file_tab
@@ -15,9 +20,11 @@ class FilesHandler:
     def remove_file(self, filename):
         if filename in self.files:
             del self.files[filename]
+        self.incremental_parsers.pop(filename, None)
 
     def clear_files(self):
         self.files.clear()
+        self.incremental_parsers.clear()
         self.current_tokens.clear()
         self.current_errors.clear()
         self.current_syntactic_errors.clear()
@@ -26,8 +33,12 @@ class FilesHandler:
         if filename in self.files:
             content = self.files[filename].editor.toPlainText().strip()
             if content:
-                tokens, errors = self.tokenize(content)
-                syntactic_errors = self.parse(content)
+                # Uma única passada: tokens, erros léxicos e sintáticos
+                incremental = self.incremental_parsers.setdefault(filename, IncrementalParser())
+                result = analyze_source(content, incremental=incremental)
+                tokens = result.tokens
+                errors = tuple(result.lexical_errors)
+                syntactic_errors = result.syntactic_errors
                 
                 self.files[filename].tokens = tokens
                 self.files[filename].errors = errors
@@ -36,24 +47,31 @@ class FilesHandler:
                 return tokens, errors, syntactic_errors
         return [], [], []
 
-    def analyze_all_files(self):
-        all_tokens = []
+    def analyze_all_files(self, max_workers=None):
+        all_tokens = TokenBuffer()
         all_errors = []
         all_syntactic_errors = []
-        
+
+        file_tabs = []
+        contents = []
         for file_tab in self.files.values():
             content = file_tab.editor.toPlainText().strip()
             if content:
-                tokens, errors = self.tokenize(content)
-                syntactic_errors = self.parse(content)
-                
-                file_tab.tokens = tokens
-                file_tab.errors = errors
-                file_tab.syntactic_errors = syntactic_errors
-                
-                all_tokens.extend(tokens)
-                all_errors.extend(errors)
-                all_syntactic_errors.extend(syntactic_errors)
+                file_tabs.append(file_tab)
+                contents.append(content)
+
+        # Cada arquivo é analisado de forma independente (em paralelo para
+        # lotes grandes); os resultados voltam na ordem de self.files
+        results = analyze_sources(contents, max_workers=max_workers)
+
+        for file_tab, result in zip(file_tabs, results):
+            file_tab.tokens = result.tokens
+            file_tab.errors = tuple(result.lexical_errors)
+            file_tab.syntactic_errors = result.syntactic_errors
+
+            all_tokens.extend(result.tokens)
+            all_errors.extend(result.lexical_errors)
+            all_syntactic_errors.extend(result.syntactic_errors)
         
         self.current_tokens = all_tokens
         self.current_errors = all_errors
@@ -62,8 +80,8 @@ class FilesHandler:
         return all_tokens, all_errors, all_syntactic_errors
 
     def tokenize(self, data):
-        lexer = TontoLexer()
-        tokens = list(lexer.tokenize(data))
+        lexer = create_lexer()
+        tokens = TokenBuffer.from_source(data, lexer)
         errors = tuple(lexer.errors)
         return tokens, errors
     
@@ -73,15 +91,7 @@ class FilesHandler:
         """
         try:
             result = parse_ontology(data)
-            
-            # Extrair erros sintáticos do error_report
-            if result and 'error_report' in result:
-                # O error_report é uma string formatada, mas também temos acesso direto aos erros
-                # através do módulo parser
-                from parser.parser import error_report
-                return list(error_report.syntactic_errors)
-            
-            return []
+            return result['syntactic_errors'] if result else []
         except Exception as e:
             # Em caso de erro no parser, retornar lista vazia
             print(f"Erro ao fazer parsing: {e}")
@@ -4,6 +4,7 @@ import collections
 from PyQt5.QtCore import QDir
 from PyQt5.QtWidgets import QApplication, QMessageBox, QTreeWidgetItem
 
+from core.batch import analyze_sources
 from ui.controller import FilesHandler
 from ui.view import MainView
 from ui.widgets.code_editor import CodeEditor
@@ -90,9 +91,6 @@ class MainController:
                         full_path = os.path.join(root, file)
                         full_path = os.path.normpath(full_path) # Padronizar o caminho usando /
                         tonto_files.append(full_path)
-                        
-                        # Abrir cada arquivo .tonto encontrado
-                        self.open_single_file(full_path)
 
             if not tonto_files:
                 QMessageBox.information(
@@ -101,6 +99,25 @@ class MainController:
                 )
                 return
 
+            # Ler os arquivos ainda não abertos e fazer o parsing em paralelo
+            new_files = []
+            contents = []
+            for file_path in tonto_files:
+                if file_path in self.files_handler.files:
+                    continue
+                try:
+                    with open(file_path, 'r', encoding='utf-8') as f:
+                        contents.append(f.read())
+                    new_files.append(file_path)
+                except Exception as e:
+                    print(f"Erro ao abrir arquivo {file_path}: {str(e)}")
+
+            results = analyze_sources(contents)
+
+            # Abrir cada arquivo .tonto encontrado
+            for file_path, content, result in zip(new_files, contents, results):
+                self.open_single_file(file_path, content, result.ast)
+
             QMessageBox.information(
                 self.view, "Sucesso",
                 f"Carregados {len(tonto_files)} arquivos .tonto da pasta."
@@ -112,14 +129,15 @@ class MainController:
                 f"Erro ao abrir pasta: {str(e)}"
             )
 
-    def open_single_file(self, file_path):
+    def open_single_file(self, file_path, content=None, parse_result=None):
         """Abre um único arquivo sem mostrar múltiplas mensagens"""
         try:
             if file_path not in self.files_handler.files:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
+                if content is None:
+                    with open(file_path, 'r', encoding='utf-8') as f:
+                        content = f.read()
 
-                file_tab = GraphTab(file_path, content)
+                file_tab = GraphTab(file_path, content, parse_result)
                 self.files_handler.add_file(file_path, file_tab)
                 self.view.add_file_tab(file_tab)
                 
@@ -207,19 +225,29 @@ class MainController:
                     [token_type, str(count), f"{percentage:.1f}%"])
                 self.view.details_table.addTopLevelItem(item)
 
+    @staticmethod
+    def _document_offset(editor, line_number, column):
+        """
+        Offset de linha/coluna (a partir de 1) no documento do editor. O
+        QTextDocument já indexa os blocos (linhas), então não é preciso
+        percorrer nem copiar o texto a cada clique.
+        """
+        document = editor.document()
+        block = document.findBlockByNumber(max(line_number, 1) - 1)
+        if not block.isValid():
+            block = document.lastBlock()
+        return block.position() + max(column, 1) - 1
+
     def navigate_to_token(self, line_number, token_pos, token_value):
         current_editor = self.view.tab_widget.currentWidget()
         if not current_editor:
             return
 
-        cursor = current_editor.textCursor()
-        cursor.movePosition(cursor.Start)
+        position = self._document_offset(current_editor, line_number, token_pos)
 
-        for _ in range(line_number - 1):
-            cursor.movePosition(cursor.Down)
-    
-        cursor.setPosition(cursor.block().position() + token_pos - 1)
-        cursor.setPosition(cursor.block().position() + token_pos - 1 + len(token_value), cursor.KeepAnchor)
+        cursor = current_editor.textCursor()
+        cursor.setPosition(position)
+        cursor.setPosition(position + len(token_value), cursor.KeepAnchor)
         current_editor.setTextCursor(cursor)
         current_editor.setFocus()
 
@@ -229,19 +257,15 @@ class MainController:
         if not current_editor:
             return
 
-        cursor = current_editor.textCursor()
-        cursor.movePosition(cursor.Start)
+        # Converter linha/coluna do erro em offset do documento
+        position = self._document_offset(current_editor, line_number, column_pos)
 
-        # Mover para a linha do erro
-        for _ in range(line_number - 1):
-            cursor.movePosition(cursor.Down)
-        
-        # Mover para a coluna do erro
-        cursor.setPosition(cursor.block().position() + column_pos - 1)
+        cursor = current_editor.textCursor()
+        cursor.setPosition(position)
         
         # Selecionar o caractere problemático se existir
         if character:
-            cursor.setPosition(cursor.block().position() + column_pos - 1 + len(character), cursor.KeepAnchor)
+            cursor.setPosition(position + len(character), cursor.KeepAnchor)
         
         current_editor.setTextCursor(cursor)
         current_editor.setFocus()
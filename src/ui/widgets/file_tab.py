@@ -5,11 +5,11 @@ from ui.widgets.graph_viewer.graph_viewer import GraphViewer
 
 
 class GenericTab:
-    def __init__(self, title, widget, content):
+    def __init__(self, title, widget, content, **set_text_kwargs):
         self.filename = title
         self.display_name = os.path.basename(title)
         self.editor = widget
-        self.editor.setText(content)
+        self.editor.setText(content, **set_text_kwargs)
         self.tokens = []
         self.errors = []
 
@@ -20,5 +20,5 @@ class FileTab(GenericTab):
 
 
 class GraphTab(GenericTab):
-    def __init__(self, title, content):
-        super().__init__(title, GraphViewer(), content)
+    def __init__(self, title, content, parse_result=None):
+        super().__init__(title, GraphViewer(), content, parse_result=parse_result)
@@ -1,6 +1,6 @@
 from PyQt5.QtCore import QPointF, Qt
 
-from parser.parser import parse_ontology
+from parser.incremental import IncrementalParser
 from ui.widgets.graph_viewer.edge_item import EdgeItem
 from ui.widgets.graph_viewer.graph_viewer_core import GraphViewerCore
 from ui.widgets.graph_viewer.node_item import NodeItem
@@ -11,6 +11,8 @@ class GraphViewer(GraphViewerCore):
     def __init__(self):
         super().__init__()
         self.text = ""
+        # Reaproveita as declarações inalteradas entre chamadas de setText
+        self.incremental_parser = IncrementalParser()
         self.set_grab_mode(True)
         self.set_keyboard_navigation_speed(15)
 
@@ -293,9 +295,10 @@ class GraphViewer(GraphViewerCore):
         # Centraliza a visualização na árvore
         self.fitInView(self.scene().itemsBoundingRect(), Qt.KeepAspectRatio)
 
-    def setText(self, text: str):
+    def setText(self, text: str, parse_result=None):
         self.text = text
-        result = parse_ontology(text)
+        # Resultado já calculado (ex.: pelo pool de análise da pasta)
+        result = parse_result if parse_result is not None else self.incremental_parser.update(text)
         self.load_graph(result)
 
     def toPlainText(self):
@@ -13,6 +13,10 @@ class ASTConverter:
         Função recursiva para percorrer a estrutura e construir a lista de adjacências.
         Retorna o índice onde o nó atual foi inserido.
         """
+        # Declarações tipadas (parser.ast_nodes): os NodeItems leem a forma em dicionário
+        if hasattr(node_data, "to_dict"):
+            node_data = node_data.to_dict()
+
         if not isinstance(node_data, (dict, list)):
             # Para strings simples em contextos específicos, cria nós
             if key_context == "package" and isinstance(node_data, str):
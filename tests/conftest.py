@@ -0,0 +1,32 @@
+"""
+Configuração comum dos testes.
+
+Os módulos do projeto são importados a partir de src/, como na CLI e na
+interface (lexer, parser, semantic, benchmarks...).
+
+Uso (a partir da raiz do repositório):
+    python -m pytest tests
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+SRC_DIR = ROOT_DIR / "src"
+EXAMPLES_DIR = ROOT_DIR / "exemplos"
+
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+
+@pytest.fixture(scope="session")
+def example_paths():
+    paths = sorted(EXAMPLES_DIR.rglob("*.tonto"))
+    assert paths, f"Nenhum exemplo .tonto em {EXAMPLES_DIR}"
+    return paths
+
+
+@pytest.fixture(scope="session")
+def example_sources(example_paths):
+    return [path.read_text(encoding="utf-8") for path in example_paths]
@@ -0,0 +1,50 @@
+"""
+IncrementalParser (parser.incremental) contra o parsing completo: depois
+de cada edição, inclusive em textos com erros léxicos e sintáticos, o
+resultado de update() deve ser igual ao de parse_ontology.
+"""
+import random
+
+import pytest
+
+from parser.incremental import IncrementalParser
+from parser.parser import parse_ontology
+
+# Inserções que criam e desfazem erros: chaves soltas, declarações
+# incompletas, caracteres ilegais e termos hifenizados inválidos
+SNIPPETS = [
+    "kind X", "\nkind Foo\n", "}", "{", " ", "\n", "a", ":", "$", "foo-bar", "//c\n",
+    "@mediation [1] -- [1] B\n", "disjoint ", "genset G where A specializes B\n",
+    "relator R {\n}\n", "subkind S specializes\n",
+]
+EDITS = 6
+
+
+def _fingerprint(result: dict):
+    return (result['package'], result['imports'], result['declarations'],
+            result['lexical_errors'], result['syntactic_errors'],
+            list(result['tokens']), str(result['summary']))
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_update_matches_full_parse(example_sources, seed):
+    rng = random.Random(seed)
+    for text in rng.sample(example_sources, 12):
+        incremental = IncrementalParser()
+        assert _fingerprint(incremental.update(text)) == _fingerprint(parse_ontology(text))
+        for _ in range(EDITS):
+            offset = rng.randrange(len(text) + 1)
+            removed = rng.randrange(min(10, len(text) - offset) + 1)
+            inserted = rng.choice(SNIPPETS) if rng.random() < 0.7 else ""
+            text = text[:offset] + inserted + text[offset + removed:]
+            assert _fingerprint(incremental.update(text)) == _fingerprint(parse_ontology(text)), repr(text)
+
+
+def test_edit_reparses_only_its_group(example_sources):
+    # Um texto com erros em toda parte: a edição no fim não reparseia o início
+    text = "\n".join(example_sources)
+    incremental = IncrementalParser()
+    incremental.update(text)
+    result = incremental.update(text + "\nkind Extra\n")
+    assert incremental.reused > incremental.reparsed
+    assert _fingerprint(result) == _fingerprint(parse_ontology(text + "\nkind Extra\n"))
@@ -0,0 +1,40 @@
+"""
+Teste diferencial dos backends de lexer: 'regex' deve produzir exatamente
+os mesmos tokens e LexerErrors que 'ply' (ver benchmarks.lexer_backends).
+"""
+import random
+
+import pytest
+
+from benchmarks.lexer_backends import check_backends_agree
+from lexer.lexer import LEXER_BACKENDS, create_lexer
+
+# Trechos que exercitam as regras mais sujeitas a divergência: termos com
+# hífen, operadores de relação, comentários, cardinalidades e caracteres
+# ilegais
+FRAGMENTS = [
+    "kind", "subkind", "genset", "specializes", "where", "relation", "@mediation",
+    "Person", "foo-bar", "begin-end", "part-of", "_x1", "a1", "12", "0..*", "[", "]",
+    "{", "}", "(", ")", ":", ",", ".", "..", "*", "@", "--", "<>--", "--<>", "<o>--",
+    "--<o>", "<", ">", "-", "/* nota */", "// fim", "/*", "*/", "$", "#", "ç", "é",
+    " ", " ", "\t", "\n", "\n",
+]
+
+
+def _tokenize(backend: str, data: str):
+    lexer = create_lexer(backend=backend)
+    return list(lexer.tokenize(data)), lexer.errors
+
+
+def test_backends_agree_on_examples(example_paths, capsys):
+    assert check_backends_agree(example_paths) == 0, capsys.readouterr().out
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_backends_agree_on_random_text(seed):
+    rng = random.Random(seed)
+    for _ in range(50):
+        data = "".join(rng.choice(FRAGMENTS) for _ in range(rng.randint(0, 80)))
+        expected = _tokenize('ply', data)
+        for backend in LEXER_BACKENDS[1:]:
+            assert _tokenize(backend, data) == expected, repr(data)
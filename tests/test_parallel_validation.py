@@ -0,0 +1,31 @@
+"""
+Validação semântica com as tarefas em paralelo (semantic.parallel): os
+erros devem sair iguais e na mesma ordem da validação em série, em
+qualquer modo (ver benchmarks.parallel_validation).
+"""
+import pytest
+
+from benchmarks.semantic_scaling import make_ontology
+from parser.parser import parse_ontology
+from semantic.analyzer import SemanticAnalyzer
+
+WORKERS = 4
+
+
+def _errors(ast: dict, mode: str):
+    _, errors = SemanticAnalyzer(validation_mode=mode, max_workers=WORKERS).analyze(ast)
+    return [str(error) for error in errors]
+
+
+def test_thread_mode_matches_serial_on_examples(example_sources):
+    for data in example_sources:
+        ast = parse_ontology(data)
+        assert _errors(ast, 'thread') == _errors(ast, 'serial')
+
+
+@pytest.mark.parametrize("mode", ['thread', 'process'])
+def test_parallel_modes_match_serial_on_synthetic_ontology(mode):
+    ast = make_ontology(2_000)
+    expected = _errors(ast, 'serial')
+    assert expected
+    assert _errors(ast, mode) == expected
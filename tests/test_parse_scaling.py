@@ -0,0 +1,33 @@
+"""
+Escalabilidade do parsing (ver benchmarks.parse_scaling): as listas de
+declarações e de membros são construídas por regras recursivas à esquerda,
+então a pilha do parser não cresce com o número de itens. A medida de
+tempo por item fica no benchmark, que não roda na suíte de testes.
+"""
+import pytest
+
+from benchmarks.parse_scaling import make_declarations, make_members
+from lexer.lexer import create_lexer
+from parser.parser import ParserSession
+
+
+def _max_stack_depth(data: str) -> int:
+    """Maior altura da pilha de estados do PLY durante o parsing de data"""
+    session = ParserSession()
+    token_list = list(create_lexer().tokenize(data))
+    depth = 0
+
+    def tokens():
+        nonlocal depth
+        for tok in token_list:
+            depth = max(depth, len(session.parser.statestack))
+            yield tok
+
+    result = session.parse_tokens(tokens())
+    assert result is not None and not session.error_report.has_errors()
+    return depth
+
+
+@pytest.mark.parametrize("make", [make_declarations, make_members])
+def test_stack_depth_does_not_grow(make):
+    assert _max_stack_depth(make(100)) == _max_stack_depth(make(5_000))
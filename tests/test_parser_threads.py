@@ -0,0 +1,49 @@
+"""
+Estresse do parser e do analisador semântico em várias threads: cada
+resultado concorrente deve ser idêntico ao serial (ver
+benchmarks.parser_threads), o que falharia se o estado de um parsing ou de
+uma validação vazasse para outro.
+"""
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.parser_threads import result_fingerprint
+from parser.parser import parse_ontology
+from semantic.analyzer import SemanticAnalyzer
+
+THREADS = 8
+ROUNDS = 4
+
+
+def _shuffled_jobs(count: int):
+    jobs = list(range(count)) * ROUNDS
+    random.Random(0).shuffle(jobs)
+    return jobs
+
+
+def _semantic_errors(data: str):
+    _, errors = SemanticAnalyzer().analyze(parse_ontology(data))
+    return [str(error) for error in errors]
+
+
+def test_concurrent_parsing_matches_serial(example_sources):
+    expected = [result_fingerprint(parse_ontology(data)) for data in example_sources]
+    jobs = _shuffled_jobs(len(example_sources))
+
+    with ThreadPoolExecutor(max_workers=THREADS) as pool:
+        results = list(pool.map(lambda i: result_fingerprint(parse_ontology(example_sources[i])), jobs))
+
+    mismatches = [i for i, result in zip(jobs, results) if result != expected[i]]
+    assert not mismatches
+
+
+def test_concurrent_analysis_matches_serial(example_sources):
+    expected = [_semantic_errors(data) for data in example_sources]
+    jobs = _shuffled_jobs(len(example_sources))
+
+    with ThreadPoolExecutor(max_workers=THREADS) as pool:
+        results = list(pool.map(lambda i: _semantic_errors(example_sources[i]), jobs))
+
+    mismatches = [i for i, result in zip(jobs, results) if result != expected[i]]
+    assert not mismatches
+